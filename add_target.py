@@ -1,8 +1,12 @@
 import logging
 from divider import divider
-import pandas as pd
 
-def add_target(df_features, target_series, target_col_name="target", key_col=None):
+def add_target(df_features, target_series, target_col_name="target"):
+    """
+    Append the target as the last column. df_features must be indexed by row
+    position in the frame the target was split from (as main.prismaflow_pipeline
+    does), so the surviving rows' targets are picked by a positional take.
+    """
 
     if target_series is None:
 
@@ -10,12 +14,8 @@ def add_target(df_features, target_series, target_col_name="target", key_col=Non
 
     logging.info(f"=== ADDING TARGET COLUMN STARTED ===")
 
-    df_combined = df_features.merge(
-        target_series[[key_col, target_col_name]],
-        on=key_col,
-        how="left",
-        validate="one_to_one",
-    ).drop(columns=[key_col])
+    df_combined = df_features.copy(deep=False)
+    df_combined[target_col_name] = target_series.take(df_features.index.to_numpy()).to_numpy()
 
     logging.info(f"=== ADDING TARGET COLUMN COMPLETED ===")
 
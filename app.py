@@ -1,6 +1,7 @@
 import os
 import uuid
 import io
+import tempfile
 import time
 import logging
 from datetime import timedelta
@@ -8,28 +9,45 @@ from datetime import timedelta
 import pandas as pd
 from flask import (
     Flask,
+    Response,
+    jsonify,
     redirect,
     render_template,
     request,
     send_file,
     session,
+    stream_with_context,
     url_for,
 )
 from werkzeug.utils import secure_filename
 
-from main import prismaflow_pipeline
+from main import plan_column_pushdown, prismaflow_pipeline
+from column_profile import profile_columns
+from csv_ingest import dtype_hints
+from file_io import file_suffix, is_typed, iter_csv, read_table, split_format, write_table
+from frame_cache import dump_frame, read_frame
+from jobs import JobCancelled, JobQueue, JobQueueFull
+from session_store import SessionStore
+from step_cache import StepCache
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 LOG_PATH = os.path.join(BASE_DIR, "logs.txt")
 
-ALLOWED_EXTENSIONS = {"csv"}
+# Download formats offered for the processed data: (file suffix, mimetype)
+DOWNLOAD_FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "csv.gz": (".csv.gz", "application/gzip"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "feather": (".feather", "application/vnd.apache.arrow.file"),
+}
 
 PIPELINE_STEPS = [
     {"key": "manual_columns", "label": "Selected Columns Removal"},
     {"key": "drop_empty_columns", "label": "Drop Empty Columns"},
     {"key": "handle_nulls", "label": "Handle Null Values"},
     {"key": "finalize_dtypes", "label": "Finalize Data Types"},
+    {"key": "downcast_dtypes", "label": "Optimize Memory (Downcast Types)", "optional": True},
     {"key": "handle_outliers", "label": "Handle Outliers"},
     {"key": "encoding", "label": "Encode Categorical Features"},
     {"key": "feature_selection", "label": "Feature Selection"},
@@ -38,22 +56,73 @@ PIPELINE_STEPS = [
 ]
 
 _STORE_TTL_SECONDS = 60 * 60  # 1 hour
-_STORE_MAX_BYTES = 50 * 1024 * 1024  # 50MB
-_STORE: dict[str, dict] = {}
+_STORE_MAX_BYTES = 50 * 1024 * 1024  # 50MB per upload
+_STORE_BUDGET_BYTES = int(os.environ.get("PRISMAFLOW_STORE_MAX_BYTES", str(1024 * 1024 * 1024)) or 0)  # 1GB on disk
+_STORE_DIR = os.environ.get("PRISMAFLOW_STORE_DIR") or os.path.join(tempfile.gettempdir(), "prismaflow_sessions")
+
+# Session payloads live on disk; worker processes pointing at the same directory share them
+_STORE = SessionStore(_STORE_DIR, max_bytes=_STORE_BUDGET_BYTES, ttl_seconds=_STORE_TTL_SECONDS)
+
+
+def _mirror_job(job: dict) -> None:
+    # Job state is kept on the session too, so any worker process can report it
+    if job.get("owner"):
+        _STORE.update(job["owner"], job=job)
+
+
+# Intermediate frames per step prefix, so a re-run only recomputes the steps whose options changed
+_STEP_CACHE = StepCache(max_bytes=int(os.environ.get("PRISMAFLOW_STEP_CACHE_MAX_BYTES", str(256 * 1024 * 1024)) or 0))
+
+# Per-column work inside a run: "serial", "threads" or "processes" (see column_executor)
+_COLUMN_EXECUTOR = os.environ.get("PRISMAFLOW_COLUMN_EXECUTOR", "serial") or "serial"
+_COLUMN_WORKERS = int(os.environ.get("PRISMAFLOW_COLUMN_WORKERS", "0") or 0) or None
+
+# Pipeline runs go to a bounded worker pool instead of blocking the request
+_JOBS = JobQueue(
+    max_workers=int(os.environ.get("PRISMAFLOW_WORKERS", "2") or 2),
+    max_pending=int(os.environ.get("PRISMAFLOW_MAX_PENDING_JOBS", "16") or 16),
+    ttl_seconds=_STORE_TTL_SECONDS,
+    on_update=_mirror_job,
+)
 
 
 def _allowed_file(filename: str) -> bool:
-    if not filename or "." not in filename:
-        return False
-    ext = filename.rsplit(".", 1)[1].lower()
-    return ext in ALLOWED_EXTENSIONS
+    # CSV (optionally compressed), Parquet and Feather / Arrow IPC
+    return split_format(filename)[0] is not None
 
 
-def _read_csv_safely_bytes(data: bytes) -> pd.DataFrame:
+def _read_upload_safely(source, filename: str, hints=None, columns=None) -> pd.DataFrame:
     try:
-        return pd.read_csv(io.BytesIO(data))
+        return read_table(source, filename=filename, columns=columns, dtype_hints=hints)
     except UnicodeDecodeError:
-        return pd.read_csv(io.BytesIO(data), encoding="latin1")
+        # The encoding is detected from the first 64KB; a stray byte further in still needs latin-1
+        return read_table(source, filename=filename, columns=columns, dtype_hints=hints, encoding="latin1")
+
+
+def _load_uploaded_frame(token: str, state: dict, columns=None) -> pd.DataFrame:
+    """
+    The session's upload as a DataFrame, loaded from the typed snapshot taken at
+    upload time; the raw CSV is only re-parsed when no snapshot exists.
+    columns: optional subset to load; the other columns are never read.
+    """
+    parsed_path = _STORE.payload_path(token, state["parsed_payload"]) if state.get("parsed_payload") else None
+    if parsed_path:
+        try:
+            return read_frame(parsed_path, columns=columns)
+        except Exception:
+            pass
+
+    raw_name = state.get("raw_payload") or "raw.csv"
+    raw_path = _STORE.payload_path(token, raw_name)
+    if not raw_path:
+        raise RuntimeError("Session expired, upload the file again")
+    # The profile taken at upload time spares the re-parse its type inference
+    return _read_upload_safely(raw_path, raw_name, hints=dtype_hints(state.get("profile")), columns=columns)
+
+
+def _payload_text(token: str, name: str) -> str | None:
+    data = _STORE.get_payload(token, name)
+    return data.decode("utf-8") if data is not None else None
 
 
 def _df_head_html(df: pd.DataFrame, max_rows: int = 15) -> str:
@@ -66,56 +135,172 @@ def _df_head_html(df: pd.DataFrame, max_rows: int = 15) -> str:
         float_format=lambda x: f"{x:.2f}",
     )
 
-def _data_report(df: pd.DataFrame) -> list[dict]:
-    missing_tokens = {
-        "",
-        "nan",
-        "none",
-        "null",
-        "na",
-        "n/a",
-        "nat",
-        "missing",
-        "nil",
-    }
+def _data_report(profile: dict) -> list[dict]:
     rows: list[dict] = []
-    for col in df.columns:
-        s = df[col]
-        null_mask = s.isna()
-        if pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s):
-            norm = s.astype(str).str.strip().str.lower()
-            null_mask = null_mask | norm.isin(missing_tokens)
-
-        null_pct = float(null_mask.mean() * 100.0) if len(s) else 0.0
-        try:
-            unique = int(s[~null_mask].nunique(dropna=True))
-        except Exception:
-            unique = int(s.nunique(dropna=True))
+    for col, entry in profile.items():
+        rows_total = int(entry.get("rows") or 0)
+        null_pct = (entry["missing_count"] / rows_total * 100.0) if rows_total else 0.0
         rows.append(
             {
                 "column": str(col),
                 "null_pct": round(null_pct, 2),
-                "unique": unique,
-                "dtype": str(s.dtype),
+                "unique": int(entry["unique"]),
+                "dtype": entry["dtype"],
+                "mean": entry.get("mean"),
+                "min": entry.get("min"),
+                "max": entry.get("max"),
             }
         )
     return rows
 
+def _numeric_columns(profile: dict) -> list[str]:
+    return [str(c) for c, entry in profile.items() if entry.get("numeric")]
+
+
 def _cleanup_store() -> None:
-    now = time.time()
-    expired = [k for k, v in _STORE.items() if (now - float(v.get("created_at", 0))) > _STORE_TTL_SECONDS]
-    for k in expired:
-        _STORE.pop(k, None)
+    _STORE.cleanup()
 
 
 def _get_token() -> str | None:
     tok = session.get("token")
     if not tok:
         return None
-    if tok not in _STORE:
+    if not _STORE.exists(tok):
         return None
     return tok
 
+
+def _wants_json() -> bool:
+    return request.accept_mimetypes.best == "application/json"
+
+
+def _job_for(token: str, job_id: str | None) -> dict | None:
+    """
+    Job status from this process's queue, or the copy mirrored on the session
+    when the job runs in another worker process.
+    """
+    if not job_id:
+        return None
+    job = _JOBS.status(job_id)
+    if job is None:
+        job = (_STORE.get(token) or {}).get("job")
+        if not job or job.get("id") != job_id:
+            return None
+    if job.get("owner") != token:
+        return None
+    return job
+
+
+def _active_job(token: str) -> dict | None:
+    job = _job_for(token, (_STORE.get(token) or {}).get("job_id"))
+    if job and not job["finished"]:
+        return job
+    return None
+
+
+def _run_pipeline_job(token: str, job_id: str, pipeline_kwargs: dict, progress) -> None:
+    """
+    Worker body of a /run job: parse the upload, run the pipeline and store the
+    processed result on the session.
+    """
+    state = _STORE.get(token)
+    if not state:
+        raise RuntimeError("Session expired, upload the file again")
+
+    def checked_progress(step, done, total):
+        # A cancel request may have been handled by another worker process
+        if (_STORE.get(token) or {}).get("cancel_job") == job_id:
+            raise JobCancelled(job_id)
+        progress(step, done, total)
+
+    # Columns the run drops unseen (manual removals, empty per the upload profile) are not loaded at all
+    columns = state.get("columns") or []
+    not_loaded = plan_column_pushdown(
+        columns,
+        target_col=pipeline_kwargs.get("target_col"),
+        manual_columns=pipeline_kwargs.get("manual_columns"),
+        columns_to_keep=pipeline_kwargs.get("columns_to_keep"),
+        steps=pipeline_kwargs.get("steps"),
+        profile=state.get("profile"),
+    )
+    df = _load_uploaded_frame(token, state, columns=[c for c in columns if c not in not_loaded] if not_loaded else None)
+    # Datetime formats inferred by earlier runs on this upload (never another upload's)
+    datetime_plans = dict(state.get("datetime_plans") or {})
+    fd, trace_path = tempfile.mkstemp(prefix="prismaflow-trace-", suffix=".json")
+    os.close(fd)
+    try:
+        result = prismaflow_pipeline(
+            df,
+            profile=state.get("profile"),
+            datetime_plans=datetime_plans,
+            output_file=None,
+            return_df=True,
+            collect_metrics=True,
+            progress=checked_progress,
+            cache=_STEP_CACHE,
+            input_fingerprint=token,
+            trace_file=trace_path,
+            infer_dtypes=not state.get("typed_input"),
+            columns_not_loaded=not_loaded,
+            executor=_COLUMN_EXECUTOR,
+            workers=_COLUMN_WORKERS,
+            **pipeline_kwargs,
+        )
+        with open(trace_path, "rb") as f:
+            trace_bytes = f.read()
+    finally:
+        os.remove(trace_path)
+    if result is None or (isinstance(result, tuple) and result[0] is None):
+        raise RuntimeError("Pipeline returned no data")
+    if isinstance(result, tuple):
+        processed_df, metrics = result
+    else:
+        processed_df, metrics = result, None
+
+    # Kept as a typed snapshot; /download converts it to the requested format
+    processed_suffix, processed_bytes = dump_frame(processed_df)
+    if not _STORE.put_payload(token, "processed" + processed_suffix, processed_bytes):
+        raise RuntimeError("Session expired, upload the file again")
+    old_payload = state.get("processed_payload")
+    if old_payload and old_payload != "processed" + processed_suffix:
+        _STORE.delete_payload(token, old_payload)
+    _STORE.put_payload(token, "processed_preview.html", _df_head_html(processed_df).encode("utf-8"))
+    if trace_bytes:
+        _STORE.put_payload(token, "trace.json", trace_bytes)
+    _STORE.update(
+        token,
+        processed_shape={"rows": int(processed_df.shape[0]), "cols": int(processed_df.shape[1])},
+        processed_payload="processed" + processed_suffix,
+        metrics=metrics,
+        datetime_plans=datetime_plans,
+    )
+
+
+def _submit_run(token: str, label: str, pipeline_kwargs: dict):
+    """
+    Queue a pipeline run for the session. Only one run per session is active at a time.
+    """
+    job = _active_job(token)
+    if job is None:
+        job_id = uuid.uuid4().hex
+        _STORE.update(token, job_id=job_id)
+        try:
+            _JOBS.submit(
+                lambda progress: _run_pipeline_job(token, job_id, pipeline_kwargs, progress),
+                owner=token,
+                label=label,
+                job_id=job_id,
+            )
+        except JobQueueFull:
+            if _wants_json():
+                return jsonify({"error": "Server is busy, try again shortly"}), 503
+            return redirect(url_for("index"))
+        job = _JOBS.status(job_id)
+
+    if _wants_json():
+        return jsonify(job), 202
+    return redirect(url_for("index"))
+
 app = Flask(__name__, static_folder="static", template_folder="templates")
 app.config["SECRET_KEY"] = os.environ.get("PRISMAFLOW_SECRET_KEY", "dev-secret-key-change-me")
 app.config["MAX_CONTENT_LENGTH"] = 50 * 1024 * 1024  # 50MB
@@ -132,29 +317,40 @@ app.logger.disabled = True
 def index():
     _cleanup_store()
     token = _get_token()
-    state = _STORE.get(token, {}) if token else {}
-    if token and state and ("numeric_columns" not in state) and state.get("raw_bytes"):
+    state = (_STORE.get(token) or {}) if token else {}
+    if token and state and ("numeric_columns" not in state):
         try:
-            df = _read_csv_safely_bytes(state["raw_bytes"])
-            state["numeric_columns"] = [str(c) for c in df.select_dtypes(include="number").columns.tolist()]
-            state["data_report"] = _data_report(df)
+            if not state.get("profile"):
+                state["profile"] = profile_columns(_load_uploaded_frame(token, state))
+            state["numeric_columns"] = _numeric_columns(state["profile"])
+            state["data_report"] = _data_report(state["profile"])
         except Exception:
             state["numeric_columns"] = []
             state["data_report"] = []
+        _STORE.update(
+            token,
+            profile=state.get("profile"),
+            numeric_columns=state["numeric_columns"],
+            data_report=state["data_report"],
+        )
+    job = _job_for(token, state.get("job_id")) if state else None
     return render_template(
         "index.html",
         uploaded_filename=state.get("uploaded_filename"),
         columns=state.get("columns", []),
         numeric_columns=state.get("numeric_columns", []),
         data_report=state.get("data_report", []),
-        preview_html=state.get("preview_html"),
-        processed_preview_html=state.get("processed_preview_html"),
-        has_processed=bool(state.get("processed_bytes")),
+        preview_html=_payload_text(token, "preview.html") if state else None,
+        processed_preview_html=_payload_text(token, "processed_preview.html") if state else None,
+        has_processed=bool(state.get("processed_payload")) and _STORE.payload_path(token, state["processed_payload"]) is not None,
+        has_trace=bool(state) and _STORE.payload_path(token, "trace.json") is not None,
         raw_shape=state.get("raw_shape"),
         processed_shape=state.get("processed_shape"),
         metrics=state.get("metrics"),
         has_logs=os.path.exists(LOG_PATH) and os.path.getsize(LOG_PATH) > 0,
         pipeline_steps=PIPELINE_STEPS,
+        download_formats=list(DOWNLOAD_FORMATS),
+        job=job,
     )
 
 
@@ -176,27 +372,43 @@ def upload():
         return redirect(url_for("index"))
 
     try:
-        df = _read_csv_safely_bytes(raw_bytes)
+        df = _read_upload_safely(raw_bytes, original_name)
     except Exception as e:
         return redirect(url_for("index"))
+    raw_name = "raw" + file_suffix(original_name)
+
+    profile = profile_columns(df)
+    parsed_suffix, parsed_bytes = dump_frame(df)
 
     session.permanent = True
     token = uuid.uuid4().hex
     session["token"] = token
-    _STORE[token] = {
-        "created_at": time.time(),
-        "uploaded_filename": original_name,
-        "raw_bytes": raw_bytes,
-        "columns": [str(c) for c in df.columns.tolist()],
-        "numeric_columns": [str(c) for c in df.select_dtypes(include="number").columns.tolist()],
-        "data_report": _data_report(df),
-        "preview_html": _df_head_html(df),
-        "raw_shape": {"rows": int(df.shape[0]), "cols": int(df.shape[1])},
-        "processed_preview_html": None,
-        "processed_bytes": None,
-        "processed_shape": None,
-        "metrics": None,
-    }
+    _STORE.create(
+        token,
+        {
+            "created_at": time.time(),
+            "uploaded_filename": original_name,
+            "columns": [str(c) for c in df.columns.tolist()],
+            "profile": profile,
+            "numeric_columns": _numeric_columns(profile),
+            "data_report": _data_report(profile),
+            "raw_shape": {"rows": int(df.shape[0]), "cols": int(df.shape[1])},
+            "processed_shape": None,
+            "metrics": None,
+            "job_id": None,
+            "job": None,
+            "cancel_job": None,
+            "raw_payload": raw_name,
+            "typed_input": is_typed(original_name),
+            "parsed_payload": "parsed" + parsed_suffix,
+            "processed_payload": None,
+        },
+        {
+            raw_name: raw_bytes,
+            "parsed" + parsed_suffix: parsed_bytes,
+            "preview.html": _df_head_html(df).encode("utf-8"),
+        },
+    )
 
     return redirect(url_for("index"))
 
@@ -208,11 +420,6 @@ def run_default():
     if not token:
         return redirect(url_for("index"))
 
-    try:
-        df = _read_csv_safely_bytes(_STORE[token]["raw_bytes"])
-    except Exception as e:
-        return redirect(url_for("index"))
-
     # Parse cleaning parameters
     manual_columns = request.form.getlist("manual_columns") or None
     raw_threshold = (request.form.get("null_threshold") or "").strip()
@@ -225,38 +432,21 @@ def run_default():
     # Only run basic cleaning steps: manual_columns, drop_empty_columns, handle_nulls, finalize_dtypes, handle_outliers
     cleaning_steps = ["manual_columns", "drop_empty_columns", "handle_nulls", "finalize_dtypes", "handle_outliers"]
 
-    processed_df = prismaflow_pipeline(
-        df,
-        target_col=None,
-        manual_columns=manual_columns,
-        columns_to_keep=None,
-        null_threshold=null_threshold,
-        handle_outliers=True,
-        outlier_method="iqr",
-        outlier_drop=True,
-        steps=cleaning_steps,
-        output_file=None,
-        return_df=True,
-        collect_metrics=True,
-        mode="cleaning",
+    return _submit_run(
+        token,
+        "Data Cleaning",
+        dict(
+            target_col=None,
+            manual_columns=manual_columns,
+            columns_to_keep=None,
+            null_threshold=null_threshold,
+            handle_outliers=True,
+            outlier_method="iqr",
+            outlier_drop=True,
+            steps=cleaning_steps,
+            mode="cleaning",
+        ),
     )
-    if processed_df is None or (isinstance(processed_df, tuple) and processed_df[0] is None):
-        return redirect(url_for("index"))
-    if isinstance(processed_df, tuple):
-        processed_df, metrics = processed_df
-    else:
-        metrics = None
-
-    try:
-        processed_bytes = processed_df.to_csv(index=False).encode("utf-8")
-    except Exception as e:
-        return redirect(url_for("index"))
-
-    _STORE[token]["processed_preview_html"] = _df_head_html(processed_df)
-    _STORE[token]["processed_bytes"] = processed_bytes
-    _STORE[token]["processed_shape"] = {"rows": int(processed_df.shape[0]), "cols": int(processed_df.shape[1])}
-    _STORE[token]["metrics"] = metrics
-    return redirect(url_for("index"))
 
 
 @app.post("/run/custom")
@@ -266,11 +456,6 @@ def run_custom():
     if not token:
         return redirect(url_for("index"))
 
-    try:
-        df = _read_csv_safely_bytes(_STORE[token]["raw_bytes"])
-    except Exception as e:
-        return redirect(url_for("index"))
-
     target_col = (request.form.get("target_col") or "").strip() or None
     manual_columns = request.form.getlist("manual_columns") or None
     outlier_skipping = request.form.getlist("outlier_skipping") or None
@@ -281,12 +466,22 @@ def run_custom():
     handle_outliers = outlier_action != "skip"
     outlier_drop = outlier_action != "cap"
     outlier_method = (request.form.get("outlier_method") or "iqr").strip().lower()
+    outlier_simultaneous = request.form.get("outlier_simultaneous") == "1"
     raw_outlier_param = (request.form.get("outlier_param") or "").strip()
     try:
         outlier_param = float(raw_outlier_param) if raw_outlier_param != "" else None
     except Exception:
         outlier_param = None
     encoding_method = (request.form.get("encoding_method") or "label").strip().lower()
+    onehot_sparse = request.form.get("onehot_sparse") == "1"
+    raw_max_categories = (request.form.get("max_categories") or "").strip()
+    try:
+        max_categories = int(raw_max_categories) if raw_max_categories != "" else None
+    except Exception:
+        max_categories = None
+    if max_categories is not None and max_categories < 2:
+        max_categories = None
+    rare_strategy = "hash" if (request.form.get("rare_strategy") or "").strip().lower() == "hash" else "other"
     scaling_method = (request.form.get("scaling_method") or "standard").strip().lower()
     raw_threshold = (request.form.get("null_threshold") or "").strip()
     try:
@@ -295,9 +490,10 @@ def run_custom():
         null_threshold_percent = 5.0
     null_threshold = max(0.0, min(1.0, null_threshold_percent / 100.0))
 
-    try:
-        processed_df = prismaflow_pipeline(
-            df,
+    return _submit_run(
+        token,
+        "Advanced Preprocessing",
+        dict(
             target_col=target_col,
             manual_columns=manual_columns,
             outlier_skipping=outlier_skipping,
@@ -307,34 +503,42 @@ def run_custom():
             outlier_method=outlier_method,
             outlier_drop=outlier_drop,
             outlier_param=outlier_param,
+            outlier_simultaneous=outlier_simultaneous,
             null_threshold=null_threshold,
             encoding_method=encoding_method,
+            onehot_sparse=onehot_sparse,
+            max_categories=max_categories,
+            rare_strategy=rare_strategy,
             scaling_method=scaling_method,
             steps=steps,
-            output_file=None,
-            return_df=True,
-            collect_metrics=True,
             mode="preprocessing",
-        )
-    except Exception as e:
-        return redirect(url_for("index"))
+        ),
+    )
 
-    if processed_df is None or (isinstance(processed_df, tuple) and processed_df[0] is None):
-        return redirect(url_for("index"))
-    if isinstance(processed_df, tuple):
-        processed_df, metrics = processed_df
-    else:
-        metrics = None
 
-    try:
-        processed_bytes = processed_df.to_csv(index=False).encode("utf-8")
-    except Exception as e:
+@app.get("/jobs/<job_id>")
+def job_status(job_id):
+    token = _get_token()
+    job = _job_for(token, job_id) if token else None
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job)
+
+
+@app.post("/jobs/<job_id>/cancel")
+def cancel_job(job_id):
+    token = _get_token()
+    job = _job_for(token, job_id) if token else None
+    if job is None:
+        if _wants_json():
+            return jsonify({"error": "Unknown job"}), 404
         return redirect(url_for("index"))
 
-    _STORE[token]["processed_preview_html"] = _df_head_html(processed_df)
-    _STORE[token]["processed_bytes"] = processed_bytes
-    _STORE[token]["processed_shape"] = {"rows": int(processed_df.shape[0]), "cols": int(processed_df.shape[1])}
-    _STORE[token]["metrics"] = metrics
+    # Flag it on the session as well, in case the job runs in another worker process
+    _STORE.update(token, cancel_job=job_id)
+    _JOBS.cancel(job_id)
+    if _wants_json():
+        return jsonify(_job_for(token, job_id))
     return redirect(url_for("index"))
 
 
@@ -344,17 +548,52 @@ def download():
     token = _get_token()
     if not token:
         return redirect(url_for("index"))
-    processed_bytes = _STORE[token].get("processed_bytes")
-    if not processed_bytes:
+    state = _STORE.get(token) or {}
+    processed_path = _STORE.payload_path(token, state["processed_payload"]) if state.get("processed_payload") else None
+    if not processed_path:
+        return redirect(url_for("index"))
+    fmt = request.args.get("format", "csv")
+    if fmt not in DOWNLOAD_FORMATS:
         return redirect(url_for("index"))
+    suffix, mimetype = DOWNLOAD_FORMATS[fmt]
 
-    base = (_STORE[token].get("uploaded_filename") or "processed").rsplit(".", 1)[0]
-    download_name = f"{base}_processed.csv"
+    uploaded = state.get("uploaded_filename") or "processed"
+    base = uploaded[: -len(file_suffix(uploaded))] if file_suffix(uploaded) else uploaded.rsplit(".", 1)[0]
+    download_name = f"{base}_processed{suffix}"
+
+    if fmt in ("csv", "csv.gz"):
+        # Streamed in chunks straight from the snapshot; the CSV is never held in memory whole
+        frame = read_frame(processed_path)
+        body = iter_csv(frame, compression="gzip" if fmt == "csv.gz" else None)
+        response = Response(stream_with_context(body), mimetype=mimetype)
+        response.headers.set("Content-Disposition", "attachment", filename=download_name)
+        return response
+
+    buf = io.BytesIO()
+    try:
+        write_table(read_frame(processed_path), buf, filename=download_name)
+    except ImportError:
+        return redirect(url_for("index"))
+    buf.seek(0)
     return send_file(
-        io.BytesIO(processed_bytes),
+        buf,
         as_attachment=True,
         download_name=download_name,
-        mimetype="text/csv",
+        mimetype=mimetype,
+    )
+
+
+@app.get("/download/trace")
+def download_trace():
+    token = _get_token()
+    trace_path = _STORE.payload_path(token, "trace.json") if token else None
+    if not trace_path:
+        return redirect(url_for("index"))
+    return send_file(
+        trace_path,
+        as_attachment=True,
+        download_name="prismaflow_trace.json",
+        mimetype="application/json",
     )
 
 
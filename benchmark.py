@@ -0,0 +1,330 @@
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from clear_columns import clear_columns
+from encoding import encode_features
+from feature_selection import feature_selection
+from finalize_types import finalize_dtypes
+from main import prismaflow_pipeline
+from run_log import finish_run_log, start_run_log
+from null_values import clear_null_values
+from outliers_removal import remove_outliers
+from scaling import scale_features
+from temporal_features import extract_temporal_features
+
+# Benchmarks
+#
+#   python benchmark.py run --rows 10000,100000 --cols 20
+#   python benchmark.py compare --threshold 0.15
+#
+# "run" times every step module and the full pipeline on synthetic datasets
+# and appends one JSON line per run to the history file. "compare" checks the
+# latest run against an earlier one and exits with status 1 if any benchmark
+# got slower than the threshold allows.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY = os.path.join(BASE_DIR, "benchmark_history.jsonl")
+
+
+# ---------------- SYNTHETIC DATA ----------------
+
+def make_synthetic_dataset(
+    rows=10_000,
+    cols=20,
+    null_rate=0.05,
+    outlier_rate=0.01,
+    cardinality=50,
+    categorical_ratio=0.3,
+    datetime_cols=1,
+    time_cols=1,
+    seed=0,
+):
+    """
+    Synthetic raw dataset shaped like a typical upload, with every value stored
+    the way read_csv would return it (datetimes and times as text).
+
+    cols: numeric + categorical feature columns (categorical_ratio of them are text
+    with `cardinality` levels); datetime_cols / time_cols text columns come on top,
+    along with one mostly-empty column, one correlated copy of the first numeric
+    column and a binary "target".
+    null_rate: share of missing cells per feature column.
+    outlier_rate: share of numeric cells pushed far outside their distribution.
+    """
+    rng = np.random.default_rng(seed)
+    n_cat = int(round(cols * categorical_ratio))
+    n_num = max(1, cols - n_cat)
+    data = {}
+
+    for i in range(n_num):
+        values = rng.normal(rng.uniform(-50, 50), rng.uniform(1, 10), rows)
+        if i % 3 == 2:
+            values = np.round(values)
+        outliers = rng.random(rows) < outlier_rate
+        values[outliers] *= rng.choice([-25.0, 25.0], int(outliers.sum()))
+        values[rng.random(rows) < null_rate] = np.nan
+        data[f"num_{i}"] = values
+
+    levels = np.array([f"level_{j}" for j in range(max(1, int(cardinality)))], dtype=object)
+    for i in range(n_cat):
+        # Zipf-like level frequencies, like real categorical data
+        weights = 1.0 / np.arange(1, len(levels) + 1)
+        values = rng.choice(levels, rows, p=weights / weights.sum()).astype(object)
+        values[rng.random(rows) < null_rate] = None
+        data[f"cat_{i}"] = values
+
+    start = np.datetime64("2020-01-01T00:00:00")
+    for i in range(datetime_cols):
+        offsets = rng.integers(0, 3 * 365 * 24 * 3600, rows).astype("timedelta64[s]")
+        data[f"created_date_{i}"] = pd.Series(start + offsets).dt.strftime("%Y-%m-%d %H:%M:%S").to_numpy(dtype=object)
+
+    for i in range(time_cols):
+        seconds = rng.integers(0, 24 * 3600, rows)
+        data[f"event_time_{i}"] = np.array(
+            [f"{s // 3600:02d}:{(s // 60) % 60:02d}:{s % 60:02d}" for s in seconds], dtype=object
+        )
+
+    df = pd.DataFrame(data)
+    df["mostly_empty"] = np.where(rng.random(rows) < 0.98, np.nan, rng.normal(0, 1, rows))
+    df["num_0_copy"] = df["num_0"] * 2 + rng.normal(0, 1e-3, rows)
+    df["target"] = rng.integers(0, 2, rows)
+
+    # Round-trip through CSV text so dtypes match a real upload
+    return pd.read_csv(io.StringIO(df.to_csv(index=False)))
+
+
+# ---------------- BENCHMARKS ----------------
+
+class _ScratchLog:
+    """
+    Collects the log records of a benchmarked call in a sink that is never
+    written, so runs do not overwrite logs.txt (pipeline runs nested inside
+    share it, see run_log.with_run_log).
+    """
+
+    def __enter__(self):
+        self.sink = start_run_log(None)
+        return self.sink
+
+    def __exit__(self, *exc):
+        finish_run_log(self.sink)
+
+
+def _stage_inputs(raw):
+    """
+    The input each step sees inside the pipeline, built once and untimed.
+    """
+    with _ScratchLog():
+        return _build_stages(raw)
+
+
+def _build_stages(raw):
+    cleaned = clear_null_values(clear_columns(raw.copy(), empty_threshold=0.95), 0.05)
+    typed = finalize_dtypes(cleaned.copy())
+    no_outliers = remove_outliers(typed.copy(), True)
+    encoded = encode_features(no_outliers.copy(), "label", exclude_cols=["target"])
+    selected = feature_selection(encoded.copy(), exclude_cols=["target"])
+    temporal = extract_temporal_features(selected.copy())
+    return {
+        "raw": raw,
+        "cleaned": cleaned,
+        "typed": typed,
+        "encoded_input": no_outliers,
+        "encoded": encoded,
+        "selected": selected,
+        "temporal": temporal,
+    }
+
+
+BENCHMARKS = {
+    "clear_columns": ("raw", lambda df: clear_columns(df, empty_threshold=0.95)),
+    "clear_null_values": ("raw", lambda df: clear_null_values(df, 0.05)),
+    "finalize_dtypes": ("cleaned", lambda df: finalize_dtypes(df)),
+    "remove_outliers": ("typed", lambda df: remove_outliers(df, True)),
+    "encode_features_label": ("encoded_input", lambda df: encode_features(df, "label", exclude_cols=["target"])),
+    "encode_features_onehot": ("encoded_input", lambda df: encode_features(df, "onehot", exclude_cols=["target"])),
+    "feature_selection": ("encoded", lambda df: feature_selection(df, exclude_cols=["target"])),
+    "extract_temporal_features": ("selected", lambda df: extract_temporal_features(df)),
+    "scale_features": ("temporal", lambda df: scale_features(df, "standard", exclude_cols=["target"])),
+    "pipeline": ("raw", lambda df: prismaflow_pipeline(df, target_col="target", output_file=None, return_df=True)),
+}
+
+
+def _time_call(fn, df, repeat):
+    times = []
+    for _ in range(repeat):
+        # Steps return new frames (copy-on-write), so the input is shared across
+        # repeats; the log sink is opened and dropped outside the timed region
+        with _ScratchLog():
+            start = time.perf_counter()
+            fn(df)
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def run_benchmarks(row_scales, cols=20, repeat=3, only=None, dataset_options=None):
+    """
+    Time every benchmark (or the names in `only`) at each row scale.
+    Returns a list of result dicts.
+    """
+    results = []
+    names = [n for n in BENCHMARKS if not only or n in only]
+    for rows in row_scales:
+        raw = make_synthetic_dataset(rows=rows, cols=cols, **(dataset_options or {}))
+        stages = _stage_inputs(raw)
+        for name in names:
+            stage, fn = BENCHMARKS[name]
+            times = _time_call(fn, stages[stage], repeat)
+            results.append(
+                {
+                    "benchmark": name,
+                    "rows": int(rows),
+                    "cols": int(cols),
+                    "repeat": int(repeat),
+                    "min_seconds": round(min(times), 6),
+                    "median_seconds": round(statistics.median(times), 6),
+                }
+            )
+            print(f"{name:<28} rows={rows:<9} median={statistics.median(times):.4f}s min={min(times):.4f}s", flush=True)
+    return results
+
+
+# ---------------- HISTORY ----------------
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def append_history(path, results, options):
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "options": options,
+        "results": results,
+    }
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+    return record
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare_runs(baseline, current, threshold=0.15, noise_floor=0.005):
+    """
+    Benchmarks whose best (minimum) time grew by more than `threshold` (relative)
+    over the baseline run; the minimum is the least noisy of the repeats.
+    Timings below noise_floor seconds in both runs are ignored.
+    """
+    base = {(r["benchmark"], r["rows"], r["cols"]): r for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        b = base.get((r["benchmark"], r["rows"], r["cols"]))
+        if b is None:
+            continue
+        before, after = b["min_seconds"], r["min_seconds"]
+        if max(before, after) < noise_floor or before <= 0:
+            continue
+        change = (after - before) / before
+        if change > threshold:
+            regressions.append({**r, "baseline_seconds": before, "current_seconds": after, "change": round(change, 4)})
+    return regressions
+
+
+# ---------------- CLI ----------------
+
+def _int_list(raw):
+    return [int(x) for x in str(raw).split(",") if x.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PrismaFlow step benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run benchmarks and append the results to the history")
+    run.add_argument("--rows", default="10000,100000", help="Comma separated row counts")
+    run.add_argument("--cols", type=int, default=20, help="Numeric + categorical feature columns")
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--only", default="", help="Comma separated benchmark names")
+    run.add_argument("--null-rate", type=float, default=0.05)
+    run.add_argument("--outlier-rate", type=float, default=0.01)
+    run.add_argument("--cardinality", type=int, default=50)
+    run.add_argument("--categorical-ratio", type=float, default=0.3)
+    run.add_argument("--datetime-cols", type=int, default=1)
+    run.add_argument("--time-cols", type=int, default=1)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--history", default=DEFAULT_HISTORY)
+
+    cmp_ = sub.add_parser("compare", help="Compare the latest run with an earlier one")
+    cmp_.add_argument("--history", default=DEFAULT_HISTORY)
+    cmp_.add_argument("--baseline", type=int, default=-2, help="History index of the baseline run (default: previous run)")
+    cmp_.add_argument("--threshold", type=float, default=0.15, help="Allowed relative slowdown")
+    cmp_.add_argument("--noise-floor", type=float, default=0.005, help="Ignore timings below this many seconds")
+
+    args = parser.parse_args(argv)
+
+    # Step modules log every action; keep benchmark runs quiet and the timings clean
+    logging.disable(logging.INFO)
+
+    if args.command == "run":
+        dataset_options = {
+            "null_rate": args.null_rate,
+            "outlier_rate": args.outlier_rate,
+            "cardinality": args.cardinality,
+            "categorical_ratio": args.categorical_ratio,
+            "datetime_cols": args.datetime_cols,
+            "time_cols": args.time_cols,
+            "seed": args.seed,
+        }
+        only = [x.strip() for x in args.only.split(",") if x.strip()] or None
+        results = run_benchmarks(_int_list(args.rows), cols=args.cols, repeat=args.repeat, only=only, dataset_options=dataset_options)
+        append_history(args.history, results, {"cols": args.cols, "repeat": args.repeat, **dataset_options})
+        print(f"Results appended to {args.history}")
+        return 0
+
+    history = load_history(args.history)
+    if len(history) < 2:
+        print("Need at least two runs in the history to compare")
+        return 0
+    baseline, current = history[args.baseline], history[-1]
+    regressions = compare_runs(baseline, current, args.threshold, args.noise_floor)
+    if baseline.get("options") != current.get("options"):
+        print("Warning: the two runs used different dataset options; timings may not be comparable")
+    print(f"Comparing {current['timestamp']} ({current.get('revision')}) against {baseline['timestamp']} ({baseline.get('revision')})")
+    for r in regressions:
+        print(
+            f"REGRESSION {r['benchmark']:<28} rows={r['rows']:<9} "
+            f"{r['baseline_seconds']:.4f}s -> {r['current_seconds']:.4f}s ({r['change']:+.1%})"
+        )
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%}")
+        return 0
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,834 @@
+import logging
+import time
+import warnings
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from column_profile import missing_mask
+from divider import divider
+from encoding import label_encode_series
+from finalize_types import _timeonly_hint, infer_datetime_plan, parse_datetime
+from outliers_removal import _outlier_bounds
+from main import _normalize_options, log_file, plan_column_pushdown
+from run_log import with_run_log
+
+# Out-of-core (chunked) execution of the PrismaFlow pipeline.
+#
+# Every step learns its parameters in a statistics scan over the file
+# (one scan per group of dependent steps), then a final pass applies the
+# learned state chunk by chunk and appends the result to the output file.
+# Peak memory is driven by the chunk size; only per-column aggregates,
+# bounded samples and category vocabularies are kept across chunks.
+
+_DEFAULT_CHUNK_SIZE = 100_000
+_DEFAULT_SAMPLE_SIZE = 100_000
+_DATETIME_SAMPLE_SIZE = 2_000
+_DEFAULT_OUTLIER_PARAMS = {"iqr": 1.5, "zscore": 3.0, "modified_zscore": 3.5}
+_VARIANCE_THRESHOLD = 0.01
+_CORRELATION_THRESHOLD = 0.9
+
+# Order in which the learned state is applied to a chunk
+_APPLY_ORDER = (
+    "columns",
+    "handle_nulls",
+    "finalize_dtypes",
+    "handle_outliers",
+    "encoding",
+    "feature_selection",
+    "temporal_features",
+    "scaling",
+)
+
+
+def _to_python(value):
+    # Keep the fitted state JSON friendly (numpy scalars -> python scalars)
+    if hasattr(value, "item"):
+        try:
+            return value.item()
+        except Exception:
+            pass
+    return value
+
+
+def _sorted_levels(values):
+    try:
+        return sorted(values)
+    except TypeError:
+        return sorted(values, key=str)
+
+
+def _numeric_columns(df, exclude):
+    return [c for c in df.select_dtypes(include=[np.number]).columns.tolist() if c not in exclude]
+
+
+def _float_block(df, cols):
+    block = df.reindex(columns=cols)
+    if not all(is_numeric_dtype(block[c]) for c in cols):
+        block = block.apply(pd.to_numeric, errors="coerce")
+    return block.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _merge_moments(acc, values):
+    """
+    Merge a chunk's column values into running (count, mean, M2, min, max) arrays
+    using the parallel variance formula, ignoring NaNs.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        n_b = np.sum(~np.isnan(values), axis=0).astype("float64")
+        mean_b = np.where(n_b > 0, np.nanmean(values, axis=0), 0.0)
+        m2_b = np.where(n_b > 0, np.nansum((values - mean_b) ** 2, axis=0), 0.0)
+        min_b = np.nanmin(values, axis=0) if len(values) else np.full(values.shape[1], np.nan)
+        max_b = np.nanmax(values, axis=0) if len(values) else np.full(values.shape[1], np.nan)
+
+    if acc is None:
+        return {"n": n_b, "mean": mean_b, "m2": m2_b, "min": min_b, "max": max_b}
+
+    n = acc["n"] + n_b
+    delta = mean_b - acc["mean"]
+    safe_n = np.where(n > 0, n, 1.0)
+    acc["mean"] = acc["mean"] + delta * n_b / safe_n
+    acc["m2"] = acc["m2"] + m2_b + delta**2 * acc["n"] * n_b / safe_n
+    acc["n"] = n
+    acc["min"] = np.fmin(acc["min"], min_b)
+    acc["max"] = np.fmax(acc["max"], max_b)
+    return acc
+
+
+def _reservoir_update(reservoir, values, k, rng):
+    """
+    Bottom-k sampling: every value gets a random key and the k smallest keys
+    seen so far are kept, which is a uniform sample of the whole column.
+    """
+    values = values[~np.isnan(values)]
+    keys = rng.random(len(values))
+    if reservoir is not None:
+        keys = np.concatenate([reservoir[0], keys])
+        values = np.concatenate([reservoir[1], values])
+    if k is not None and len(values) > k:
+        idx = np.argpartition(keys, k)[:k]
+        keys, values = keys[idx], values[idx]
+    return keys, values
+
+
+# ---------------- APPLYING THE FITTED STATE ----------------
+
+def _apply_columns(df, state, counters):
+    drop = [c for c in state["manual_drop"] + state["empty_drop"] if c in df.columns]
+    return df.drop(columns=drop) if drop else df
+
+
+def _apply_nulls(df, state, counters):
+    subset = [c for c in state["null_drop_subset"] if c in df.columns]
+    if subset:
+        keep_mask = df[subset].notna().all(axis=1)
+        dropped = int((~keep_mask).sum())
+        if dropped:
+            df = df[keep_mask]
+            counters["rows_dropped_nulls"] += dropped
+
+    fills = {c: v for c, v in state["null_fill"].items() if c in df.columns}
+    if fills:
+        df = df.fillna(fills)
+    return df
+
+
+def _apply_dtypes(df, state, counters):
+    for col, plan in state["dtypes"].items():
+        if col not in df.columns:
+            continue
+        kind = plan["kind"]
+        if kind == "numeric":
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        elif kind == "datetime":
+            parsed = parse_datetime(df[col], plan)
+            df[col] = parsed.dt.tz_convert(None).astype("datetime64[ns]")
+        else:
+            df[col] = df[col].astype("string")
+    return df
+
+
+def _apply_outliers(df, state, counters):
+    bounds = state["outlier_bounds"]
+    cols = [c for c in bounds if c in df.columns and is_numeric_dtype(df[c])]
+    if not cols or len(df) == 0:
+        return df
+
+    lower = np.array([bounds[c][0] for c in cols], dtype="float64")
+    upper = np.array([bounds[c][1] for c in cols], dtype="float64")
+    block = _float_block(df, cols)
+    with np.errstate(invalid="ignore"):
+        below = block < lower
+        above = block > upper
+
+    if state["options"]["outlier_drop"]:
+        mask = (below | above).any(axis=1)
+        dropped = int(mask.sum())
+        if dropped:
+            df = df[~mask]
+            counters["rows_dropped_outliers"] += dropped
+            counters["outliers_removed"] += dropped
+    else:
+        capped = int(below.sum() + above.sum())
+        if capped:
+            df[cols] = df[cols].clip(lower=lower, upper=upper, axis=1)
+            counters["outliers_removed"] += capped
+    return df
+
+
+def _apply_encoding(df, state, counters):
+    vocab = {c: v for c, v in state["encoding_vocab"].items() if c in df.columns}
+    if not vocab:
+        return df
+
+    if state["options"]["encoding_method"] == "label":
+        for col, levels in vocab.items():
+            df[col] = label_encode_series(df[col], levels)[0]
+        return df
+
+    for col, levels in vocab.items():
+        # Unseen levels get no dummy column (all False)
+        df[col] = pd.Categorical(df[col].where(df[col].isin(levels)), categories=levels)
+    return pd.get_dummies(df, columns=list(vocab), drop_first=False)
+
+
+def _apply_selection(df, state, counters):
+    drop = [c for c in state["selection_drop"] if c in df.columns]
+    return df.drop(columns=drop) if drop else df
+
+
+def _apply_temporal(df, state, counters):
+    new_cols = {}
+    originals = []
+    for col in state["datetime_cols"]:
+        if col not in df.columns:
+            continue
+        dt = pd.to_datetime(df[col], errors="coerce").dt
+        new_cols[f"{col}_year"] = dt.year
+        new_cols[f"{col}_month"] = dt.month
+        new_cols[f"{col}_day"] = dt.day
+        new_cols[f"{col}_hour"] = dt.hour
+        new_cols[f"{col}_minute"] = dt.minute
+        new_cols[f"{col}_second"] = dt.second
+        new_cols[f"{col}_weekday"] = dt.weekday
+        originals.append(col)
+
+    for col in state["time_cols"]:
+        if col not in df.columns:
+            continue
+        dt = pd.to_datetime(df[col], format="%H:%M:%S", errors="coerce").dt
+        new_cols[f"{col}_hour"] = dt.hour
+        new_cols[f"{col}_minute"] = dt.minute
+        new_cols[f"{col}_second"] = dt.second
+        originals.append(col)
+
+    if not new_cols:
+        return df
+    df = df.drop(columns=originals)
+    return pd.concat([df, pd.DataFrame(new_cols, index=df.index)], axis=1)
+
+
+def _apply_scaling(df, state, counters):
+    params = state["scaler"]
+    cols = [c for c in params if c in df.columns]
+    if not cols or len(df) == 0:
+        return df
+    center = np.array([params[c][0] for c in cols], dtype="float64")
+    scale = np.array([params[c][1] for c in cols], dtype="float64")
+    scaled = (_float_block(df, cols) - center) / scale
+    df[cols] = pd.DataFrame(scaled, columns=cols, index=df.index)
+    return df
+
+
+_APPLIERS = {
+    "columns": _apply_columns,
+    "handle_nulls": _apply_nulls,
+    "finalize_dtypes": _apply_dtypes,
+    "handle_outliers": _apply_outliers,
+    "encoding": _apply_encoding,
+    "feature_selection": _apply_selection,
+    "temporal_features": _apply_temporal,
+    "scaling": _apply_scaling,
+}
+
+
+def apply_pipeline_state(df, state, stop_before=None, counters=None):
+    """
+    Transform one chunk with a fitted state, without learning anything from it.
+
+    stop_before: name of a step in _APPLY_ORDER; the chunk is returned as it looks
+    right before that step runs (used while fitting later steps).
+    counters: optional dict collecting rows_dropped_nulls, rows_dropped_outliers
+    and outliers_removed across chunks.
+    """
+    if counters is None:
+        counters = Counter()
+    df = df.copy()
+    for step in _APPLY_ORDER:
+        if step == stop_before:
+            return df
+        df = _APPLIERS[step](df, state, counters)
+
+    target_col = state["target_col"]
+    if target_col is not None and target_col in df.columns:
+        df[target_col] = df.pop(target_col)
+    return df
+
+
+# ---------------- FITTING THE STATE ----------------
+
+def _scan_raw_stats(make_chunks, exclude, enabled_steps):
+    n_rows = 0
+    columns = None
+    stats = {}
+    track_timeonly = "temporal_features" in enabled_steps
+
+    for chunk in make_chunks():
+        if columns is None:
+            columns = chunk.columns.tolist()
+            for col in columns:
+                stats[col] = {
+                    "null": 0,
+                    "empty": 0,
+                    "all_numeric_dtype": True,
+                    "non_numeric": 0,
+                    "sum": 0.0,
+                    "count": 0,
+                    "sample": [],
+                    "timeonly": track_timeonly,
+                }
+        n_rows += len(chunk)
+
+        for col in columns:
+            if col in exclude or col not in chunk.columns:
+                continue
+            s = chunk[col]
+            st = stats[col]
+            null_mask = s.isna()
+            st["null"] += int(null_mask.sum())
+
+            if is_numeric_dtype(s):
+                st["empty"] += int(null_mask.sum())
+                st["sum"] += float(s.sum(skipna=True))
+                st["count"] += int((~null_mask).sum())
+                continue
+
+            st["all_numeric_dtype"] = False
+            st["empty"] += int(missing_mask(s).sum())
+
+            non_null = s[~null_mask]
+            numeric = pd.to_numeric(non_null, errors="coerce")
+            st["non_numeric"] += int(numeric.isna().sum())
+
+            if len(st["sample"]) < _DATETIME_SAMPLE_SIZE:
+                st["sample"].extend(non_null.head(_DATETIME_SAMPLE_SIZE - len(st["sample"])).tolist())
+
+            if st["timeonly"] and len(non_null):
+                head = non_null.astype(str).head(50)
+                if not head.str.match(_timeonly_hint).all():
+                    st["timeonly"] = False
+                else:
+                    parsed = pd.to_datetime(non_null, format="%H:%M:%S", errors="coerce")
+                    st["timeonly"] = bool(parsed.notna().all())
+
+    return n_rows, (columns or []), stats
+
+
+def _count_values(make_chunks, columns):
+    # Value counts of only the columns that need a mode fill, so memory grows with
+    # their cardinality rather than with that of every text column in the file
+    counts = {col: Counter() for col in columns}
+    if not counts:
+        return counts
+    for chunk in make_chunks():
+        for col in columns:
+            if col in chunk.columns:
+                counts[col].update(chunk[col].dropna().value_counts().to_dict())
+    return counts
+
+
+def _fit_columns_nulls_dtypes(state, make_chunks, n_rows, columns, stats, manual_columns, keep, options, not_loaded=()):
+    enabled_steps = options["enabled_steps"]
+    target_col = state["target_col"]
+    protected = {target_col} if target_col is not None else set()
+
+    remaining = list(columns)
+
+    if "manual_columns" in enabled_steps and manual_columns:
+        logging.info("=== MANUAL REMOVAL OF COLUMNS STARTED ===")
+        for col in [str(c).strip() for c in manual_columns if str(c).strip()]:
+            if col in keep or col in protected:
+                logging.info(f'Kept column "{col}" (skip manual removal)')
+            elif col in remaining:
+                state["manual_drop"].append(col)
+                remaining.remove(col)
+                logging.info(f'Removed column "{col}"')
+            elif col in not_loaded and col not in state["manual_drop"]:
+                state["manual_drop"].append(col)
+                logging.info(f'Removed column "{col}" (not loaded)')
+            else:
+                logging.warning(f'Column "{col}" not found, skipping')
+        logging.info("=== MANUAL REMOVAL OF COLUMNS COMPLETED ===")
+        divider()
+
+    if "drop_empty_columns" in enabled_steps:
+        logging.info("=== AUTO REMOVAL OF EMPTY COLUMNS STARTED ===")
+        for col in list(remaining):
+            if col in protected or n_rows <= 0:
+                continue
+            empty_ratio = stats[col]["empty"] / n_rows
+            if empty_ratio >= 0.95:
+                logging.info(f'Column "{col}" is empty in {empty_ratio:.1%} rows')
+                state["empty_drop"].append(col)
+                remaining.remove(col)
+        divider()
+        logging.info(f"Total dropped columns: {len(state['empty_drop'])}")
+        logging.info("=== AUTO REMOVAL OF EMPTY COLUMNS COMPLETED ===")
+        divider()
+
+    if "handle_nulls" in enabled_steps and n_rows > 0:
+        logging.info("=== AUTO REMOVAL OF NULL VALUES STARTED ===")
+        mode_counts = _count_values(
+            make_chunks,
+            [
+                col for col in remaining
+                if col not in keep and col not in protected
+                and stats[col]["null"] / n_rows > options["null_threshold"]
+                and not stats[col]["all_numeric_dtype"]
+            ],
+        )
+        for col in remaining:
+            if col in keep or col in protected:
+                continue
+            st = stats[col]
+            if st["null"] / n_rows > options["null_threshold"]:
+                if st["all_numeric_dtype"]:
+                    fill_value = (st["sum"] / st["count"]) if st["count"] else np.nan
+                    state["null_fill"][col] = float(fill_value)
+                    logging.info(f"Filled with the mean - {round(fill_value, 2)} of the column \"{col}\"")
+                else:
+                    counts = mode_counts[col]
+                    if counts:
+                        top = max(counts.values())
+                        fill_value = _sorted_levels([v for v, n in counts.items() if n == top])[0]
+                    else:
+                        fill_value = ""
+                    state["null_fill"][col] = _to_python(fill_value)
+                    logging.info(f"Filled with the mode - {fill_value} of the column \"{col}\"")
+            elif st["null"] > 0:
+                state["null_drop_subset"].append(col)
+                logging.info(f"Dropping rows with nulls from the column \"{col}\" ({st['null']} in the raw file)")
+        logging.info("=== AUTO REMOVAL OF NULL VALUES COMPLETED ===")
+        divider()
+
+    if "finalize_dtypes" in enabled_steps:
+        logging.info("=== DTYPE FINALIZATION STARTED ===")
+        for col in remaining:
+            if col in keep or col in protected:
+                continue
+            st = stats[col]
+            if st["all_numeric_dtype"]:
+                logging.info(f'Column "{col}" kept as numeric')
+                continue
+
+            fill_value = state["null_fill"].get(col)
+            fill_is_numeric = fill_value is None or not pd.isna(pd.to_numeric(pd.Series([fill_value]), errors="coerce")[0])
+            if st["non_numeric"] == 0 and fill_is_numeric:
+                state["dtypes"][col] = {"kind": "numeric"}
+                logging.info(f'Converted Column "{col}" to numeric')
+                continue
+
+            try:
+                sample = pd.Series(st["sample"], dtype="object").astype(str).str.strip()
+                plan = infer_datetime_plan(sample, col)
+            except Exception:
+                plan = None
+            if plan is not None:
+                state["dtypes"][col] = {"kind": "datetime", **plan}
+                logging.info(f'Converted column "{col}" to datetime64[ns] (format: {plan["format"] or "mixed"})')
+            else:
+                state["dtypes"][col] = {"kind": "string"}
+                logging.info(f'Kept Column "{col}" as string')
+        logging.info("=== DTYPE FINALIZATION COMPLETED ===")
+        divider()
+
+    state["timeonly_candidates"] = [
+        c for c in remaining if stats[c]["timeonly"] and c not in keep and c not in protected
+    ]
+
+
+def _fit_outliers(state, make_chunks, options, sample_size, rng):
+    method = options["outlier_method"]
+    param = options["outlier_param"]
+    if param is None:
+        param = _DEFAULT_OUTLIER_PARAMS[method]
+
+    exclude = set(options["outlier_skipping"])
+    if state["target_col"] is not None:
+        exclude.add(state["target_col"])
+
+    moments = {}
+    reservoirs = {}
+    for chunk in make_chunks():
+        df = apply_pipeline_state(chunk, state, stop_before="handle_outliers")
+        cols = _numeric_columns(df, exclude)
+        if not cols:
+            continue
+        block = _float_block(df, cols)
+        if method == "zscore":
+            for j, col in enumerate(cols):
+                moments[col] = _merge_moments(moments.get(col), block[:, j : j + 1])
+        else:
+            for j, col in enumerate(cols):
+                reservoirs[col] = _reservoir_update(reservoirs.get(col), block[:, j], sample_size, rng)
+
+    logging.info("=== OUTLIER HANDLING STARTED ===")
+    logging.info(f"Method : {method} (parameter={param}, action={'remove' if options['outlier_drop'] else 'cap'})")
+
+    bounds = {}
+    if method == "zscore":
+        for col, acc in moments.items():
+            n = float(acc["n"][0])
+            if n <= 0:
+                continue
+            mean = float(acc["mean"][0])
+            std = float(np.sqrt(acc["m2"][0] / n))
+            if std == 0 or np.isnan(std):
+                continue
+            bounds[col] = [mean - param * std, mean + param * std]
+    else:
+        for col, (_, values) in reservoirs.items():
+            if len(values) == 0:
+                continue
+            lower, upper = _outlier_bounds(values.reshape(-1, 1), method, param, param, param)
+            if np.isnan(lower[0]) or np.isnan(upper[0]):
+                continue
+            bounds[col] = [float(lower[0]), float(upper[0])]
+
+    for col, (lower, upper) in bounds.items():
+        logging.info(f'Bounds for column "{col}": [{round(lower, 4)}, {round(upper, 4)}]')
+    state["outlier_bounds"] = bounds
+    logging.info("=== OUTLIER HANDLING COMPLETED ===")
+    divider()
+
+
+def _fit_encoding(state, make_chunks, keep, options):
+    exclude = set(keep)
+    if state["target_col"] is not None:
+        exclude.add(state["target_col"])
+
+    method = options["encoding_method"]
+    levels = {}
+    for chunk in make_chunks():
+        df = apply_pipeline_state(chunk, state, stop_before="encoding")
+        cols = [
+            c for c in df.select_dtypes(include=["object", "category", "string"]).columns.tolist()
+            if c not in exclude
+        ]
+        for col in cols:
+            if method == "label":
+                values = label_encode_series(df[col])[1]
+            else:
+                values = df[col].dropna().unique().tolist()
+            levels.setdefault(col, set()).update(values)
+
+    logging.info("=== ENCODING STARTED ===")
+    logging.info(f"Columns selected for encoding: {list(levels)}")
+    logging.info(f"Method : {'Label Encoding' if method == 'label' else 'One-Hot Encoding'}")
+    state["encoding_vocab"] = {col: [_to_python(v) for v in _sorted_levels(vals)] for col, vals in levels.items()}
+    for col, vals in state["encoding_vocab"].items():
+        logging.info(f'Learned {len(vals)} categories for column "{col}"')
+    logging.info("=== ENCODING COMPLETED ===")
+    divider()
+
+
+def _fit_selection_and_scaling(state, make_chunks, keep, options):
+    enabled_steps = options["enabled_steps"]
+    target_col = state["target_col"]
+    protected = {target_col} if target_col is not None else set()
+    selection_exclude = set(keep) | protected
+    scaling_exclude = set(options["scaling_skipping"]) | protected
+
+    sel_cols = None
+    shift = None
+    sel_acc = None
+    cross = None
+    scale_cols = None
+    scale_acc = None
+
+    for chunk in make_chunks():
+        df = apply_pipeline_state(chunk, state, stop_before="feature_selection")
+
+        if sel_cols is None:
+            sel_cols = _numeric_columns(df, selection_exclude) if "feature_selection" in enabled_steps else []
+            if "temporal_features" in enabled_steps:
+                temporal_exclude = set(keep)
+                state["datetime_cols"] = [
+                    c for c in df.select_dtypes(include=["datetime64"]).columns.tolist() if c not in temporal_exclude
+                ]
+                object_cols = set(df.select_dtypes(include=["object"]).columns.tolist())
+                state["time_cols"] = [c for c in state["timeonly_candidates"] if c in object_cols]
+
+        if sel_cols:
+            block = _float_block(df, sel_cols)
+            if shift is None:
+                # Shift by the first chunk's means to keep the cross products well conditioned
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", category=RuntimeWarning)
+                    shift = np.nan_to_num(np.nanmean(block, axis=0)) if len(block) else np.zeros(len(sel_cols))
+                cross = np.zeros((len(sel_cols), len(sel_cols)))
+                sel_acc = {"n": 0, "sum": np.zeros(len(sel_cols))}
+            centered = np.nan_to_num(block - shift)
+            cross += centered.T @ centered
+            sel_acc["sum"] += centered.sum(axis=0)
+            sel_acc["n"] += len(centered)
+
+        if "scaling" in enabled_steps:
+            df = _apply_temporal(df, state, Counter())
+            if scale_cols is None:
+                scale_cols = _numeric_columns(df, scaling_exclude)
+            if scale_cols:
+                scale_acc = _merge_moments(scale_acc, _float_block(df, scale_cols))
+
+    if "feature_selection" in enabled_steps:
+        logging.info("=== FEATURE SELECTION STARTED ===")
+        selection_drop = []
+        if sel_cols and sel_acc["n"] > 0:
+            n = float(sel_acc["n"])
+            mean = sel_acc["sum"] / n
+            cov = cross / n - np.outer(mean, mean)
+            variances = np.diag(cov).copy()
+
+            keep_var = variances > _VARIANCE_THRESHOLD
+            removed_var = [c for c, k in zip(sel_cols, keep_var) if not k]
+            logging.info(f"Variance Threshold Removed Columns: {removed_var}")
+
+            idx = np.flatnonzero(keep_var)
+            std = np.sqrt(variances[idx])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                corr = np.abs(cov[np.ix_(idx, idx)] / np.outer(std, std))
+            upper = np.triu(corr, k=1)
+            upper = np.where(np.isnan(upper), 0.0, upper)
+            removed_corr = [sel_cols[idx[j]] for j in range(len(idx)) if (upper[:, j] > _CORRELATION_THRESHOLD).any()]
+            logging.info(f"Correlation Removed Columns: {removed_corr}")
+            selection_drop = removed_var + removed_corr
+        else:
+            logging.warning("No numeric columns found for feature selection")
+        state["selection_drop"] = selection_drop
+        logging.info("=== FEATURE SELECTION COMPLETED ===")
+        divider()
+
+    if "scaling" in enabled_steps:
+        logging.info("=== SCALING STARTED")
+        method = options["scaling_method"]
+        dropped = set(state["selection_drop"])
+        scaler = {}
+        for j, col in enumerate(scale_cols or []):
+            if col in dropped or scale_acc is None or scale_acc["n"][j] <= 0:
+                continue
+            if method == "minmax":
+                center = float(scale_acc["min"][j])
+                scale = float(scale_acc["max"][j] - scale_acc["min"][j])
+            else:
+                center = float(scale_acc["mean"][j])
+                scale = float(np.sqrt(scale_acc["m2"][j] / scale_acc["n"][j]))
+            if scale == 0 or np.isnan(scale):
+                scale = 1.0
+            scaler[col] = [center, scale]
+        state["scaler"] = scaler
+        logging.info(f"Columns selected for scaling: {list(scaler)}")
+        logging.info("=== SCALING COMPLETED ===")
+        divider()
+
+
+def fit_pipeline_state(
+    make_chunks,
+    target_col=None,
+    manual_columns=None,
+    columns_to_keep=None,
+    sample_size=_DEFAULT_SAMPLE_SIZE,
+    random_state=0,
+    columns_not_loaded=None,
+    **options,
+):
+    """
+    Learn every step's parameters from a stream of chunks.
+
+    make_chunks: callable returning a fresh iterable of DataFrame chunks; it is
+    called once per statistics scan.
+    sample_size: number of values per column kept for quantile based outlier
+    bounds (IQR, modified Z-score); None keeps every value, which makes the
+    bounds exact.
+    columns_not_loaded: manual_columns the chunks were read without (see
+    main.plan_column_pushdown); they are recorded as manual drops.
+    Remaining keyword arguments are the prismaflow_pipeline options.
+    """
+    options = _normalize_options(**options)
+    # Rows are always judged against all columns at once here
+    options.pop("outlier_simultaneous")
+    enabled_steps = options["enabled_steps"]
+    keep = list(columns_to_keep or [])
+    rng = np.random.default_rng(random_state)
+
+    state = {
+        "options": {**options, "enabled_steps": sorted(enabled_steps)},
+        "target_col": target_col,
+        "columns_to_keep": keep,
+        "manual_drop": [],
+        "empty_drop": [],
+        "null_drop_subset": [],
+        "null_fill": {},
+        "dtypes": {},
+        "timeonly_candidates": [],
+        "outlier_bounds": {},
+        "encoding_vocab": {},
+        "selection_drop": [],
+        "datetime_cols": [],
+        "time_cols": [],
+        "scaler": {},
+    }
+
+    protected = {target_col} if target_col is not None else set()
+    n_rows, columns, stats = _scan_raw_stats(make_chunks, protected, enabled_steps)
+    if target_col is not None and target_col not in columns:
+        raise ValueError(f"Target column '{target_col}' not found in dataframe.")
+    state["columns_in"] = columns
+    state["rows_in"] = n_rows
+
+    _fit_columns_nulls_dtypes(state, make_chunks, n_rows, columns, stats, manual_columns, keep, options, set(columns_not_loaded or ()))
+    del stats
+
+    if options["handle_outliers"] and "handle_outliers" in enabled_steps:
+        _fit_outliers(state, make_chunks, options, sample_size, rng)
+
+    if "encoding" in enabled_steps:
+        _fit_encoding(state, make_chunks, keep, options)
+
+    if enabled_steps & {"feature_selection", "temporal_features", "scaling"}:
+        _fit_selection_and_scaling(state, make_chunks, keep, options)
+
+    return state
+
+
+@with_run_log(log_file)
+def prismaflow_pipeline_chunked(
+    input_path,
+    chunk_size=_DEFAULT_CHUNK_SIZE,
+    target_col=None,
+    manual_columns=None,
+    outlier_skipping=None,
+    columns_to_keep=None,
+    scaling_skipping=None,
+    handle_outliers=True,
+    outlier_method="iqr",
+    outlier_drop=True,
+    outlier_param=None,
+    null_threshold=0.05,
+    encoding_method="label",
+    steps=None,
+    scaling_method="standard",
+    output_file="processed_dataset.csv",
+    collect_metrics=False,
+    mode="preprocessing",
+    sample_size=_DEFAULT_SAMPLE_SIZE,
+):
+    """
+    Out-of-core variant of prismaflow_pipeline for CSV files that do not fit in memory.
+
+    The file is read in chunks of chunk_size rows. Statistics scans learn the
+    parameters of every enabled step, then a final pass transforms each chunk and
+    appends it to output_file. Rows are judged against statistics of the whole
+    file, so null and outlier filtering apply all columns at once instead of one
+    column after another.
+    """
+    mode_label = "Cleaning" if mode == "cleaning" else "Preprocessing"
+    logging.info(f"{mode_label} Initiated")
+    logging.info(f"Chunked mode: {input_path} ({chunk_size} rows per chunk)")
+    start_time = time.time()
+    divider()
+
+    # Manually removed columns are never parsed; once fitted, neither are the empty ones
+    skip = set(
+        plan_column_pushdown(
+            pd.read_csv(input_path, nrows=0).columns.tolist(),
+            target_col=target_col,
+            manual_columns=manual_columns,
+            columns_to_keep=columns_to_keep,
+            steps=steps,
+        )
+    )
+    columns_not_loaded = sorted(skip)
+
+    def make_chunks():
+        usecols = (lambda c: c not in skip) if skip else None
+        return pd.read_csv(input_path, chunksize=chunk_size, usecols=usecols)
+
+    state = fit_pipeline_state(
+        make_chunks,
+        target_col=target_col,
+        manual_columns=manual_columns,
+        columns_to_keep=columns_to_keep,
+        columns_not_loaded=columns_not_loaded,
+        sample_size=sample_size,
+        outlier_skipping=outlier_skipping,
+        scaling_skipping=scaling_skipping,
+        handle_outliers=handle_outliers,
+        outlier_method=outlier_method,
+        outlier_drop=outlier_drop,
+        outlier_param=outlier_param,
+        null_threshold=null_threshold,
+        encoding_method=encoding_method,
+        steps=steps,
+        scaling_method=scaling_method,
+    )
+
+    skip.update(state["empty_drop"])
+
+    counters = Counter()
+    rows_out = 0
+    cols_out = 0
+    wrote_header = False
+    for chunk in make_chunks():
+        df = apply_pipeline_state(chunk, state, counters=counters)
+        rows_out += len(df)
+        cols_out = df.shape[1]
+        if output_file:
+            df.to_csv(output_file, index=False, mode="a" if wrote_header else "w", header=not wrote_header)
+            wrote_header = True
+
+    if output_file:
+        logging.info(f"Processed dataset exported to {output_file}")
+        divider()
+
+    time_elapsed = time.time() - start_time
+    logging.info("Pipeline completed successfully")
+    divider()
+    logging.info(f"Time elapsed: {round(time_elapsed, 2)} seconds")
+    divider()
+
+    if not collect_metrics:
+        return True
+
+    metrics = {
+        "time_processed_seconds": round(time_elapsed, 2),
+        "rows_dropped": counters["rows_dropped_nulls"] + counters["rows_dropped_outliers"],
+        "rows_dropped_nulls": counters["rows_dropped_nulls"],
+        "rows_dropped_outliers": counters["rows_dropped_outliers"],
+        "outliers_removed": counters["outliers_removed"],
+        "columns_removed_manual": len(state["manual_drop"]),
+        "columns_removed_empty": len(state["empty_drop"]),
+        "columns_removed_feature_selection": len(state["selection_drop"]),
+        "columns_removed_temporal": len(state["datetime_cols"]) + len(state["time_cols"]),
+        "rows_out": rows_out,
+        "cols_out": cols_out,
+    }
+    metrics["columns_removed"] = (
+        metrics["columns_removed_manual"]
+        + metrics["columns_removed_empty"]
+        + metrics["columns_removed_feature_selection"]
+        + metrics["columns_removed_temporal"]
+    )
+    return metrics
@@ -1,26 +1,30 @@
 import pandas as pd
 import logging
 from divider import divider
+from column_executor import ColumnExecutor
+from column_profile import missing_mask, profile_for
+from frame_delta import FrameDelta, apply_delta
 
 # Automatic Removal of Columns
 
-def clear_columns(df, exclude_cols=None, empty_threshold=0.95):
+def _empty_ratio(s):
+    # Treat NaN and blank strings as "empty"
+    return float(missing_mask(s).mean())
+
+
+def clear_columns(df, exclude_cols=None, empty_threshold=0.95, profile=None, not_loaded=None, executor=None, return_delta=False):
+    """
+    not_loaded: columns the caller already left out when reading the data because
+    the profile showed them empty (see main.plan_column_pushdown); they are
+    reported and counted as dropped.
+    executor: column_executor.ColumnExecutor (or mode name) measuring columns in parallel.
+    return_delta: return the frame_delta.FrameDelta instead of the new frame.
+    """
 
     logging.info(f"=== AUTO REMOVAL OF EMPTY COLUMNS STARTED ===")
 
     dropped_columns = 0
     exclude = set(exclude_cols or [])
-    missing_tokens = {
-        "",
-        "nan",
-        "none",
-        "null",
-        "na",
-        "n/a",
-        "nat",
-        "missing",
-        "nil",
-    }
 
     try:
         empty_threshold = float(empty_threshold)
@@ -30,27 +34,29 @@ def clear_columns(df, exclude_cols=None, empty_threshold=0.95):
 
     n_rows = int(df.shape[0]) if df is not None else 0
 
-    for column in list(df.columns):
-        if column in exclude:
-            continue
-
-        if n_rows <= 0:
-            continue
+    for column in not_loaded or []:
+        entry = (profile or {}).get(column) or {}
+        empty_ratio = entry["missing_count"] / entry["rows"] if entry.get("rows") else 1.0
+        logging.info('Column "%s" is empty in %.1f%% rows (not loaded)', column, empty_ratio * 100)
+        dropped_columns += 1
 
-        s = df[column]
-        # Treat NaN and blank strings as "empty"
-        empty_mask = s.isna()
-        if pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s):
-            norm = s.astype(str).str.strip().str.lower()
-            empty_mask = empty_mask | norm.isin(missing_tokens)
+    # Reuse the cached profile when it matches; the other columns are scanned on the executor
+    candidates = [c for c in df.columns if c not in exclude] if n_rows > 0 else []
+    unprofiled = [c for c in candidates if profile_for(profile, df, c) is None]
+    measured = dict(zip(unprofiled, ColumnExecutor.resolve(executor).map(_empty_ratio, (df[c] for c in unprofiled))))
 
-        empty_ratio = float(empty_mask.mean())
+    to_drop = []
+    for column in candidates:
+        if column in measured:
+            empty_ratio = measured[column]
+        else:
+            empty_ratio = profile_for(profile, df, column)["missing_count"] / n_rows
 
         if empty_ratio >= empty_threshold:
 
-            logging.info(f'Column "{column}" is empty in {empty_ratio:.1%} rows')
+            logging.info('Column "%s" is empty in %.1f%% rows', column, empty_ratio * 100)
 
-            df.drop(columns=[column], inplace=True)
+            to_drop.append(column)
 
             dropped_columns += 1
 
@@ -62,4 +68,5 @@ def clear_columns(df, exclude_cols=None, empty_threshold=0.95):
 
     divider()
 
-    return df
\ No newline at end of file
+    delta = FrameDelta(drop=to_drop)
+    return delta if return_delta else apply_delta(df, delta)
\ No newline at end of file
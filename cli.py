@@ -1,6 +1,8 @@
-import pandas as pd
+import os
 
-from main import prismaflow_pipeline
+from csv_ingest import dtype_hints, load_dtype_hints, save_dtype_hints
+from file_io import is_typed, read_columns, read_table, split_format
+from main import plan_column_pushdown, prismaflow_pipeline
 
 
 def _parse_csv_list(raw: str) -> list[str] | None:
@@ -10,17 +12,26 @@ def _parse_csv_list(raw: str) -> list[str] | None:
     items = [c.strip() for c in raw.split(",") if c.strip()]
     return items or None
 
-csv_file = input("Enter the csv file name (without .csv): ").strip()
+input_file = input("Enter the input file (.csv, .csv.gz, .parquet, .feather; no extension means .csv): ").strip()
 
-csv_path = f"{csv_file}.csv"
+input_path = input_file if split_format(input_file)[0] else f"{input_file}.csv"
 
-df = pd.read_csv(csv_path)
+load_columns = _parse_csv_list(input("Enter the columns to load, separated by commas (blank for all): "))
 
-print(df.head())
+hints_file = input("Enter a dtype hints JSON file, reused and refreshed on every run (blank for none): ").strip() or None
+
+hints = load_dtype_hints(hints_file) if hints_file and os.path.exists(hints_file) else None
+
+header = read_columns(input_path)
+
+if load_columns:
+    header = [c for c in header if c in set(load_columns)]
+
+print(f"Columns: {header}")
 
 target_col = input("Enter the target column (blank for none): ").strip()
 
-if target_col == "" or target_col not in df.columns:
+if target_col == "" or target_col not in header:
 
     target_col = None
 
@@ -30,10 +41,23 @@ outlier_skipping = _parse_csv_list(input("Enter the outlier skipping columns, se
 
 columns_to_keep = _parse_csv_list(input("Enter the columns to keep, separated by commas (blank for none): "))
 
+# Manually removed columns are never parsed
+columns_not_loaded = plan_column_pushdown(
+    header, target_col=target_col, manual_columns=manual_columns, columns_to_keep=columns_to_keep
+)
+
+df = read_table(input_path, columns=[c for c in header if c not in columns_not_loaded], dtype_hints=hints)
+
+if hints_file:
+    save_dtype_hints(hints_file, {**(hints or {}), **dtype_hints(df)})
+
+print(df.head())
+
 scaling_skipping = _parse_csv_list(input("Enter the scaling skipping columns, separated by commas (blank for none): "))
 
 outlier_method = input("Enter outlier method (iqr, zscore, modified_zscore) [iqr]: ").strip() or "iqr"
 outlier_action = input("Enter outlier action (skip, remove, cap) [remove]: ").strip() or "remove"
+outlier_simultaneous = input("Judge outliers on all columns at once? (y/N): ").strip().lower() in ("y", "yes")
 raw_outlier_param = input("Enter outlier method value (blank for default): ").strip()
 outlier_param = None
 if raw_outlier_param != "":
@@ -42,6 +66,11 @@ if raw_outlier_param != "":
     except Exception:
         outlier_param = None
 
+output_file = input("Enter the output file (.csv, .csv.gz, .parquet, .feather) [processed_dataset.csv]: ").strip() or "processed_dataset.csv"
+output_compression = input("Enter the output compression (blank for the format default): ").strip() or None
+
+trace_file = input("Enter a file name for the per-step trace JSON (blank for none): ").strip() or None
+
 ok = prismaflow_pipeline(
     df,
     target_col=target_col,
@@ -53,8 +82,13 @@ ok = prismaflow_pipeline(
     handle_outliers=(outlier_action != "skip"),
     outlier_drop=(outlier_action != "cap"),
     outlier_param=outlier_param,
-    output_file="processed_dataset.csv",
+    outlier_simultaneous=outlier_simultaneous,
+    output_file=output_file,
+    output_compression=output_compression,
+    infer_dtypes=not is_typed(input_path),
     return_df=False,
+    trace_file=trace_file,
+    columns_not_loaded=columns_not_loaded,
 )
 
 if ok is False:
@@ -0,0 +1,119 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import warnings
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+
+# Column-parallel Execution
+#
+# Per-column steps hand their independent column work to a ColumnExecutor and
+# get the results back in input order, so logs and outputs are the same in
+# every mode:
+#   serial    - a plain loop in the calling thread (default)
+#   threads   - a thread pool; helps where pandas/NumPy release the GIL
+#   processes - a process pool; columns are pickled to the workers and back,
+#               so it pays off for wide frames with expensive columns (datetime
+#               parsing, modes of text columns)
+# Work functions must be module-level and must not log; the step logs the
+# results in the calling thread. Pools are created on first use and shared by
+# every run with the same mode and worker count.
+#
+# Process workers start from a fork server, so a script that runs the pipeline
+# with executor="processes" needs the usual `if __name__ == "__main__":` guard.
+
+EXECUTORS = ("serial", "threads", "processes")
+
+# Imported once by the fork server, so each worker process starts warm
+_PRELOAD = ["numpy", "pandas", "clear_columns", "column_profile", "encoding", "finalize_types", "null_values", "temporal_features"]
+
+_lock = threading.Lock()
+_pools: dict = {}
+
+
+def _mp_context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(_PRELOAD)
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+
+def _shared_pool(kind, workers):
+    with _lock:
+        pool = _pools.get((kind, workers))
+        if pool is None:
+            if kind == "threads":
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prismaflow-column")
+            else:
+                pool = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context())
+            _pools[(kind, workers)] = pool
+        return pool
+
+
+class ColumnExecutor:
+    def __init__(self, kind="serial", workers=None):
+        kind = (kind or "serial").strip().lower()
+        if kind not in EXECUTORS:
+            raise ValueError(f"executor must be one of {EXECUTORS}, got {kind!r}")
+        try:
+            workers = int(workers) if workers else (os.cpu_count() or 1)
+        except (TypeError, ValueError):
+            workers = os.cpu_count() or 1
+        self.kind = kind
+        self.workers = max(1, workers)
+
+    @classmethod
+    def resolve(cls, executor=None, workers=None):
+        """
+        A ColumnExecutor from a mode name (or an existing ColumnExecutor); None means serial.
+        """
+        if isinstance(executor, cls):
+            return executor
+        return cls(executor, workers)
+
+    @property
+    def parallel(self) -> bool:
+        return self.kind != "serial" and self.workers > 1
+
+    def map(self, fn, *iterables):
+        """
+        Iterator over fn(*args) for args in zip(*iterables), in input order.
+        Serial mode computes each result as it is consumed, like a plain loop.
+        """
+        if not self.parallel:
+            for args in zip(*iterables):
+                yield fn(*args)
+            return
+
+        columns = list(zip(*zip(*iterables)))
+        if not columns or len(columns[0]) < 2:
+            for args in zip(*columns):
+                yield fn(*args)
+            return
+
+        pool = _shared_pool(self.kind, self.workers)
+        if self.kind == "threads":
+            # Work functions use catch_warnings, which swaps process-wide state;
+            # restoring it once here undoes any interleaving between threads. The
+            # results are collected inside the block so it never spans a yield.
+            with warnings.catch_warnings():
+                results = list(pool.map(fn, *columns))
+            yield from results
+            return
+        try:
+            yield from pool.map(fn, *columns)
+        except BrokenExecutor:
+            # A worker died (e.g. killed for memory); the next call starts a fresh pool
+            with _lock:
+                _pools.pop((self.kind, self.workers), None)
+            raise
+
+
+@atexit.register
+def _shutdown_pools() -> None:
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
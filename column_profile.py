@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+import warnings
+from pandas.api.types import is_bool_dtype, is_numeric_dtype, is_object_dtype, is_string_dtype
+
+# Column Profiling
+#
+# One pass per column computes everything the cleaning steps and the data
+# report need. The result is a plain dict (JSON friendly) so it can be cached
+# with the dataset and handed to clear_columns / clear_null_values / the web app.
+
+# Text values that count as "empty" besides real NaNs
+MISSING_TOKENS = {
+    "",
+    "nan",
+    "none",
+    "null",
+    "na",
+    "n/a",
+    "nat",
+    "missing",
+    "nil",
+}
+
+
+def _is_text(s):
+    return is_object_dtype(s) or is_string_dtype(s)
+
+
+def _text_missing(s):
+    """
+    Missing-token mask and distinct non-missing value count for a text column.
+    Values are factorized first so the strip/lower normalization runs once per
+    distinct value instead of once per cell.
+    """
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    norm = pd.Series(uniques, dtype="object").astype(str).str.strip().str.lower()
+    token_uniques = norm.isin(MISSING_TOKENS).to_numpy()
+    mask = codes < 0
+    if token_uniques.any():
+        mask = mask | (token_uniques[np.where(codes < 0, 0, codes)] & (codes >= 0))
+    return mask, int((~token_uniques).sum())
+
+
+def missing_mask(s):
+    """
+    Boolean array marking NaNs and, for text columns, missing tokens ("", "n/a", ...).
+    """
+    if _is_text(s):
+        return _text_missing(s)[0]
+    return s.isna().to_numpy()
+
+
+def is_sparse(s):
+    return isinstance(s.dtype, pd.SparseDtype)
+
+
+def sparse_stats(s):
+    """
+    count / mean / population variance / min / max of a sparse column, computed
+    from its stored values and fill value without densifying it.
+    """
+    arr = s.array
+    stored = np.asarray(arr.sp_values, dtype="float64")
+    stored = stored[~np.isnan(stored)]
+    fill = float(arr.fill_value) if not pd.isna(arr.fill_value) else np.nan
+    n_fill = len(arr) - len(arr.sp_values) if not np.isnan(fill) else 0
+
+    count = len(stored) + n_fill
+    if count == 0:
+        return {"count": 0, "mean": np.nan, "var": np.nan, "min": np.nan, "max": np.nan}
+
+    total = stored.sum() + fill * n_fill if n_fill else stored.sum()
+    mean = total / count
+    sq = ((stored - mean) ** 2).sum() + (((fill - mean) ** 2) * n_fill if n_fill else 0.0)
+    extremes = list(stored[[stored.argmin(), stored.argmax()]]) if len(stored) else []
+    if n_fill:
+        extremes.append(fill)
+    return {
+        "count": int(count),
+        "mean": float(mean),
+        "var": float(sq / count),
+        "min": float(min(extremes)),
+        "max": float(max(extremes)),
+    }
+
+
+def profile_series(s):
+    rows = int(len(s))
+    null_mask = s.isna().to_numpy()
+    entry = {
+        "rows": rows,
+        "null_count": int(null_mask.sum()),
+        "missing_count": int(null_mask.sum()),
+        "unique": 0,
+        "dtype": str(s.dtype),
+        "numeric": bool(is_numeric_dtype(s) and not is_bool_dtype(s)),
+        "mean": None,
+        "std": None,
+        "min": None,
+        "max": None,
+    }
+
+    if _is_text(s):
+        mask, unique = _text_missing(s)
+        entry["missing_count"] = int(mask.sum())
+        entry["unique"] = unique
+        return entry
+
+    try:
+        entry["unique"] = int(s.nunique(dropna=True))
+    except Exception:
+        entry["unique"] = 0
+
+    if entry["numeric"] and entry["null_count"] < rows and is_sparse(s):
+        stats = sparse_stats(s)
+        entry["mean"], entry["min"], entry["max"] = stats["mean"], stats["min"], stats["max"]
+        entry["std"] = float(np.sqrt(stats["var"] * stats["count"] / (stats["count"] - 1))) if stats["count"] > 1 else None
+    elif entry["numeric"] and entry["null_count"] < rows:
+        values = s.to_numpy(dtype="float64", na_value=np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            entry["mean"] = float(np.nanmean(values))
+            entry["std"] = float(np.nanstd(values, ddof=1)) if rows - entry["null_count"] > 1 else None
+            entry["min"] = float(np.nanmin(values))
+            entry["max"] = float(np.nanmax(values))
+    return entry
+
+
+def profile_columns(df):
+    """
+    Profile every column of df: null and missing-token counts, distinct values,
+    dtype and basic numeric stats. Returns {column name: profile dict}.
+    """
+    return {col: profile_series(df[col]) for col in df.columns}
+
+
+def profile_for(profile, df, col):
+    """
+    Cached profile entry for df[col], or None when the cache cannot be trusted
+    (unknown column or a different number of rows).
+    """
+    if not profile:
+        return None
+    entry = profile.get(col)
+    if entry is None or entry.get("rows") != int(len(df)):
+        return None
+    return entry
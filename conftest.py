@@ -0,0 +1,14 @@
+import pytest
+
+from run_log import finish_run_log, start_run_log
+
+
+@pytest.fixture
+def scratch_run_log():
+    """
+    Keep pipeline runs in a test from rewriting logs.txt: they log into this
+    thread's run sink, which has no file (see run_log.with_run_log).
+    """
+    sink = start_run_log(None)
+    yield sink
+    finish_run_log(sink)
@@ -0,0 +1,311 @@
+import codecs
+import io
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_float_dtype, is_integer_dtype
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pc = None
+    pa_csv = None
+
+# CSV Ingestion
+#
+# CSV files are parsed with pyarrow's multi-threaded reader when it is
+# installed, so a large file is split into blocks parsed on every core; the
+# pandas C parser (single-threaded) is the fallback for inputs pyarrow cannot
+# take (zip / xz archives, duplicate or blank header names, malformed rows).
+# Either way the result matches what pandas.read_csv returns by default:
+# datetimes and times stay text (finalize_dtypes decides about those), empty
+# columns come back as float NaN and a header without rows as object columns.
+# Floats are parsed exactly by both readers (pandas' default fast parser can be
+# off by one unit in the last place).
+#
+# The encoding is detected once from a prefix of the file instead of parsing
+# the whole file and retrying on UnicodeDecodeError. Dtype hints (from the
+# profile of an earlier upload or a hints file saved by a previous run) skip
+# type inference for the hinted columns; hints that no longer fit the data
+# are dropped and the file is parsed again without them.
+
+ENCODING_PREFIX_BYTES = 64 * 1024
+
+# pandas.read_csv's default missing-value markers
+NA_VALUES = [
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+]
+
+# Compressions pyarrow can stream; the rest go to the pandas parser
+_ARROW_COMPRESSIONS = {None: None, "gzip": "gzip", "bz2": "bz2", "zstd": "zstd"}
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def arrow_available() -> bool:
+    return pa_csv is not None
+
+
+def detect_encoding(prefix: bytes) -> str:
+    """
+    Encoding of a CSV judged from its first bytes: a byte order mark wins, then
+    UTF-8 if the prefix decodes as UTF-8, else latin-1 (which accepts any byte).
+    """
+    for bom, name in _BOMS:
+        if prefix.startswith(bom):
+            return name
+    try:
+        # The prefix may end in the middle of a multi-byte character
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin1"
+
+
+def _open_stream(source, compression):
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    if hasattr(source, "read"):
+        source.seek(0)
+        if compression is None:
+            return source
+        return pa.CompressedInputStream(pa.PythonFile(source, mode="r"), _ARROW_COMPRESSIONS[compression])
+    return pa.input_stream(source, compression=_ARROW_COMPRESSIONS[compression])
+
+
+def _read_prefix(source, compression, size=ENCODING_PREFIX_BYTES) -> bytes:
+    if pa is not None and compression in _ARROW_COMPRESSIONS:
+        stream = _open_stream(source, compression)
+        try:
+            return bytes(stream.read(size))
+        finally:
+            if not isinstance(source, (bytes, bytearray)) and hasattr(source, "read"):
+                source.seek(0)
+    # pandas' own decompression handles every codec, at the cost of a wrapper object
+    from pandas.io.common import get_handle
+
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    with get_handle(source, "rb", compression=compression, is_text=False) as handles:
+        data = handles.handle.read(size)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return data
+
+
+# ---------------- DTYPE HINTS ----------------
+
+def _hint_for(dtype_name: str) -> str | None:
+    try:
+        dtype = pd.api.types.pandas_dtype(dtype_name)
+    except TypeError:
+        return None
+    if is_bool_dtype(dtype):
+        return "bool"
+    if is_integer_dtype(dtype):
+        return "int64"
+    if is_float_dtype(dtype):
+        return "float64"
+    if is_datetime64_any_dtype(dtype) or dtype_name in ("str", "string", "object"):
+        # In a CSV these are text until finalize_dtypes parses them
+        return "str"
+    return None
+
+
+def dtype_hints(source) -> dict:
+    """
+    {column: "bool" | "int64" | "float64" | "str"} from a DataFrame or a column
+    profile (column_profile.profile_columns); columns of other types get no hint.
+    """
+    if isinstance(source, pd.DataFrame):
+        names = {str(c): str(source[c].dtype) for c in source.columns}
+    else:
+        names = {str(c): str((p or {}).get("dtype", "")) for c, p in (source or {}).items()}
+    hints = {}
+    for col, name in names.items():
+        hint = _hint_for(name)
+        if hint is not None:
+            hints[col] = hint
+    return hints
+
+
+def save_dtype_hints(path, hints) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(hints, f, indent=2)
+
+
+def load_dtype_hints(path) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return {str(k): str(v) for k, v in json.load(f).items()}
+
+
+_ARROW_HINT_TYPES = {"bool": "bool_", "int64": "int64", "float64": "float64", "str": "string"}
+
+
+# ---------------- READERS ----------------
+
+def _arrow_encoding(encoding: str) -> str:
+    # Arrow skips a UTF-8 byte order mark itself and only decodes UTF-8 natively
+    return "utf8" if encoding.replace("-", "").lower() in ("utf8", "utf8sig") else encoding
+
+
+def _read_arrow(source, compression, encoding, columns, hints):
+    read_options = pa_csv.ReadOptions(encoding=_arrow_encoding(encoding), use_threads=True)
+    convert_kwargs = {
+        "null_values": NA_VALUES,
+        "strings_can_be_null": True,
+        "true_values": ["True", "TRUE", "true"],
+        "false_values": ["False", "FALSE", "false"],
+    }
+
+    # The streaming reader infers the schema from the first block only, which is cheap
+    header_reader = pa_csv.open_csv(
+        _open_stream(source, compression), read_options=read_options, convert_options=pa_csv.ConvertOptions(**convert_kwargs)
+    )
+    schema = header_reader.schema
+    header_reader.close()
+    names = schema.names
+    if len(set(names)) != len(names) or any(n == "" for n in names):
+        # pandas renames these ("a.1", "Unnamed: 3"); let it do so
+        raise ValueError("header needs pandas column naming")
+
+    column_types = {}
+    for field in schema:
+        if pa.types.is_temporal(field.type):
+            column_types[field.name] = pa.string()
+    for col, hint in (hints or {}).items():
+        if col in names and hint in _ARROW_HINT_TYPES:
+            column_types[col] = getattr(pa, _ARROW_HINT_TYPES[hint])()
+    if columns is not None:
+        wanted = set(columns)
+        convert_kwargs["include_columns"] = [n for n in names if n in wanted]
+
+    table = pa_csv.read_csv(
+        _open_stream(source, compression),
+        read_options=read_options,
+        convert_options=pa_csv.ConvertOptions(column_types=column_types, **convert_kwargs),
+    )
+
+    if table.num_rows == 0:
+        # Without rows pandas keeps every column as object; Arrow would say float64/null
+        raise ValueError("no rows to infer dtypes from")
+
+    # Temporal values that only show up after the first block are turned back into text too
+    for i, field in enumerate(table.schema):
+        if pa.types.is_temporal(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+
+    for field in table.schema:
+        if pa.types.is_floating(field.type) and _has_huge_integers(table.column(field.name)):
+            # Arrow reads integers past int64 as float64 and drops digits; pandas
+            # keeps them exact (uint64 or Python ints)
+            raise ValueError(f'column "{field.name}" holds integers beyond int64')
+
+    df = table.to_pandas()
+    for col in df.columns:
+        field_type = table.schema.field(col).type
+        if pa.types.is_null(field_type):
+            df[col] = df[col].astype("float64")
+        elif pa.types.is_boolean(field_type) and table.column(col).null_count:
+            # pandas marks missing values in a bool/object column with NaN, Arrow with None
+            df[col] = df[col].where(df[col].notna(), np.nan)
+    return df
+
+
+def _has_huge_integers(column) -> bool:
+    # Whole numbers of magnitude 2**63 or more; large floats written as such
+    # (e.g. 1e300) match too and merely take the slower, equally exact reader
+    largest = pc.max(pc.abs(column)).as_py()
+    if largest is None or largest < 2.0 ** 63:
+        return False
+    return bool(pc.all(pc.equal(column, pc.floor(column))).as_py())
+
+
+def _read_pandas(source, compression, encoding, columns, hints, **csv_kwargs):
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    if columns is not None:
+        wanted = set(columns)
+        csv_kwargs["usecols"] = lambda c: c in wanted
+    if hints:
+        csv_kwargs["dtype"] = {c: (str if h == "str" else h) for c, h in hints.items()}
+    # Exact float parsing, the same values pyarrow produces
+    csv_kwargs.setdefault("float_precision", "round_trip")
+    return pd.read_csv(source, compression=compression, encoding=encoding, **csv_kwargs)
+
+
+def read_csv_header(source, compression=None, encoding=None) -> list:
+    """
+    Column names of a CSV, as pandas.read_csv names them, without parsing any rows.
+    """
+    if encoding is None:
+        encoding = detect_encoding(_read_prefix(source, compression))
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return pd.read_csv(source, compression=compression, encoding=encoding, nrows=0).columns.tolist()
+
+
+def read_csv_fast(source, compression=None, columns=None, encoding=None, dtype_hints=None, engine="auto", **csv_kwargs):
+    """
+    Read a CSV from a path or bytes, multi-threaded when pyarrow is available.
+
+    compression: "gzip", "bz2", "zip", "xz", "zstd" or None.
+    columns: optional list of columns to load; the others are never converted.
+    encoding: skip detection and use this encoding.
+    dtype_hints: {column: "bool" | "int64" | "float64" | "str"}, see dtype_hints().
+    engine: "auto" (pyarrow when possible), "pyarrow" or "c".
+    csv_kwargs: extra pandas.read_csv options; any of them selects the pandas parser.
+    """
+    if engine == "pyarrow" and not arrow_available():
+        raise ImportError("engine='pyarrow' needs the optional dependency pyarrow (pip install pyarrow)")
+    if encoding is None:
+        encoding = detect_encoding(_read_prefix(source, compression))
+
+    use_arrow = arrow_available() and engine != "c" and compression in _ARROW_COMPRESSIONS and not csv_kwargs
+    if use_arrow:
+        try:
+            return _read_arrow(source, compression, encoding, columns, dtype_hints)
+        except (pa.ArrowInvalid, ValueError) as e:
+            if dtype_hints:
+                logging.debug("Dtype hints did not fit the file (%s); parsing without them", e)
+                try:
+                    return _read_arrow(source, compression, encoding, columns, None)
+                except (pa.ArrowInvalid, ValueError):
+                    pass
+            logging.debug("Multi-threaded CSV reader unavailable for this file; using the pandas parser")
+
+    if dtype_hints:
+        try:
+            return _read_pandas(source, compression, encoding, columns, dtype_hints, **csv_kwargs)
+        except (ValueError, TypeError, OverflowError) as e:
+            logging.debug("Dtype hints did not fit the file (%s); parsing without them", e)
+    return _read_pandas(source, compression, encoding, columns, None, **csv_kwargs)
@@ -1,13 +1,8 @@
 import logging
 
+from run_log import DIVIDER
+
+
 def divider():
-    
-    logger = logging.getLogger()
-    for h in logger.handlers:
-        if isinstance(h, logging.FileHandler):
-            h.flush()
-            h.stream.write("-" * 32 + "\n")
-            h.flush()
-            break
-    else:
-        logging.info("-" * 32)
\ No newline at end of file
+    # Written without the timestamp/level prefix by the run log formatter
+    logging.info(DIVIDER, extra={"bare": True})
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import logging
+from divider import divider
+from frame_delta import FrameDelta, apply_delta
+from pandas.api.types import (
+    is_bool_dtype,
+    is_float_dtype,
+    is_integer_dtype,
+    is_object_dtype,
+    is_string_dtype,
+)
+
+# Memory Optimization of Data Types
+
+def downcast_dtypes(df, exclude_cols=None, category_ratio=0.5, return_saved=False, return_delta=False):
+    """
+    Shrink column dtypes without changing any value:
+        - integers to the smallest signed width that holds them
+        - floats to float32 when every value round-trips exactly
+        - text columns with at most `category_ratio` distinct values per row to category
+
+    A conversion is kept only when it actually uses fewer bytes.
+    return_delta: return the frame_delta.FrameDelta instead of the new frame.
+    """
+
+    logging.info("=== DTYPE DOWNCASTING STARTED ===")
+    exclude = set(exclude_cols or [])
+    bytes_saved = 0
+    converted_columns = {}
+    n_rows = int(len(df))
+
+    for col in list(df.columns):
+        if col in exclude:
+            continue
+
+        s = df[col]
+        converted = None
+
+        if is_bool_dtype(s):
+            continue
+
+        if is_integer_dtype(s):
+            converted = pd.to_numeric(s, downcast="integer")
+
+        elif is_float_dtype(s):
+            candidate = s.astype("float32")
+            original = s.to_numpy(dtype="float64", na_value=np.nan)
+            if np.array_equal(candidate.to_numpy(dtype="float64", na_value=np.nan), original, equal_nan=True):
+                converted = candidate
+
+        elif (is_object_dtype(s) or is_string_dtype(s)) and n_rows > 0:
+            if s.nunique(dropna=True) <= category_ratio * n_rows:
+                converted = s.astype("category")
+
+        if converted is None or converted.dtype == s.dtype:
+            continue
+
+        before = int(s.memory_usage(deep=True, index=False))
+        after = int(converted.memory_usage(deep=True, index=False))
+        if after >= before:
+            continue
+
+        converted_columns[col] = converted
+        bytes_saved += before - after
+        logging.info('Downcast column "%s" from %s to %s (saved %s bytes)', col, s.dtype, converted.dtype, before - after)
+
+    divider()
+
+    logging.info(f"Total memory saved: {bytes_saved / (1024 * 1024):.2f} MB")
+
+    logging.info("=== DTYPE DOWNCASTING COMPLETED ===")
+
+    divider()
+
+    delta = FrameDelta(columns=converted_columns)
+    result = delta if return_delta else apply_delta(df, delta)
+    if return_saved:
+        return result, int(bytes_saved)
+    return result
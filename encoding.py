@@ -1,8 +1,126 @@
+import numpy as np
 import pandas as pd
 import logging
 from divider import divider
-
-def encode_features(df, method="onehot", target_col=None, columns=None, exclude_cols=None):
+from column_executor import ColumnExecutor
+from frame_delta import FrameDelta, apply_delta
+
+# Label used for missing values, matching str(NaN) in the previous astype(str) encoding
+_MISSING_LABEL = "nan"
+
+
+def _label_names(s):
+    """
+    Integer codes into a small array of distinct values, and the string label of each.
+    category columns reuse their existing codes; other columns are factorized once.
+    The last label is reserved for missing values, so code -1 indexes it directly.
+    """
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes = s.cat.codes.to_numpy()
+        uniques = s.cat.categories
+    else:
+        codes, uniques = pd.factorize(s, sort=False, use_na_sentinel=True)
+    names = [str(u) for u in uniques]
+    names.append(_MISSING_LABEL)
+    return codes, names
+
+
+def _smallest_int_dtype(n_levels):
+    for dtype in ("int8", "int16", "int32"):
+        if n_levels <= np.iinfo(dtype).max:
+            return dtype
+    return "int64"
+
+
+def label_encode_series(s, levels=None):
+    """
+    Label-encode a column through categorical codes instead of per-cell strings.
+
+    levels: sorted vocabulary from an earlier fit; values outside it become -1.
+    When omitted, the vocabulary is fitted on s (sorted string labels, like
+    sklearn's LabelEncoder on astype(str)).
+    Returns (codes in the smallest integer dtype that fits, levels).
+    """
+    codes, names = _label_names(s)
+    if levels is None:
+        used = np.zeros(len(names), dtype=bool)
+        used[codes] = True
+        levels = sorted({names[i] for i in np.flatnonzero(used)})
+
+    position = {name: i for i, name in enumerate(levels)}
+    lookup = np.array([position.get(name, -1) for name in names], dtype=_smallest_int_dtype(len(levels)))
+    return lookup[codes], list(levels)
+
+
+def _label_encode_column(s, levels):
+    # Executor work unit: (codes, levels, None), or (None, None, error) on failure
+    try:
+        codes, levels = label_encode_series(s, levels)
+        return codes, levels, None
+    except Exception as e:
+        return None, None, e
+
+
+OTHER_LABEL = "other"
+
+
+def cap_cardinality(s, max_categories, rare_strategy="other", hash_buckets=32):
+    """
+    Limit a column to at most max_categories levels before one-hot encoding.
+    Returns the rewritten column, or None when it is already under the cap.
+    Missing values stay missing. rare_strategy="hash" hashes every value into
+    min(hash_buckets, max_categories) buckets.
+    """
+    counts = s.value_counts(dropna=True)
+    if len(counts) <= max_categories:
+        return None
+
+    present = s.notna()
+    if rare_strategy == "hash":
+        n_buckets = max(1, min(int(hash_buckets), int(max_categories)))
+        hashed = pd.util.hash_array(s.astype(str).to_numpy(dtype=object)) % np.uint64(n_buckets)
+        buckets = pd.Series([f"hash_{int(b)}" for b in range(n_buckets)], dtype="object")
+        out = pd.Series(buckets.to_numpy()[hashed.astype("int64")], index=s.index, dtype="object")
+        return out.where(present)
+
+    keep = counts.index[: max(1, int(max_categories) - 1)]
+    out = s.astype("object")
+    return out.where(~present | out.isin(keep), OTHER_LABEL)
+
+
+def encode_features(
+    df,
+    method="onehot",
+    target_col=None,
+    columns=None,
+    exclude_cols=None,
+    vocabulary=None,
+    return_vocabulary=False,
+    sparse=False,
+    max_categories=None,
+    rare_strategy="other",
+    hash_buckets=32,
+    executor=None,
+    return_delta=False,
+):
+    """
+    Encode categorical columns.
+
+    Label encoding goes through categorical codes (existing category dtypes are
+    reused as-is) and emits the smallest integer dtype that fits.
+    vocabulary: {column: levels} from an earlier run to re-apply instead of fitting.
+    return_vocabulary: also return the fitted {column: levels} (label method only).
+
+    One-hot options:
+    sparse: emit Sparse[bool] dummy columns instead of dense ones.
+    max_categories: per-column cap on the number of dummy columns; columns above
+    it keep their most frequent levels and either collapse the rest into an
+    "other" level (rare_strategy="other") or are hashed into at most
+    min(hash_buckets, max_categories) levels (rare_strategy="hash").
+
+    executor: column_executor.ColumnExecutor (or mode name) label-encoding columns in parallel.
+    return_delta: return the frame_delta.FrameDelta instead of the new frame.
+    """
 
     logging.info(f"=== ENCODING STARTED ===")
     exclude = set(exclude_cols or [])
@@ -15,31 +133,59 @@ def encode_features(df, method="onehot", target_col=None, columns=None, exclude_
 
     logging.info(f"Columns selected for encoding: {columns}")
 
+    delta = FrameDelta()
+
     # ---------------- LABEL ENCODING ----------------
 
     if method.lower() == "label":
 
         logging.info("Method : Label Encoding")
 
-        from sklearn.preprocessing import LabelEncoder
-
-        le = LabelEncoder()
-
-        for col in columns:
-            try:
-                df[col] = le.fit_transform(df[col].astype(str))
-                logging.info(f'Label encoded column "{col}"')
-            except Exception as e:
-                logging.warning(f'Failed label encoding column "{col}" | {e}')
+        fitted = {}
+        results = ColumnExecutor.resolve(executor).map(
+            _label_encode_column,
+            (df.get(col) for col in columns),
+            [(vocabulary or {}).get(col) for col in columns],
+        )
+        for col, (codes, levels, error) in zip(columns, results):
+            if error is not None:
+                logging.warning('Failed label encoding column "%s" | %s', col, error)
+                continue
+            delta.columns[col] = codes
+            fitted[col] = levels
+            logging.info('Label encoded column "%s"', col)
 
     # ---------------- ONE HOT ENCODING ----------------
     elif method.lower() == "onehot":
 
         logging.info("Method : One-Hot Encoding")
 
+        # Capped columns are swapped into a shallow copy, the input frame stays as it is
+        work = df[[col for col in columns if col in df.columns]]
+        if max_categories:
+            for col in columns:
+                try:
+                    capped = cap_cardinality(work[col], max_categories, rare_strategy, hash_buckets)
+                    if capped is not None:
+                        work[col] = capped
+                        delta.columns[col] = capped
+                        if rare_strategy == "hash":
+                            logging.info('Hashed column "%s" into %s buckets (over %s categories)', col, min(hash_buckets, max_categories), max_categories)
+                        else:
+                            logging.info('Collapsed rare levels of column "%s" into "%s" (kept %s)', col, OTHER_LABEL, max_categories - 1)
+                except Exception as e:
+                    logging.warning('Failed capping categories of column "%s" | %s', col, e)
+
         try:
-            df = pd.get_dummies(df, columns=columns, drop_first=False)
-            logging.info(f'One-hot encoded columns {columns}')
+            if sparse:
+                # Plain bool dummies: nullable "string" columns would otherwise ask for a
+                # sparse BooleanDtype, which pandas cannot build
+                dummies = pd.get_dummies(work, columns=columns, drop_first=False, sparse=True, dtype=bool)
+            else:
+                dummies = pd.get_dummies(work, columns=columns, drop_first=False)
+            # The dummy columns go after the remaining columns, as get_dummies places them
+            delta = FrameDelta(drop=columns, columns={name: dummies[name] for name in dummies.columns})
+            logging.info(f'One-hot encoded columns {columns}' + (" (sparse output)" if sparse else ""))
         except Exception as e:
             logging.error(f'One-hot encoding failed | {e}')
 
@@ -51,13 +197,16 @@ def encode_features(df, method="onehot", target_col=None, columns=None, exclude_
         if target_col is None:
             raise ValueError("target_col must be provided for target encoding")
 
+        # Columns are encoded one after another on a shallow copy, as if in place
+        work = df.copy(deep=False)
         for col in columns:
             try:
-                means = df.groupby(col)[target_col].mean()
-                df[col] = df[col].map(means)
-                logging.info(f'Target encoded column "{col}" using target "{target_col}"')
+                means = work.groupby(col)[target_col].mean()
+                work[col] = work[col].map(means)
+                delta.columns[col] = work[col]
+                logging.info('Target encoded column "%s" using target "%s"', col, target_col)
             except Exception as e:
-                logging.warning(f'Failed target encoding column "{col}" | {e}')
+                logging.warning('Failed target encoding column "%s" | %s', col, e)
 
     else:
         raise ValueError("method must be: 'label', 'onehot', or 'target'")
@@ -66,4 +215,7 @@ def encode_features(df, method="onehot", target_col=None, columns=None, exclude_
 
     divider()
 
-    return df
+    result = delta if return_delta else apply_delta(df, delta)
+    if return_vocabulary:
+        return result, (fitted if method.lower() == "label" else {})
+    return result
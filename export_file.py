@@ -1,15 +1,20 @@
 import pandas as pd
 import logging
 from divider import divider
+from file_io import write_table
 
-def export_file(df, filename):
+def export_file(df, filename, compression=None):
+    """
+    Write the processed dataset. The format follows the file name:
+    .csv (optionally .gz/.bz2/.zip/.xz/.zst compressed), .parquet or .feather/.arrow.
+    compression: codec override, see file_io.write_table.
+    """
 
     logging.info(f"=== EXPORT FILE STARTED ===")
     
-    df.to_csv(filename, index=False)
+    write_table(df, filename, compression=compression)
     logging.info(f"Processed dataset exported to {filename}")
 
     logging.info(f"=== EXPORT FILE COMPLETED ===")
 
     divider()
-
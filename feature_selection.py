@@ -3,14 +3,152 @@ import numpy as np
 from sklearn.feature_selection import VarianceThreshold
 import logging
 from divider import divider
-
-def feature_selection(df, variance_threshold=0.01, correlation_threshold=0.9, exclude_cols=None):
+from column_profile import is_sparse, sparse_stats
+from frame_delta import FrameDelta, apply_delta
+
+# Pairs whose float32 correlation lands this close to the threshold are re-checked in float64
+_CORRELATION_TOLERANCE = 1e-3
+
+
+def _column_moments(df, columns, block_size):
+    # Per-column mean and std (nulls skipped), read one float64 block at a time
+    mean = np.zeros(len(columns))
+    std = np.zeros(len(columns))
+    has_nulls = np.zeros(len(columns), dtype=bool)
+    for start in range(0, len(columns), block_size):
+        end = min(start + block_size, len(columns))
+        block = df[columns[start:end]].to_numpy(dtype="float64", na_value=np.nan)
+        missing = np.isnan(block)
+        has_nulls[start:end] = missing.any(axis=0)
+        counts = (~missing).sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean[start:end] = np.where(counts > 0, np.nansum(block, axis=0) / np.maximum(counts, 1), 0.0)
+            std[start:end] = np.sqrt(np.nansum((block - mean[start:end]) ** 2, axis=0) / np.maximum(counts, 1))
+    return mean, std, has_nulls
+
+
+def _standardized_block(df, columns, mean, std, dtype):
+    # Centered and scaled in float64 and only then cast: casting first would wipe
+    # out the variance of large-offset columns (e.g. epoch seconds), which float32
+    # cannot resolve. Nulls become 0 and are reported in the returned mask.
+    block = df[columns].to_numpy(dtype="float64", na_value=np.nan, copy=True)
+    block -= mean
+    block *= np.where(std > 0, 1.0 / np.where(std > 0, std, 1.0), 0.0)
+    present = ~np.isnan(block)
+    block[~present] = 0.0
+    return block.astype(dtype, copy=False), present
+
+
+def _block_correlation(Zi, Mi, Zj, Mj, n, exact):
+    """
+    |r| between the columns of two standardized blocks. Without nulls this is a
+    single float32 product; with nulls each pair uses the rows where both values
+    are present (pairwise-complete, like DataFrame.corr), computed in float64.
+    """
+    if not exact:
+        return np.abs(Zi.T @ Zj) / n
+
+    Zi, Zj = Zi.astype("float64", copy=False), Zj.astype("float64", copy=False)
+    Mi, Mj = Mi.astype("float64"), Mj.astype("float64")
+    count = Mi.T @ Mj
+    sum_i = Zi.T @ Mj
+    sum_j = Mi.T @ Zj
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = Zi.T @ Zj - sum_i * sum_j / count
+        sq_i = (Zi * Zi).T @ Mj
+        sq_j = Mi.T @ (Zj * Zj)
+        var_i = sq_i - sum_i * sum_i / count
+        var_j = sq_j - sum_j * sum_j / count
+        # A column that is constant on the shared rows has no correlation (NaN in pandas)
+        flat = (var_i <= 1e-12 * sq_i) | (var_j <= 1e-12 * sq_j) | (count < 2)
+        corr = np.abs(cov) / np.sqrt(var_i * var_j)
+    return np.where(flat, 0.0, np.nan_to_num(corr, nan=0.0))
+
+
+def _blockwise_correlated(df, columns, threshold, block_size):
+    """
+    Columns correlated (|r| > threshold) with any earlier column, computed block
+    pair by block pair from per-column means and stds. Only two standardized
+    (rows x block_size) blocks and one block_size x block_size slice of the
+    correlation matrix exist at a time, and the result matches the dense
+    upper-triangle rule. Block pairs without nulls use float32; pairs with nulls
+    use pairwise-complete float64 sums.
+    """
+    n, p = len(df), len(columns)
+    if n < 2:
+        return []
+
+    mean, std, has_nulls = _column_moments(df, columns, block_size)
+    starts = list(range(0, p, block_size))
+
+    def load(start):
+        end = min(start + block_size, p)
+        exact = bool(has_nulls[start:end].any())
+        Z, M = _standardized_block(df, columns[start:end], mean[start:end], std[start:end], "float64" if exact else "float32")
+        return Z, M, exact
+
+    to_drop = []
+    for start in starts:
+        end = min(start + block_size, p)
+        Zj, Mj, exact_j = load(start)
+        certain = np.zeros(end - start, dtype=bool)
+        borderline = [[] for _ in range(end - start)]
+        for i_start in starts:
+            if i_start >= end:
+                break
+            i_end = min(i_start + block_size, p)
+            Zi, Mi, exact_i = (Zj, Mj, exact_j) if i_start == start else load(i_start)
+            corr = _block_correlation(Zi, Mi, Zj, Mj, n, exact_i or exact_j)
+            # Only pairs (i, j) with i < j, as in the upper triangle of the dense matrix
+            earlier = np.arange(i_start, i_end)[:, None] < np.arange(start, end)[None, :]
+            corr = np.where(earlier, corr, 0.0)
+
+            certain |= (corr > threshold + _CORRELATION_TOLERANCE).any(axis=0)
+            for i, k in zip(*np.nonzero(earlier & (np.abs(corr - threshold) <= _CORRELATION_TOLERANCE))):
+                borderline[k].append(i_start + i)
+
+        for k in range(end - start):
+            j = start + k
+            if certain[k]:
+                to_drop.append(columns[j])
+                continue
+            # Pairs this close to the threshold are re-checked in float64
+            for i in borderline[k]:
+                exact = df[columns[i]].corr(df[columns[j]])
+                if abs(exact) > threshold:
+                    to_drop.append(columns[j])
+                    break
+
+    return to_drop
+
+
+def feature_selection(
+    df,
+    variance_threshold=0.01,
+    correlation_threshold=0.9,
+    exclude_cols=None,
+    engine="blockwise",
+    block_size=512,
+    return_delta=False,
+):
+    """
+    Drop low-variance columns, then columns highly correlated with an earlier column.
+
+    engine: "blockwise" computes correlations on standardized column blocks with
+    memory bounded by block_size (nulls handled pairwise, as pandas does);
+    "dense" builds the full pandas correlation matrix. Both give the same drop list.
+    return_delta: return the frame_delta.FrameDelta instead of the new frame.
+    """
  
     logging.info("=== FEATURE SELECTION STARTED ===")
 
     # ---------------- VARIANCE THRESHOLD ----------------
     logging.info("Running Variance Filtering")
 
+    # The filters look at a view without the columns dropped so far; nothing is copied
+    dropped = []
+    source = df
+
     numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
     if exclude_cols:
         numeric_cols = [c for c in numeric_cols if c not in set(exclude_cols)]
@@ -21,13 +159,20 @@ def feature_selection(df, variance_threshold=0.01, correlation_threshold=0.9, ex
 
     else:
 
-        selector = VarianceThreshold(threshold=variance_threshold)
-        selector.fit(df[numeric_cols])
+        # Sparse columns get their variance from stored values, never densified
+        sparse_cols = [c for c in numeric_cols if is_sparse(df[c])]
+        dense_cols = [c for c in numeric_cols if c not in set(sparse_cols)]
 
-        kept_cols = [col for col, keep in zip(numeric_cols, selector.get_support()) if keep]
+        kept_cols = []
+        if dense_cols:
+            selector = VarianceThreshold(threshold=variance_threshold)
+            selector.fit(df[dense_cols])
+            kept_cols = [col for col, keep in zip(dense_cols, selector.get_support()) if keep]
+        kept_cols += [c for c in sparse_cols if sparse_stats(df[c])["var"] > variance_threshold]
         removed_cols = list(set(numeric_cols) - set(kept_cols))
 
         df = df.drop(columns=removed_cols)
+        dropped += removed_cols
 
         logging.info(f"Variance Threshold Removed Columns: {removed_cols}")
         logging.info(f"Remaining Columns After Variance Filter: {len(df.columns)}")
@@ -39,21 +184,30 @@ def feature_selection(df, variance_threshold=0.01, correlation_threshold=0.9, ex
     if exclude_cols:
         numeric_cols = [c for c in numeric_cols if c not in set(exclude_cols)]
 
+    sparse_cols = [c for c in numeric_cols if is_sparse(df[c])]
+    if sparse_cols:
+        numeric_cols = [c for c in numeric_cols if c not in set(sparse_cols)]
+        logging.info(f"Sparse columns left out of correlation filtering: {sparse_cols}")
+
     if len(numeric_cols) == 0:
         logging.warning("No numeric columns found for correlation filtering")
     else:
-        corr_matrix = df[numeric_cols].corr().abs()
+        if engine == "blockwise":
+            to_drop = _blockwise_correlated(df, numeric_cols, correlation_threshold, block_size)
+        else:
+            corr_matrix = df[numeric_cols].corr().abs()
 
-        upper_triangle = corr_matrix.where(
-            np.triu(np.ones(corr_matrix.shape), k=1).astype(bool)
-        )
+            upper_triangle = corr_matrix.where(
+                np.triu(np.ones(corr_matrix.shape), k=1).astype(bool)
+            )
 
-        to_drop = [
-            column for column in upper_triangle.columns
-            if any(upper_triangle[column] > correlation_threshold)
-        ]
+            to_drop = [
+                column for column in upper_triangle.columns
+                if any(upper_triangle[column] > correlation_threshold)
+            ]
 
         df = df.drop(columns=to_drop)
+        dropped += to_drop
 
         logging.info(f"Correlation Removed Columns: {to_drop}")
         logging.info(f"Remaining Columns After Correlation Filter: {len(df.columns)}")
@@ -62,4 +216,5 @@ def feature_selection(df, variance_threshold=0.01, correlation_threshold=0.9, ex
 
     divider()
 
-    return df
+    delta = FrameDelta(drop=dropped)
+    return delta if return_delta else apply_delta(source, delta)
@@ -0,0 +1,206 @@
+import io
+import os
+import zlib
+
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_timedelta64_dtype
+
+from csv_ingest import read_csv_fast, read_csv_header
+
+try:
+    import pyarrow  # used by pandas for Parquet / Feather
+except ImportError:
+    pyarrow = None
+
+# Dataset File Formats
+#
+# One place that knows how to read and write every supported dataset format:
+#   CSV (plain or .gz / .bz2 / .zip / .xz / .zst compressed), Parquet and
+#   Feather / Arrow IPC.
+# Parquet and Feather keep column dtypes (datetimes, categories, nullable
+# integers, strings), so data that went through the pipeline once can be read
+# back without re-inferring types.
+
+CSV_COMPRESSIONS = {".gz": "gzip", ".bz2": "bz2", ".zip": "zip", ".xz": "xz", ".zst": "zstd"}
+
+FORMATS = {
+    "csv": "CSV",
+    "parquet": "Parquet",
+    "feather": "Feather / Arrow IPC",
+}
+
+_EXTENSIONS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".ipc": "feather",
+}
+
+# Rows serialized per piece by iter_csv
+CSV_CHUNK_ROWS = 50_000
+
+# File-name suffix written for each output format
+DEFAULT_SUFFIX = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+
+TYPED_FORMATS = {"parquet", "feather"}
+
+
+def split_format(filename):
+    """
+    (format, csv compression) for a file name, e.g. "data.csv.gz" -> ("csv", "gzip").
+    Returns (None, None) for unsupported names.
+    """
+    name = str(filename or "").lower()
+    compression = None
+    root, ext = os.path.splitext(name)
+    if ext in CSV_COMPRESSIONS:
+        compression = CSV_COMPRESSIONS[ext]
+        root, ext = os.path.splitext(root)
+        if ext != ".csv":
+            return None, None
+    fmt = _EXTENSIONS.get(ext)
+    if fmt is None:
+        return None, None
+    return fmt, compression
+
+
+def file_suffix(filename) -> str:
+    """
+    The full recognized suffix of a file name (".csv.gz", ".parquet", ...), or "".
+    """
+    fmt, compression = split_format(filename)
+    if fmt is None:
+        return ""
+    name = str(filename).lower()
+    root, last = os.path.splitext(name)
+    if compression is not None:
+        return os.path.splitext(root)[1] + last
+    return last
+
+
+def is_typed(filename) -> bool:
+    """
+    True when the file format stores column dtypes (Parquet, Feather).
+    """
+    return split_format(filename)[0] in TYPED_FORMATS
+
+
+def _require_pyarrow(fmt):
+    if pyarrow is None:
+        raise ImportError(f"{FORMATS[fmt]} files need the optional dependency pyarrow (pip install pyarrow)")
+
+
+def read_table(source, filename=None, columns=None, dtype_hints=None, **csv_kwargs):
+    """
+    Read a dataset from a path or a bytes buffer.
+
+    filename: name used to pick the format when source is a buffer (defaults to source).
+    columns: optional list of columns to load (projection); others are never parsed.
+    dtype_hints: CSV column types known from an earlier run (see csv_ingest.dtype_hints).
+    csv_kwargs: passed to csv_ingest.read_csv_fast for CSV input (e.g. encoding, engine).
+    """
+    fmt, compression = split_format(filename or source)
+    if fmt is None:
+        raise ValueError(f"Unsupported file type: {filename or source}")
+    if fmt == "csv":
+        return read_csv_fast(source, compression=compression, columns=columns, dtype_hints=dtype_hints, **csv_kwargs)
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    _require_pyarrow(fmt)
+    if fmt == "parquet":
+        return pd.read_parquet(source, columns=columns)
+    return pd.read_feather(source, columns=columns)
+
+
+def read_columns(source, filename=None) -> list:
+    """
+    Column names of a dataset file, read from its header or schema only.
+    """
+    fmt, compression = split_format(filename or source)
+    if fmt is None:
+        raise ValueError(f"Unsupported file type: {filename or source}")
+    if fmt == "csv":
+        return read_csv_header(source, compression=compression)
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    _require_pyarrow(fmt)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        names = pq.read_schema(source).names
+    else:
+        import pyarrow.ipc
+
+        if not hasattr(source, "read"):
+            source = pyarrow.memory_map(os.fspath(source))
+        names = pyarrow.ipc.open_file(source).schema.names
+    # pandas writes a non-default index as an extra column
+    return [n for n in names if not n.startswith("__index_level_")]
+
+
+def _dense(df):
+    sparse_cols = [c for c in df.columns if isinstance(df[c].dtype, pd.SparseDtype)]
+    if not sparse_cols:
+        return df
+    out = df.copy(deep=False)
+    for c in sparse_cols:
+        out[c] = out[c].sparse.to_dense()
+    return out
+
+
+def write_table(df, target, filename=None, compression=None):
+    """
+    Write df to a path or a writable binary buffer in the format given by the
+    file name (filename, or target when it is a path).
+
+    compression: Parquet codec ("snappy", "zstd", "gzip", "brotli", "none"),
+    Feather codec ("lz4", "zstd", "uncompressed"), or a CSV codec overriding the
+    one implied by the file name ("gzip", "bz2", "zip", "xz", "zstd").
+    """
+    fmt, name_compression = split_format(filename or target)
+    if fmt is None:
+        raise ValueError(f"Unsupported file type: {filename or target}")
+
+    if fmt == "parquet":
+        _require_pyarrow(fmt)
+        codec = None if str(compression).lower() == "none" else (compression or "snappy")
+        _dense(df).to_parquet(target, index=False, compression=codec)
+    elif fmt == "feather":
+        _require_pyarrow(fmt)
+        _dense(df).reset_index(drop=True).to_feather(target, compression=compression or "uncompressed")
+    else:
+        df.to_csv(target, index=False, compression=compression or name_compression)
+
+
+def iter_csv(df, compression=None, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    df as CSV bytes (the same text as write_table), produced chunk_rows rows at
+    a time so the whole file never has to be in memory.
+    compression: None or "gzip"; gzip output is compressed as it is produced.
+    """
+    if compression not in (None, "gzip"):
+        raise ValueError(f"Unsupported streaming compression: {compression}")
+
+    # pandas picks the text format of datetime and timedelta values from the whole
+    # column (e.g. dates-only columns print without a time), so those columns are
+    # formatted once up front and every chunk prints them the same way
+    temporal = [c for c in df.columns if is_datetime64_any_dtype(df[c]) or is_timedelta64_dtype(df[c])]
+    if temporal:
+        df = df.copy(deep=False)
+        for c in temporal:
+            df[c] = df[c].astype(str).where(df[c].notna())
+
+    # wbits=31 writes a gzip container, like the .csv.gz files write_table produces
+    compressor = zlib.compressobj(wbits=31) if compression == "gzip" else None
+    for start in range(0, max(len(df), 1), chunk_rows):
+        data = df.iloc[start : start + chunk_rows].to_csv(index=False, header=start == 0).encode("utf-8")
+        if compressor is not None:
+            data = compressor.compress(data)
+        if data:
+            yield data
+    if compressor is not None:
+        yield compressor.flush()
@@ -1,117 +1,268 @@
 import pandas as pd
 import logging
 from divider import divider
+from column_executor import ColumnExecutor
+from frame_delta import FrameDelta, apply_delta
 from pandas.api.types import is_object_dtype, is_string_dtype
 import re
 import warnings
+import numpy as np
 
-def finalize_dtypes(df, exclude_cols=None):
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    guess_datetime_format = None
 
-    logging.info("=== DTYPE FINALIZATION STARTED ===")
-    exclude = set(exclude_cols or [])
-
-    def _looks_datetime_by_name(name: str) -> bool:
-        key = str(name or "").strip().lower()
-        return any(
-            k in key
-            for k in (
-                "date",
-                "datetime",
-                "time",
-                "timestamp",
-                "created",
-                "updated",
-                "modified",
-                "dob",
-            )
+def _looks_datetime_by_name(name: str) -> bool:
+    key = str(name or "").strip().lower()
+    return any(
+        k in key
+        for k in (
+            "date",
+            "datetime",
+            "time",
+            "timestamp",
+            "created",
+            "updated",
+            "modified",
+            "dob",
         )
-
-    _dateish_hint = re.compile(
-        r"(?:"
-        r"\d{1,4}[-/\.]\d{1,2}[-/\.]\d{1,4}"  # 2026-02-19, 19/02/2026, 02.19.2026
-        r"|\d{1,2}[-/\.]\d{1,2}[-/\.]\d{2,4}"  # 2/19/26
-        r"|[A-Za-z]{3,9}\s+\d{1,2}(?:,)?\s+\d{2,4}"  # Feb 19 2026, February 19, 2026
-        r"|\d{1,2}\s+[A-Za-z]{3,9}\s+\d{2,4}"  # 19 Feb 2026
-        r")"
     )
-    _timeonly_hint = re.compile(r"^\d{1,2}:\d{2}(?::\d{2})?$")
 
-    for col in df.columns:
-        if col in exclude:
-            continue
-        original_dtype = df[col].dtype
+_dateish_hint = re.compile(
+    r"(?:"
+    r"\d{1,4}[-/\.]\d{1,2}[-/\.]\d{1,4}"  # 2026-02-19, 19/02/2026, 02.19.2026
+    r"|\d{1,2}[-/\.]\d{1,2}[-/\.]\d{2,4}"  # 2/19/26
+    r"|[A-Za-z]{3,9}\s+\d{1,2}(?:,)?\s+\d{2,4}"  # Feb 19 2026, February 19, 2026
+    r"|\d{1,2}\s+[A-Za-z]{3,9}\s+\d{2,4}"  # 19 Feb 2026
+    r")"
+)
+_timeonly_hint = re.compile(r"^\d{1,2}:\d{2}(?::\d{2})?$")
+
+
+# Explicit formats tried on the sample before falling back to free-form parsing.
+# Month-first variants come before day-first ones, matching dayfirst=False as the default.
+_DATETIME_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y/%m/%d",
+    "%Y/%m/%d %H:%M:%S",
+    "%m/%d/%Y",
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%y",
+    "%m-%d-%Y",
+    "%d/%m/%Y",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%b %d %Y",
+    "%b %d, %Y",
+    "%B %d %Y",
+    "%B %d, %Y",
+    "%d %b %Y",
+    "%d %B %Y",
+    "ISO8601",
+)
+
+_SAMPLE_SIZE = 500
+
+
+def _sample_values(s, size=_SAMPLE_SIZE):
+    """
+    Up to `size` non-null values spread evenly over the column, as stripped strings.
+    """
+    n = len(s)
+    if n == 0:
+        return pd.Series([], dtype="object")
+    positions = np.unique(np.linspace(0, n - 1, num=min(n, size * 4)).astype("int64"))
+    sample = s.iloc[positions].dropna()
+    if len(sample) < size and len(positions) < n:
+        sample = s.dropna().iloc[:size]
+    return sample.head(size).astype(str).str.strip()
+
+
+def _parse_ratio(sample, fmt=None, dayfirst=False):
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        if fmt is None:
+            parsed = pd.to_datetime(sample, errors="coerce", utc=True, dayfirst=dayfirst)
+        else:
+            parsed = pd.to_datetime(sample, errors="coerce", utc=True, format=fmt)
+    return float(parsed.notna().mean()) if len(sample) else 0.0
 
-        # Try numeric conversion
-        if is_object_dtype(df[col]) or is_string_dtype(df[col]):
+
+def _accepts(ratio, name_hint):
+    return (name_hint and ratio >= 0.6) or (ratio >= 0.95)
+
+
+def infer_datetime_plan(sample, name, cached=None):
+    """
+    Decide from a sample of stripped strings whether a text column is a datetime.
+
+    Returns {"format": strftime format or None, "dayfirst": bool}, or None when
+    the column should stay text. When one explicit format parses the sample, the
+    full column can be converted once with that fixed format.
+    cached: plan from an earlier run on the same dataset to try first; it is
+    reused without detection when it still parses the whole sample.
+    """
+    if len(sample) == 0:
+        return None
+
+    name_hint = _looks_datetime_by_name(name)
+
+    # Avoid converting "time-only" strings (temporal_features handles these separately).
+    head = sample.head(120)
+    timeonly_ratio = float(head.str.match(_timeonly_hint).mean())
+    dateish_ratio = float(head.str.contains(_dateish_hint, regex=True).mean())
+    if timeonly_ratio >= 0.95 and dateish_ratio < 0.2:
+        return None
+
+    # If it doesn't look date-ish and the name doesn't hint, don't even try.
+    if not name_hint and dateish_ratio < 0.4:
+        return None
+
+    if cached is not None and _parse_ratio(sample, cached["format"], cached["dayfirst"]) == 1.0:
+        return dict(cached)
+
+    candidates = []
+    if guess_datetime_format is not None:
+        for dayfirst in (False, True):
             try:
-                converted = pd.to_numeric(df[col])
-                df[col] = converted
-                logging.info(f'Converted Column "{col}" to {df[col].dtype}')
-                continue
+                guessed = guess_datetime_format(sample.iloc[0], dayfirst=dayfirst)
+            except Exception:
+                guessed = None
+            if guessed and guessed not in candidates:
+                candidates.append(guessed)
+    candidates += [f for f in _DATETIME_FORMATS if f not in candidates]
+
+    # The format parsing the most of the sample wins; only exact ties go to the
+    # earlier candidate, so a format that parses strictly more rows is never passed over
+    best_fmt, best_ratio = None, 0.0
+    for fmt in candidates:
+        ratio = _parse_ratio(sample, fmt)
+        if ratio > best_ratio:
+            best_fmt, best_ratio = fmt, ratio
+        if best_ratio == 1.0:
+            break
+    if best_fmt is not None and best_ratio >= 0.95:
+        return {"format": best_fmt, "dayfirst": False}
+
+    # Mixed formats: parse the sample free-form with both dayfirst settings.
+    ratio0 = _parse_ratio(sample, dayfirst=False)
+    ratio1 = _parse_ratio(sample, dayfirst=True)
+    if _accepts(max(ratio0, ratio1), name_hint):
+        return {"format": None, "dayfirst": ratio1 > ratio0}
+    return None
+
+
+def parse_datetime(s, plan):
+    """
+    Convert a full column with an inferred plan, in a single parse. Unparseable values become NaT.
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        if plan.get("format"):
+            return pd.to_datetime(s, errors="coerce", utc=True, format=plan["format"])
+        return pd.to_datetime(s, errors="coerce", utc=True, dayfirst=plan.get("dayfirst", False))
+
+
+def _finalize_column(s, col, infer_text, cached_plan):
+    """
+    Final dtype of one column. Runs on executor workers, so it only reports:
+    returns (converted column or None when unchanged, [(log message, args)],
+    datetime plan to remember or None).
+    """
+    original_dtype = s.dtype
+    messages = []
+
+    if isinstance(original_dtype, pd.DatetimeTZDtype):
+        # Same plain datetime64 dtype as parsed text columns end up with
+        converted = s.dt.tz_convert(None).astype("datetime64[ns]")
+        return converted, [('Converted Column "%s" to %s', (col, converted.dtype))], None
+
+    if infer_text and (is_object_dtype(s) or is_string_dtype(s)):
+        # Every decision below is taken on a bounded sample; the full column
+        # is converted at most once.
+        sample = _sample_values(s)
+
+        # Try numeric conversion (only when the whole sample is numeric)
+        if len(sample) == 0 or pd.to_numeric(sample, errors="coerce").notna().all():
+            try:
+                converted = pd.to_numeric(s)
+                return converted, [('Converted Column "%s" to %s', (col, converted.dtype))], None
             except:
                 pass
 
         # Try datetime conversion
-        if is_object_dtype(df[col]) or is_string_dtype(df[col]):
-            try:
-                s = df[col]
-                # Normalize empties before scoring parse ratio
-                non_empty = s.notna()
-                if non_empty.sum() == 0:
-                    raise ValueError("no non-empty values")
-
-                # Only attempt datetime conversion when the column is very likely date-like:
-                # - name indicates datetime OR
-                # - almost all values parse as datetime in common formats
-                name_hint = _looks_datetime_by_name(col)
-
-                sample = s[non_empty].astype(str).str.strip().head(120)
-
-                # Avoid converting "time-only" strings (temporal_features handles these separately).
-                timeonly_ratio = float(sample.str.match(_timeonly_hint).mean()) if len(sample) else 0.0
-                dateish_ratio = float(sample.str.contains(_dateish_hint, regex=True).mean()) if len(sample) else 0.0
-                if timeonly_ratio >= 0.95 and dateish_ratio < 0.2:
-                    raise ValueError("time-only column")
-
-                # If it doesn't look date-ish and the name doesn't hint, don't even try.
-                if not name_hint and dateish_ratio < 0.4:
-                    raise ValueError("not date-like")
-
-                # Try parsing with both dayfirst settings; keep the one with higher success ratio.
-                with warnings.catch_warnings():
-                    warnings.filterwarnings("ignore", category=UserWarning)
-                    conv0 = pd.to_datetime(s, errors="coerce", utc=True, dayfirst=False)
-                    conv1 = pd.to_datetime(s, errors="coerce", utc=True, dayfirst=True)
-
-                parsed0 = int(conv0.notna().sum())
-                parsed1 = int(conv1.notna().sum())
-                total = int(non_empty.sum())
-                ratio0 = (parsed0 / total) if total else 0.0
-                ratio1 = (parsed1 / total) if total else 0.0
-
-                converted = conv1 if (ratio1 > ratio0 + 0.02) else conv0
-                ratio = max(ratio0, ratio1)
-
-                should_convert = (name_hint and ratio >= 0.6) or (ratio >= 0.95)
-                if should_convert:
+        try:
+            plan = infer_datetime_plan(sample, col, cached=cached_plan)
+            if plan is not None:
+                converted = parse_datetime(s, plan)
+                total = int(s.notna().sum())
+                ratio = (int(converted.notna().sum()) / total) if total else 0.0
+                if _accepts(ratio, _looks_datetime_by_name(col)):
                     # Ensure we end up with a plain datetime64 dtype (no timezone)
-                    df[col] = converted.dt.tz_convert(None).astype("datetime64[ns]")
-                    logging.info(f'Converted column "{col}" to {df[col].dtype}')
-                    continue
+                    converted = converted.dt.tz_convert(None).astype("datetime64[ns]")
+                    fmt = plan["format"] or f"mixed, dayfirst={plan['dayfirst']}"
+                    return converted, [('Converted column "%s" to %s (format: %s)', (col, converted.dtype, fmt))], plan
+        except:
+            pass
+
+    converted = None
+    # Keep remaining text columns as strings
+    if is_object_dtype(s) or is_string_dtype(s):
+        converted = s.astype("string")
+        messages.append(('Kept Column "%s" as %s', (col, converted.dtype)))
+
+    if (converted if converted is not None else s).dtype == original_dtype:
+        messages.append(('Column "%s" kept as %s', (col, original_dtype)))
+
+    return converted, messages, None
 
-            except:
-                pass
 
-        # Keep remaining text columns as strings
-        if is_object_dtype(df[col]) or is_string_dtype(df[col]):
-            df[col] = df[col].astype("string")
-            logging.info(f'Kept Column "{col}" as {df[col].dtype}')
+def finalize_dtypes(df, exclude_cols=None, infer_text=True, executor=None, return_delta=False, datetime_plans=None):
+    """
+    Convert text columns that hold numbers or datetimes to real dtypes.
+    infer_text=False trusts text columns as text (e.g. data read from Parquet/Feather,
+    where numbers and datetimes already have their own dtypes) and skips inference.
+    executor: column_executor.ColumnExecutor (or mode name) spreading the columns over workers.
+    return_delta: return the frame_delta.FrameDelta instead of the new frame.
+    datetime_plans: {column: plan} from an earlier run on the same dataset, tried
+    before detecting formats again; plans inferred by this run are added to it.
+    Keep one dict per dataset: a plan only fits the data it was inferred from.
+    """
+
+    logging.info("=== DTYPE FINALIZATION STARTED ===")
+    plans = datetime_plans if datetime_plans is not None else {}
+    exclude = set(exclude_cols or [])
+    executor = ColumnExecutor.resolve(executor)
+
+    columns = [col for col in df.columns if col not in exclude]
+    results = executor.map(
+        _finalize_column,
+        (df[col] for col in columns),
+        columns,
+        [infer_text] * len(columns),
+        [plans.get(col) for col in columns],
+    )
 
-        if df[col].dtype == original_dtype:
-            logging.info(f'Column "{col}" kept as {original_dtype}')
+    converted_columns = {}
+    for col, (converted, messages, plan) in zip(columns, results):
+        if plan is not None:
+            plans[col] = plan
+        if converted is not None:
+            converted_columns[col] = converted
+        for message, args in messages:
+            logging.info(message, *args)
 
     logging.info("=== DTYPE FINALIZATION COMPLETED ===")
 
     divider()
 
-    return df
+    delta = FrameDelta(columns=converted_columns)
+    return delta if return_delta else apply_delta(df, delta)
@@ -0,0 +1,51 @@
+import io
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+    feather = None
+
+# Parsed DataFrame Snapshots
+#
+# A typed on-disk copy of a DataFrame that loads without re-parsing text.
+# With pyarrow installed the snapshot is an uncompressed Arrow IPC (Feather v2)
+# file that is memory-mapped on load; otherwise, or when a column cannot be
+# represented in Arrow (e.g. mixed-type object columns), it falls back to pickle.
+
+ARROW_SUFFIX = ".arrow"
+PICKLE_SUFFIX = ".pkl"
+
+
+def dump_frame(df) -> tuple[str, bytes]:
+    """
+    Serialize df for write-once storage. Returns (file suffix, bytes).
+    """
+    if feather is not None:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            sink = pa.BufferOutputStream()
+            feather.write_feather(table, sink, compression="uncompressed")
+            return ARROW_SUFFIX, sink.getvalue().to_pybytes()
+        except (pa.ArrowException, TypeError, ValueError):
+            pass
+
+    buf = io.BytesIO()
+    df.to_pickle(buf)
+    return PICKLE_SUFFIX, buf.getvalue()
+
+
+def read_frame(path, columns=None) -> pd.DataFrame:
+    """
+    Load a snapshot saved from dump_frame. Each call returns an independent frame.
+    columns: optional subset to load; with Arrow the other columns are never touched.
+    """
+    if path.endswith(ARROW_SUFFIX):
+        if feather is None:
+            raise RuntimeError("pyarrow is required to read Arrow snapshots")
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    df = pd.read_pickle(path)
+    return df if columns is None else df[list(columns)]
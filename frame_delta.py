@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+# Step Results
+#
+# A step describes what it changes instead of editing the frame it was given:
+#   drop     - columns to remove
+#   row_mask - boolean array over the input rows, True for rows to keep (None keeps all)
+#   columns  - {name: values aligned with the input rows}; a name that is still in
+#              the frame replaces that column in place, any other name is appended
+#              (in insertion order)
+# apply_delta builds the next frame from it. Dropping, replacing and appending
+# columns share the existing arrays (pandas Copy-on-Write), so the only copy of
+# the data is the row filter, and the input frame is never modified.
+
+
+class FrameDelta:
+    def __init__(self, drop=None, row_mask=None, columns=None):
+        self.drop = list(drop or [])
+        self.row_mask = None if row_mask is None else np.asarray(row_mask, dtype=bool)
+        self.columns = dict(columns or {})
+
+    @property
+    def rows_dropped(self) -> int:
+        if self.row_mask is None:
+            return 0
+        return int(len(self.row_mask) - np.count_nonzero(self.row_mask))
+
+
+def apply_delta(df, delta, return_copies=False):
+    """
+    The frame that results from applying delta to df.
+    return_copies: also return how many times the data was copied (1 when rows
+    were filtered, else 0).
+    """
+    out = df.drop(columns=delta.drop) if delta.drop else df.copy(deep=False)
+
+    if delta.columns:
+        block = pd.DataFrame(
+            {
+                name: values if isinstance(values, pd.Series) else pd.Series(values, index=df.index, copy=False)
+                for name, values in delta.columns.items()
+            },
+            index=df.index,
+            copy=False,
+        )
+        replaced = [name for name in block.columns if name in out.columns]
+        added = [name for name in block.columns if name not in out.columns]
+        if replaced:
+            out[replaced] = block[replaced]
+        if added:
+            out = pd.concat([out, block[added]], axis=1)
+
+    copies = 0
+    if delta.rows_dropped:
+        out = out[delta.row_mask]
+        copies = 1
+
+    if return_copies:
+        return out, copies
+    return out
@@ -0,0 +1,159 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Background Pipeline Runs
+#
+# A bounded pool of worker threads runs pipeline jobs outside the request that
+# submitted them. Each job gets an id that can be polled for its status and
+# per-step progress, and cancelled. Cancellation is cooperative: the job's
+# progress callback raises JobCancelled at the next step boundary.
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = {DONE, FAILED, CANCELLED}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    """
+    max_workers: jobs running at the same time.
+    max_pending: jobs queued or running at the same time; submit() raises
+    JobQueueFull above it instead of letting the backlog grow without bound.
+    ttl_seconds: finished jobs are forgotten after this long.
+    on_update: optional callable(snapshot) called after every status/progress
+    change, e.g. to mirror job state somewhere other processes can read it.
+    """
+
+    def __init__(self, max_workers=2, max_pending=16, ttl_seconds=60 * 60, on_update=None):
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(self.max_workers, int(max_pending))
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="prismaflow-job")
+        self._lock = threading.Lock()
+        self._jobs: dict[str, dict] = {}
+        self._on_update = on_update
+
+    def _cleanup(self) -> None:
+        now = time.time()
+        expired = [
+            k for k, j in self._jobs.items()
+            if j["status"] in FINISHED_STATES and (now - float(j.get("finished_at") or now)) > self.ttl_seconds
+        ]
+        for k in expired:
+            self._jobs.pop(k, None)
+
+    def submit(self, fn, owner=None, label=None, job_id=None) -> str:
+        """
+        Queue fn(progress) and return the job id (a new one unless job_id is given).
+        fn receives progress(step, done, total), which it should call before each
+        step; the call raises JobCancelled once the job has been cancelled.
+        """
+        with self._lock:
+            self._cleanup()
+            active = sum(1 for j in self._jobs.values() if j["status"] not in FINISHED_STATES)
+            if active >= self.max_pending:
+                raise JobQueueFull(f"{active} jobs already queued or running")
+
+            job_id = job_id or uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "id": job_id,
+                "owner": owner,
+                "label": label,
+                "status": QUEUED,
+                "step": None,
+                "steps_done": 0,
+                "steps_total": 0,
+                "error": None,
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "cancel": threading.Event(),
+            }
+
+        self._notify(job_id)
+        self._executor.submit(self._run, job_id, fn)
+        return job_id
+
+    def _notify(self, job_id) -> None:
+        if self._on_update is None:
+            return
+        snap = self.status(job_id)
+        if snap is not None:
+            try:
+                self._on_update(snap)
+            except Exception:
+                pass
+
+    def _update(self, job_id, **fields) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+        self._notify(job_id)
+
+    def _run(self, job_id, fn) -> None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        if job["cancel"].is_set():
+            self._update(job_id, status=CANCELLED, finished_at=time.time())
+            return
+
+        def progress(step, done, total):
+            if job["cancel"].is_set():
+                raise JobCancelled(job_id)
+            self._update(job_id, step=step, steps_done=int(done), steps_total=int(total))
+
+        self._update(job_id, status=RUNNING, started_at=time.time())
+        try:
+            fn(progress)
+        except JobCancelled:
+            self._update(job_id, status=CANCELLED, finished_at=time.time())
+        except Exception as e:
+            self._update(job_id, status=FAILED, error=str(e) or type(e).__name__, finished_at=time.time())
+        else:
+            self._update(job_id, status=DONE, finished_at=time.time())
+
+    def status(self, job_id) -> dict | None:
+        """
+        JSON-friendly snapshot of a job, or None for unknown ids.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snap = {k: v for k, v in job.items() if k != "cancel"}
+
+        total = snap["steps_total"]
+        snap["percent"] = 100 if snap["status"] == DONE else (int(100 * snap["steps_done"] / total) if total else 0)
+        snap["finished"] = snap["status"] in FINISHED_STATES
+        return snap
+
+    def cancel(self, job_id) -> bool:
+        """
+        Request cancellation. Queued jobs never start; running jobs stop at their
+        next step boundary. Returns False for unknown or already finished jobs.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] in FINISHED_STATES:
+                return False
+            job["cancel"].set()
+            if job["status"] == QUEUED:
+                job["status"] = CANCELLED
+                job["finished_at"] = time.time()
+        self._notify(job_id)
+        return True
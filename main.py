@@ -5,99 +5,67 @@ import time
 from null_values import clear_null_values
 from clear_columns import clear_columns
 from finalize_types import finalize_dtypes
+from downcast import downcast_dtypes
 from outliers_removal import remove_outliers
 from remove_columns import remove_columns
 from encoding import encode_features
 from scaling import scale_features
 from feature_selection import feature_selection
 from export_file import export_file
+from file_io import read_columns, read_table
+from frame_delta import apply_delta
 from temporal_features import extract_temporal_features
 from remove_target import remove_target
 from add_target import add_target
 from divider import divider
+from step_cache import chain_key, fingerprint_frame
+from column_executor import ColumnExecutor
+from step_profiler import StepProfiler
+from run_log import start_run_log, with_run_log
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 log_file = os.path.join(BASE_DIR, "logs.txt")
 
-logging.basicConfig(
-    filename=log_file,
-    filemode="w",
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(message)s",
-    force=True,
+# Logging outside a pipeline run (e.g. calling a step directly) is kept too and
+# written to the log file at exit; every run replaces it with its own log.
+start_run_log(log_file, per_thread=False)
+
+ALL_STEPS = (
+    "manual_columns",
+    "drop_empty_columns",
+    "handle_nulls",
+    "finalize_dtypes",
+    "downcast_dtypes",
+    "handle_outliers",
+    "encoding",
+    "feature_selection",
+    "temporal_features",
+    "scaling",
 )
 
-def _reset_log_file_for_new_run() -> None:
-    """
-    Ensure each pipeline run starts with a fresh log file.
-    In a long-lived Python process, the FileHandler stays open and will append
-    across runs unless we explicitly recreate it.
-    """
-    root = logging.getLogger()
-    target = os.path.abspath(log_file)
-
-    # Remove/close any existing FileHandler pointing at our log file.
-    for h in list(root.handlers):
-        if isinstance(h, logging.FileHandler):
-            base = getattr(h, "baseFilename", None)
-            try:
-                if base and os.path.abspath(str(base)) == target:
-                    root.removeHandler(h)
-                    try:
-                        h.flush()
-                    except Exception:
-                        pass
-                    try:
-                        h.close()
-                    except Exception:
-                        pass
-            except Exception:
-                continue
+# Steps that only run when explicitly requested through `steps`
+OPTIONAL_STEPS = {"downcast_dtypes"}
 
-    fh = logging.FileHandler(log_file, mode="w", encoding="utf-8")
-    fh.setLevel(logging.INFO)
-    fh.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(message)s"))
-    root.addHandler(fh)
-    root.setLevel(logging.INFO)
+# Share of empty cells at which drop_empty_columns removes a column
+EMPTY_COLUMN_THRESHOLD = 0.95
 
-def prismaflow_pipeline(
-    df,
-    target_col=None,
-    manual_columns=None,
+def _normalize_options(
+    null_threshold=0.05,
+    encoding_method="label",
+    handle_outliers=True,
+    outlier_drop=True,
+    scaling_method="standard",
     outlier_skipping=None,
-    columns_to_keep=None,
     scaling_skipping=None,
-    handle_outliers=True,
     outlier_method="iqr",
-    outlier_drop=True,
     outlier_param=None,
-    null_threshold=0.05,
-    encoding_method="label",
     steps=None,
-    scaling_method="standard",
-    output_file="processed_dataset.csv",
-    return_df=False,
-    collect_metrics=False,
-    mode="preprocessing",
-):
-    _reset_log_file_for_new_run()
-
-    if df is None:
-
-        logging.error("DataFrame is None")
-
-        if collect_metrics and return_df:
-            return None, {"error": "DataFrame is None"}
-        return None if return_df else False
-
-    mode_label = "Cleaning" if mode == "cleaning" else "Preprocessing"
-    logging.info(f"{mode_label} Initiated")
-    start_time = time.time()
-    divider()
-
-    row_number_col = "row_number"
-    keep = list(columns_to_keep or [])
-
+    outlier_simultaneous=False,
+) -> dict:
+    """
+    Validate and normalize the user-facing pipeline options.
+    Shared by the in-memory and the chunked pipeline so both accept the same inputs.
+    """
     try:
         null_threshold = 0.05 if null_threshold is None else float(null_threshold)
     except Exception:
@@ -127,23 +95,200 @@ def prismaflow_pipeline(
     except Exception:
         outlier_param = None
 
-    all_steps = {
-        "manual_columns",
-        "drop_empty_columns",
-        "handle_nulls",
-        "finalize_dtypes",
-        "handle_outliers",
-        "encoding",
-        "feature_selection",
-        "temporal_features",
-        "scaling",
-    }
-    enabled_steps = set(all_steps)
+    outlier_simultaneous = bool(outlier_simultaneous)
+
+    all_steps = set(ALL_STEPS)
+    enabled_steps = all_steps - OPTIONAL_STEPS
     if steps is not None:
         if isinstance(steps, (list, tuple, set)):
             enabled_steps = {str(s).strip() for s in steps if str(s).strip()} & all_steps
         else:
-            enabled_steps = set(all_steps)
+            enabled_steps = all_steps - OPTIONAL_STEPS
+
+    return {
+        "null_threshold": null_threshold,
+        "encoding_method": encoding_method,
+        "handle_outliers": handle_outliers,
+        "outlier_drop": outlier_drop,
+        "scaling_method": scaling_method,
+        "outlier_skipping": outlier_skipping,
+        "scaling_skipping": scaling_skipping,
+        "outlier_method": outlier_method,
+        "outlier_param": outlier_param,
+        "outlier_simultaneous": outlier_simultaneous,
+        "enabled_steps": enabled_steps,
+    }
+
+def plan_column_pushdown(columns, target_col=None, manual_columns=None, columns_to_keep=None, steps=None, profile=None):
+    """
+    Columns the pipeline would drop without looking at their values, so a reader
+    can skip them. Returns {column: step}: the manual removals (unless kept) and,
+    given a profile of the same data (column_profile.profile_columns), the columns
+    drop_empty_columns removes. The target column is never skipped.
+    """
+    enabled_steps = _normalize_options(steps=steps)["enabled_steps"]
+    keep = set(columns_to_keep or [])
+    available = set(columns)
+    skip = {}
+
+    if "manual_columns" in enabled_steps and manual_columns:
+        for col in (str(c).strip() for c in manual_columns):
+            if col in available and col not in keep and col != target_col:
+                skip[col] = "manual_columns"
+
+    if "drop_empty_columns" in enabled_steps and profile:
+        for col in columns:
+            entry = profile.get(col)
+            if col in skip or col == target_col or not entry or not entry.get("rows"):
+                continue
+            if entry["missing_count"] / entry["rows"] >= EMPTY_COLUMN_THRESHOLD:
+                skip[col] = "drop_empty_columns"
+
+    return skip
+
+
+@with_run_log(log_file)
+def prismaflow_pipeline(
+    df,
+    target_col=None,
+    manual_columns=None,
+    outlier_skipping=None,
+    columns_to_keep=None,
+    scaling_skipping=None,
+    handle_outliers=True,
+    outlier_method="iqr",
+    outlier_drop=True,
+    outlier_param=None,
+    null_threshold=0.05,
+    encoding_method="label",
+    steps=None,
+    scaling_method="standard",
+    output_file="processed_dataset.csv",
+    return_df=False,
+    collect_metrics=False,
+    mode="preprocessing",
+    profile=None,
+    onehot_sparse=False,
+    max_categories=None,
+    rare_strategy="other",
+    progress=None,
+    cache=None,
+    input_fingerprint=None,
+    trace_file=None,
+    trace_memory=False,
+    log_level=logging.INFO,
+    infer_dtypes=True,
+    output_compression=None,
+    columns_not_loaded=None,
+    executor="serial",
+    workers=None,
+    datetime_plans=None,
+    outlier_simultaneous=False,
+):
+    """
+    Run the PrismaFlow preprocessing steps on df.
+
+    df may also be a file path (see file_io.read_table); the columns the manual and
+    empty-column steps would drop (plan_column_pushdown) are then never read.
+    columns_not_loaded: {column: step} the caller already left out of df the same
+    way; they are logged and counted as removed by that step.
+    executor: "serial", "threads" or "processes" (see column_executor); the per-column
+    work of drop_empty_columns, handle_nulls (modes), finalize_dtypes, label encoding
+    and temporal_features is spread over `workers` workers (default: CPU count).
+    Results are merged in column order, so the output does not depend on the mode.
+
+    profile: optional column_profile.profile_columns(df) result computed earlier
+    for the same data; the cleaning steps reuse it instead of re-scanning columns.
+    datetime_plans: {column: datetime plan} kept by the caller for this dataset;
+    finalize_dtypes tries these formats first and records the ones it infers.
+    outlier_simultaneous: judge all numeric columns on the same rows when dropping
+    outliers (outliers_removal.remove_outliers simultaneous=True) instead of one
+    column after another. The chunked pipeline always works this way.
+    onehot_sparse / max_categories / rare_strategy: one-hot options, see
+    encoding.encode_features (sparse dummies, per-column cardinality cap).
+    progress: optional callable progress(step, done, total), called before each
+    step that runs and once more with step "done" at the end. Exceptions it raises
+    (e.g. a cancelled job) abort the run.
+    cache: optional step_cache.StepCache. The frame after each step is cached under
+    the input fingerprint plus the parameters of every step so far, and a re-run
+    resumes after the longest cached prefix. input_fingerprint: stable id of df
+    (e.g. an upload token) to use instead of hashing its contents.
+    trace_file: optional path for a Chrome trace (JSON) of the steps that ran.
+    trace_memory: also trace allocations per step (peak / net bytes); slower.
+    Per-step timings are logged and returned as metrics["steps"].
+    log_level: verbosity of the run log (logs.txt); logging.WARNING skips the
+    per-column lines. The log is buffered and written once the run ends.
+    infer_dtypes: set False for typed input (Parquet/Feather) so finalize_dtypes keeps
+    text columns as text instead of re-inferring numbers and datetimes.
+    output_file: .csv (optionally compressed, e.g. .csv.gz), .parquet or .feather;
+    output_compression overrides the codec (see file_io.write_table).
+    """
+
+    if isinstance(df, (str, os.PathLike)):
+        source = df
+        header = read_columns(source)
+        columns_not_loaded = plan_column_pushdown(
+            header,
+            target_col=target_col,
+            manual_columns=manual_columns,
+            columns_to_keep=columns_to_keep,
+            steps=steps,
+            profile=profile,
+        )
+        df = read_table(source, columns=[c for c in header if c not in columns_not_loaded])
+        logging.info(f"Read {df.shape[1]} of {len(header)} columns from {source}")
+    columns_not_loaded = dict(columns_not_loaded or {})
+
+    if df is None:
+
+        logging.error("DataFrame is None")
+
+        if collect_metrics and return_df:
+            return None, {"error": "DataFrame is None"}
+        return None if return_df else False
+
+    mode_label = "Cleaning" if mode == "cleaning" else "Preprocessing"
+    logging.info(f"{mode_label} Initiated")
+    start_time = time.time()
+    divider()
+
+    keep = list(columns_to_keep or [])
+    column_executor = ColumnExecutor.resolve(executor, workers)
+
+    options = _normalize_options(
+        null_threshold=null_threshold,
+        encoding_method=encoding_method,
+        handle_outliers=handle_outliers,
+        outlier_drop=outlier_drop,
+        scaling_method=scaling_method,
+        outlier_skipping=outlier_skipping,
+        scaling_skipping=scaling_skipping,
+        outlier_method=outlier_method,
+        outlier_param=outlier_param,
+        steps=steps,
+        outlier_simultaneous=outlier_simultaneous,
+    )
+    null_threshold = options["null_threshold"]
+    encoding_method = options["encoding_method"]
+    handle_outliers = options["handle_outliers"]
+    outlier_drop = options["outlier_drop"]
+    scaling_method = options["scaling_method"]
+    outlier_skipping = options["outlier_skipping"]
+    scaling_skipping = options["scaling_skipping"]
+    outlier_method = options["outlier_method"]
+    outlier_param = options["outlier_param"]
+    outlier_simultaneous = options["outlier_simultaneous"]
+    enabled_steps = options["enabled_steps"]
+
+    planned_steps = [
+        s for s in ALL_STEPS
+        if s in enabled_steps and (s != "handle_outliers" or handle_outliers)
+    ]
+
+    def _progress(step):
+        if progress is not None:
+            done = planned_steps.index(step) if step in planned_steps else len(planned_steps)
+            progress(step, done, len(planned_steps))
 
     metrics = None
     if collect_metrics:
@@ -158,41 +303,82 @@ def prismaflow_pipeline(
             "columns_removed_empty": 0,
             "columns_removed_feature_selection": 0,
             "columns_removed_temporal": 0,
+            "memory_bytes_saved": 0,
+            "cache_hit_steps": 0,
+            "cache_time_saved_seconds": 0.0,
+            "frame_copies": 0,
+            "steps": [],
         }
 
-    df[row_number_col] = range(1, len(df) + 1)
+    input_key = None
+    if cache is not None:
+        try:
+            input_key = chain_key(
+                input_fingerprint or fingerprint_frame(df),
+                "input",
+                {"target_col": target_col, "keep": keep, "not_loaded": sorted(columns_not_loaded)},
+            )
+        except Exception as e:
+            logging.warning(f"Step cache disabled for this run | {e}")
+
+    # Steps work on a shallow copy indexed by row position, so the caller's frame is
+    # left alone and the surviving positions say which targets / index labels to keep
+    input_index = df.index
+    df = df.set_axis(pd.RangeIndex(len(df)), axis=0)
 
     y = None
 
-    df, y = remove_target(df, target_col, id_col=row_number_col)
+    df, y = remove_target(df, target_col)
 
-    if "manual_columns" in enabled_steps:
-        cols_before = set(df.columns)
-        df = remove_columns(df, manual_columns, exclude_cols=keep)
+    # Runners return the step's frame_delta.FrameDelta; the step loop applies it
+    def run_manual_columns(df):
+        not_loaded = [c for c, step in columns_not_loaded.items() if step == "manual_columns"]
+        delta = remove_columns(df, manual_columns, exclude_cols=keep, not_loaded=not_loaded, return_delta=True)
         if metrics is not None:
-            dropped = (cols_before - set(df.columns)) - {row_number_col}
-            metrics["columns_removed_manual"] += len(dropped)
+            metrics["columns_removed_manual"] += len(delta.drop) + len(not_loaded)
+        return delta
 
-    if "drop_empty_columns" in enabled_steps:
-        cols_before = set(df.columns)
+    def run_drop_empty_columns(df):
         # Always drop mostly-empty columns (>=95% empty), even if user "kept" them.
         # Keeping columns is meant for later processing exclusions, not retaining near-empty columns.
-        df = clear_columns(df, exclude_cols=[row_number_col], empty_threshold=0.95)
+        not_loaded = [c for c, step in columns_not_loaded.items() if step == "drop_empty_columns"]
+        delta = clear_columns(
+            df,
+            empty_threshold=EMPTY_COLUMN_THRESHOLD,
+            profile=profile,
+            not_loaded=not_loaded,
+            executor=column_executor,
+            return_delta=True,
+        )
         if metrics is not None:
-            dropped = (cols_before - set(df.columns)) - {row_number_col}
-            metrics["columns_removed_empty"] += len(dropped)
+            metrics["columns_removed_empty"] += len(delta.drop) + len(not_loaded)
+        return delta
 
-    if "handle_nulls" in enabled_steps:
-        rows_before = int(df.shape[0])
-        df = clear_null_values(df, null_threshold, exclude_cols=keep)
+    def run_handle_nulls(df):
+        delta = clear_null_values(
+            df, null_threshold, exclude_cols=keep, profile=profile, executor=column_executor, return_delta=True
+        )
         if metrics is not None:
-            metrics["rows_dropped_nulls"] += max(0, rows_before - int(df.shape[0]))
+            metrics["rows_dropped_nulls"] += delta.rows_dropped
+        return delta
+
+    def run_finalize_dtypes(df):
+        return finalize_dtypes(
+            df,
+            exclude_cols=keep,
+            infer_text=infer_dtypes,
+            executor=column_executor,
+            return_delta=True,
+            datetime_plans=datetime_plans,
+        )
 
-    if "finalize_dtypes" in enabled_steps:
-        df = finalize_dtypes(df, exclude_cols=keep)
+    def run_downcast_dtypes(df):
+        delta, bytes_saved = downcast_dtypes(df, exclude_cols=keep, return_saved=True, return_delta=True)
+        if metrics is not None:
+            metrics["memory_bytes_saved"] += bytes_saved
+        return delta
 
-    if handle_outliers and ("handle_outliers" in enabled_steps):
-        rows_before = int(df.shape[0])
+    def run_handle_outliers(df):
         extra_kwargs = {}
         if outlier_param is not None:
             if outlier_method == "iqr":
@@ -202,55 +388,155 @@ def prismaflow_pipeline(
             else:
                 extra_kwargs["modified_zscore_threshold"] = outlier_param
 
-        total_outliers_handled = None
-        if metrics is not None and not outlier_drop:
-            df, total_outliers_handled = remove_outliers(
-                df,
-                outlier_drop,
-                exclude_cols=[row_number_col, *outlier_skipping],
-                method=outlier_method,
-                return_total=True,
-                **extra_kwargs,
-            )
-        else:
-            df = remove_outliers(
-                df,
-                outlier_drop,
-                exclude_cols=[row_number_col, *outlier_skipping],
-                method=outlier_method,
-                **extra_kwargs,
-            )
+        delta, total_outliers_handled = remove_outliers(
+            df,
+            outlier_drop,
+            exclude_cols=outlier_skipping,
+            method=outlier_method,
+            return_total=True,
+            return_delta=True,
+            simultaneous=outlier_simultaneous,
+            **extra_kwargs,
+        )
         if metrics is not None:
-            dropped_rows = max(0, rows_before - int(df.shape[0]))
-            metrics["rows_dropped_outliers"] += dropped_rows
+            metrics["rows_dropped_outliers"] += delta.rows_dropped
             if outlier_drop:
-                metrics["outliers_removed"] += dropped_rows
+                metrics["outliers_removed"] += delta.rows_dropped
             else:
-                metrics["outliers_removed"] += int(total_outliers_handled or 0)
-
-    if "encoding" in enabled_steps:
-        df = encode_features(df, encoding_method, exclude_cols=keep)
+                metrics["outliers_removed"] += total_outliers_handled
+        return delta
+
+    def run_encoding(df):
+        return encode_features(
+            df,
+            encoding_method,
+            exclude_cols=keep,
+            sparse=onehot_sparse,
+            max_categories=max_categories,
+            rare_strategy=rare_strategy,
+            executor=column_executor,
+            return_delta=True,
+        )
 
-    if "feature_selection" in enabled_steps:
-        cols_before = set(df.columns)
-        df = feature_selection(df, exclude_cols=[row_number_col, *keep])
+    def run_feature_selection(df):
+        delta = feature_selection(df, exclude_cols=keep, return_delta=True)
         if metrics is not None:
-            dropped = (cols_before - set(df.columns)) - {row_number_col}
-            metrics["columns_removed_feature_selection"] += len(dropped)
+            metrics["columns_removed_feature_selection"] += len(delta.drop)
+        return delta
 
-    if "temporal_features" in enabled_steps:
-        cols_before = set(df.columns)
-        df = extract_temporal_features(df, exclude_cols=keep)
+    def run_temporal_features(df):
+        delta = extract_temporal_features(df, exclude_cols=keep, executor=column_executor, return_delta=True)
         if metrics is not None:
-            dropped = (cols_before - set(df.columns)) - {row_number_col}
-            metrics["columns_removed_temporal"] += len(dropped)
+            metrics["columns_removed_temporal"] += len(delta.drop)
+        return delta
+
+    def run_scaling(df):
+        return scale_features(df, scaling_method, exclude_cols=scaling_skipping, return_delta=True)
+
+    # (step, parameters that affect its output, runner) in execution order
+    step_plan = [
+        ("manual_columns", {"manual_columns": manual_columns, "keep": keep}, run_manual_columns),
+        ("drop_empty_columns", {}, run_drop_empty_columns),
+        ("handle_nulls", {"null_threshold": null_threshold, "keep": keep}, run_handle_nulls),
+        ("finalize_dtypes", {"keep": keep, "infer_dtypes": bool(infer_dtypes)}, run_finalize_dtypes),
+        ("downcast_dtypes", {"keep": keep}, run_downcast_dtypes),
+        (
+            "handle_outliers",
+            {
+                "outlier_drop": outlier_drop,
+                "outlier_method": outlier_method,
+                "outlier_param": outlier_param,
+                "outlier_skipping": outlier_skipping,
+                "outlier_simultaneous": outlier_simultaneous,
+            },
+            run_handle_outliers,
+        ),
+        (
+            "encoding",
+            {
+                "encoding_method": encoding_method,
+                "keep": keep,
+                "onehot_sparse": bool(onehot_sparse),
+                "max_categories": max_categories,
+                "rare_strategy": rare_strategy,
+            },
+            run_encoding,
+        ),
+        ("feature_selection", {"keep": keep}, run_feature_selection),
+        ("temporal_features", {"keep": keep}, run_temporal_features),
+        ("scaling", {"scaling_method": scaling_method, "scaling_skipping": scaling_skipping}, run_scaling),
+    ]
+
+    # Prefix keys cover skipped steps too, so toggling a step invalidates everything after it
+    prefix_keys = []
+    if input_key is not None:
+        parent = input_key
+        for step, params, _ in step_plan:
+            parent = chain_key(parent, step, params if step in planned_steps else None)
+            prefix_keys.append(parent)
+
+    resume_at = 0
+    compute_seconds = 0.0
+    cache_hit_steps = 0
+    cache_time_saved = 0.0
+    frame_copies = 0
+    for i in range(len(prefix_keys) - 1, -1, -1):
+        entry = cache.get(prefix_keys[i])
+        if entry is None:
+            continue
+        df, y = entry["df"], entry["y"]
+        if metrics is not None and entry["metrics"] is not None:
+            metrics.update(entry["metrics"])
+        resume_at = i + 1
+        compute_seconds = cache_time_saved = entry["seconds"]
+        cache_hit_steps = sum(1 for step, _, _ in step_plan[:resume_at] if step in planned_steps)
+        logging.info(
+            f"Resumed from cached state after step \"{step_plan[i][0]}\" "
+            f"({cache_hit_steps} steps reused, {round(cache_time_saved, 2)} seconds saved)"
+        )
+        divider()
+        break
+
+    with StepProfiler(trace_memory=trace_memory) as profiler:
+        if resume_at:
+            profiler.mark("resumed from cache", after_step=step_plan[resume_at - 1][0], seconds_saved=round(cache_time_saved, 2))
+
+        for i in range(resume_at, len(step_plan)):
+            step, _, runner = step_plan[i]
+            if step in planned_steps:
+                _progress(step)
+                profiler.start(step, df)
+                df, copies = apply_delta(df, runner(df), return_copies=True)
+                record = profiler.stop(df)
+                record["frame_copies"] = copies
+                frame_copies += copies
+                logging.info(
+                    f'Step "{step}" took {record["wall_seconds"]} seconds (CPU {record["cpu_seconds"]} seconds) | '
+                    f'rows {record["rows_in"]} -> {record["rows_out"]}, columns {record["cols_in"]} -> {record["cols_out"]}'
+                )
+                compute_seconds += record["wall_seconds"]
+                if prefix_keys:
+                    cache.put(prefix_keys[i], df, y, metrics, compute_seconds)
+
+    if trace_file:
+        try:
+            profiler.write_chrome_trace(trace_file)
+            logging.info(f"Step trace written to {trace_file}")
+        except Exception as e:
+            logging.warning(f"Failed writing step trace to {trace_file} | {e}")
 
-    if "scaling" in enabled_steps:
-        df = scale_features(df, scaling_method, exclude_cols=[row_number_col, *scaling_skipping])
+    if metrics is not None:
+        metrics["cache_hit_steps"] = cache_hit_steps
+        metrics["cache_time_saved_seconds"] = round(cache_time_saved, 2)
+        metrics["steps"] = profiler.records
 
-    df = add_target(df, y, target_col, key_col=row_number_col)
+    if y is not None:
+        df = add_target(df, y, target_col)
+        df.index = pd.RangeIndex(len(df))
+    else:
+        df.index = input_index.take(df.index.to_numpy())
 
-    df.drop(columns=[row_number_col], inplace=True, errors="ignore")
+    _progress("done")
 
     end_time = time.time()
     time_elapsed = end_time - start_time
@@ -260,10 +546,13 @@ def prismaflow_pipeline(
 
     logging.info(f"Time elapsed: {round(time_elapsed, 2)} seconds")
 
+    logging.info(f"Frame copies: {frame_copies}")
+
     divider()
 
     if metrics is not None:
         metrics["time_processed_seconds"] = round(time_elapsed, 2)
+        metrics["frame_copies"] = frame_copies
         metrics["rows_dropped"] = metrics["rows_dropped_nulls"] + metrics["rows_dropped_outliers"]
         metrics["columns_removed"] = (
             metrics["columns_removed_manual"]
@@ -273,7 +562,7 @@ def prismaflow_pipeline(
         )
 
     if output_file:
-        export_file(df, output_file)
+        export_file(df, output_file, compression=output_compression)
 
     if collect_metrics and return_df:
         return df, metrics
@@ -1,11 +1,32 @@
+import numpy as np
 import pandas as pd
+import warnings
 from pandas.api.types import is_numeric_dtype
 import logging
 from divider import divider
+from column_executor import ColumnExecutor
+from column_profile import profile_for
+from frame_delta import FrameDelta, apply_delta
 
 # Automatic Removal of Null Values
 
-def clear_null_values(df, threshold, exclude_cols=None):
+# Placeholder log events for fill values that are only known later
+_MEAN_FILL = "mean"
+_MODE_FILL = "mode"
+
+def _fill_mode(s, alive):
+    # Most frequent value among the rows still alive when the column was reached
+    mode = s[alive].mode(dropna=True)
+    return mode.iloc[0] if not mode.empty else ""
+
+
+def clear_null_values(df, threshold, exclude_cols=None, profile=None, executor=None, return_delta=False):
+    """
+    Drop rows with nulls in columns at or under `threshold` null ratio; fill the
+    columns over it with the mean (numeric) or the mode (other columns).
+    executor: column_executor.ColumnExecutor (or mode name) computing the modes in parallel.
+    return_delta: return the frame_delta.FrameDelta instead of the new frame.
+    """
 
     logging.info(f"=== AUTO REMOVAL OF NULL VALUES STARTED ===")
 
@@ -16,37 +37,98 @@ def clear_null_values(df, threshold, exclude_cols=None):
 
         logging.info("Dataframe is empty")
 
-        return df
-
-    for column in df.columns:
+        return FrameDelta() if return_delta else df
+
+    # One isna() pass for the whole frame; row drops are tracked in a mask and
+    # filled columns replace the originals when the delta is applied.
+    # Columns the cached profile reports as null-free skip the isna() pass entirely.
+    columns = list(df.columns)
+    null_cols = [
+        c for c in columns
+        if c not in exclude and (profile_for(profile, df, c) or {}).get("null_count", 1) > 0
+    ]
+    null_pos = {c: i for i, c in enumerate(null_cols)}
+    null_block = df[null_cols].isna().to_numpy()
+    alive = np.ones(len(df), dtype=bool)
+    fills = {}
+    pending_means = []
+    # Means are computed in batches and modes after the row-drop pass, each against
+    # the rows alive when its column was reached; their log lines are placeholders
+    # until then, so the log keeps the column order
+    pending_modes = []
+    alive_snapshot = None
+    events = []
+
+    def _flush_means():
+        # Means for numeric fill columns decided since the last row drop share one batched pass
+        if not pending_means:
+            return
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            # Column-contiguous layout keeps NumPy's pairwise summation, matching Series.mean()
+            values = np.ascontiguousarray(df[pending_means].to_numpy(dtype="float64", na_value=np.nan)[alive].T)
+            means = np.nanmean(values, axis=1) if values.shape[1] else np.full(len(pending_means), np.nan)
+        fills.update(zip(pending_means, means))
+        pending_means.clear()
+
+    for column in columns:
         if column in exclude:
             continue
 
-        if (df[column].isnull().sum()) / len(df) > threshold:
+        n_alive = int(alive.sum())
+        if column in null_pos:
+            col_nulls = null_block[:, null_pos[column]] & alive
+            null_count = int(col_nulls.sum())
+        else:
+            null_count = 0
+        ratio = (null_count / n_alive) if n_alive else float("nan")
 
-            if is_numeric_dtype(df[column]):
+        if ratio > threshold:
 
-                df[column] = df[column].fillna(df[column].mean())
+            if is_numeric_dtype(df[column]):
 
-                logging.info(f"Filled with the mean - {df[column].mean().round(2)} of the column \"{column}\"")
+                pending_means.append(column)
+                events.append((_MEAN_FILL, column))
 
             else:
 
-                mode = df[column].mode(dropna=True)
-                fill_value = mode.iloc[0] if not mode.empty else ""
-                df[column] = df[column].fillna(fill_value)
+                _flush_means()
+                if alive_snapshot is None:
+                    alive_snapshot = alive.copy()
+                pending_modes.append((column, alive_snapshot))
+                events.append((_MODE_FILL, column))
 
-                logging.info(f"Filled with the mode - {fill_value} of the column \"{column}\"")
-        
         else:
 
-            rows_before = len(df)
-            df.dropna(subset=[column], inplace=True)
-            rows_after = len(df)
-            dropped_rows = rows_before - rows_after
-            logging.info(f"Dropped {dropped_rows} rows with nulls from the column \"{column}\"")
+            if null_count:
+                _flush_means()
+                alive &= ~col_nulls
+                alive_snapshot = None
+            events.append(("Dropped %s rows with nulls from the column \"%s\"", (null_count, column)))
+
+            total_dropped_rows += null_count
+
+    _flush_means()
+
+    if pending_modes:
+        mode_columns = [c for c, _ in pending_modes]
+        modes = ColumnExecutor.resolve(executor).map(
+            _fill_mode, (df[c] for c in mode_columns), (mask for _, mask in pending_modes)
+        )
+        fills.update(zip(mode_columns, modes))
+
+    for message, args in events:
+        if message is _MEAN_FILL:
+            logging.info("Filled with the mean - %s of the column \"%s\"", np.float64(fills[args]).round(2), args)
+        elif message is _MODE_FILL:
+            logging.info("Filled with the mode - %s of the column \"%s\"", fills[args], args)
+        else:
+            logging.info(message, *args)
 
-            total_dropped_rows += dropped_rows
+    delta = FrameDelta(
+        row_mask=alive if total_dropped_rows else None,
+        columns={column: df[column].fillna(value) for column, value in fills.items()},
+    )
 
     divider()
 
@@ -56,4 +138,4 @@ def clear_null_values(df, threshold, exclude_cols=None):
 
     divider()
 
-    return df
\ No newline at end of file
+    return delta if return_delta else apply_delta(df, delta)
\ No newline at end of file
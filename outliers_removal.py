@@ -1,9 +1,39 @@
 import numpy as np
+import pandas as pd
+import warnings
 import logging
 from divider import divider
+from frame_delta import FrameDelta, apply_delta
 
 # Standard Removal of Outliers
 
+def _outlier_bounds(block, method_key, multiplier, zscore_threshold, modified_zscore_threshold):
+    """
+    Lower/upper bounds for every column of a 2D float block (NaNs ignored).
+    A value is an outlier when it is strictly outside its column's bounds;
+    columns with no spread get NaN bounds, which flag nothing.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+
+        if method_key == "iqr":
+            q1, q3 = np.nanquantile(block, [0.25, 0.75], axis=0)
+            iqr = q3 - q1
+            return q1 - multiplier * iqr, q3 + multiplier * iqr
+
+        if method_key == "zscore":
+            mean = np.nanmean(block, axis=0)
+            std = np.nanstd(block, axis=0)
+            std = np.where(std == 0, np.nan, std)
+            return mean - float(zscore_threshold) * std, mean + float(zscore_threshold) * std
+
+        median = np.nanmedian(block, axis=0)
+        mad = np.nanmedian(np.abs(block - median), axis=0)
+        mad = np.where(mad == 0, np.nan, mad)
+        bound = float(modified_zscore_threshold) * mad / 0.6745
+        return median - bound, median + bound
+
+
 def remove_outliers(
     df,
     drop,
@@ -13,7 +43,20 @@ def remove_outliers(
     zscore_threshold=3.0,
     modified_zscore_threshold=3.5,
     return_total=False,
+    simultaneous=False,
+    return_delta=False,
 ):
+    """
+    Detect outliers in every numeric column and remove or cap them.
+
+    The bounds for all columns are computed in one batched NumPy pass; the result
+    is one row mask (drop) or one block of clipped columns (cap).
+    simultaneous: only used when dropping. False keeps the historical semantics,
+    where each column's bounds are computed on the rows left by the previous
+    columns. True computes all bounds on the same rows and drops a row if any
+    column flags it.
+    return_delta: return the frame_delta.FrameDelta instead of the new frame.
+    """
 
     logging.info("=== OUTLIER HANDLING STARTED ===")
 
@@ -21,6 +64,7 @@ def remove_outliers(
     if exclude_cols:
         numeric_cols = [c for c in numeric_cols if c not in set(exclude_cols)]
     total_outliers = 0
+    delta = FrameDelta()
 
     method_key = (method or "iqr").strip().lower()
     if method_key not in {"iqr", "zscore", "modified_zscore"}:
@@ -33,75 +77,56 @@ def remove_outliers(
     else:
         logging.info(f"Method : Modified Z-Score (threshold={modified_zscore_threshold})")
 
-    for col in numeric_cols:
-        series = df[col]
-
-        if method_key == "iqr":
-            Q1 = series.quantile(0.25)
-            Q3 = series.quantile(0.75)
-            IQR = Q3 - Q1
-
-            lower_bound = Q1 - multiplier * IQR
-            upper_bound = Q3 + multiplier * IQR
-
-            outlier_mask = (series < lower_bound) | (series > upper_bound)
-
-        elif method_key == "zscore":
-            mean = series.mean()
-            std = series.std(ddof=0)
-            if std == 0 or np.isnan(std):
-                outlier_mask = np.zeros(len(df), dtype=bool)
-            else:
-                z = (series - mean) / std
-                outlier_mask = z.abs() > float(zscore_threshold)
-
-        else:  # modified_zscore
-            median = series.median()
-            mad = (series - median).abs().median()
-            if mad == 0 or np.isnan(mad):
-                outlier_mask = np.zeros(len(df), dtype=bool)
-            else:
-                mz = 0.6745 * (series - median) / mad
-                outlier_mask = mz.abs() > float(modified_zscore_threshold)
-
-        outlier_count = outlier_mask.sum()
-
-        if outlier_count > 0:
-            total_outliers += outlier_count
-
-            if drop:
-                df = df[~outlier_mask]
-                logging.info(f'Removed {outlier_count} outliers from column "{col}"')
-
+    if not numeric_cols or len(df) == 0:
+        for col in numeric_cols:
+            logging.info('No outliers detected in column "%s"', col)
+    else:
+        # One float copy of all numeric columns; every statistic and mask is computed on it
+        block = df[numeric_cols].to_numpy(dtype="float64", na_value=np.nan)
+
+        if drop and not simultaneous:
+            # Sequential semantics: each column's bounds come from the rows that
+            # survived the previous columns. Track survivors in a mask, filter once.
+            alive = np.ones(len(block), dtype=bool)
+            lower = np.full(len(numeric_cols), np.nan)
+            upper = np.full(len(numeric_cols), np.nan)
+            counts = np.zeros(len(numeric_cols), dtype="int64")
+            for j in range(len(numeric_cols)):
+                lo, hi = _outlier_bounds(block[alive, j : j + 1], method_key, multiplier, zscore_threshold, modified_zscore_threshold)
+                lower[j], upper[j] = lo[0], hi[0]
+                with np.errstate(invalid="ignore"):
+                    col_mask = alive & ((block[:, j] < lower[j]) | (block[:, j] > upper[j]))
+                counts[j] = int(col_mask.sum())
+                alive &= ~col_mask
+            row_mask = alive
+        else:
+            lower, upper = _outlier_bounds(block, method_key, multiplier, zscore_threshold, modified_zscore_threshold)
+            with np.errstate(invalid="ignore"):
+                outlier_block = (block < lower) | (block > upper)
+            counts = outlier_block.sum(axis=0)
+            row_mask = ~outlier_block.any(axis=1)
+
+        for col, outlier_count in zip(numeric_cols, counts):
+            if outlier_count > 0:
+                total_outliers += int(outlier_count)
+                if drop:
+                    logging.info('Removed %s outliers from column "%s"', outlier_count, col)
+                else:
+                    logging.info('Capped %s outliers in column "%s"', outlier_count, col)
             else:
-                if method_key == "iqr":
-                    df.loc[outlier_mask & (series < lower_bound), col] = lower_bound
-                    df.loc[outlier_mask & (series > upper_bound), col] = upper_bound
-                    logging.info(f'Capped {outlier_count} outliers in column "{col}"')
-
-                elif method_key == "zscore":
-                    if std == 0 or np.isnan(std):
-                        logging.info(f'No outliers detected in column "{col}"')
-                    else:
-                        lower_bound = mean - float(zscore_threshold) * std
-                        upper_bound = mean + float(zscore_threshold) * std
-                        df.loc[outlier_mask & (series < lower_bound), col] = lower_bound
-                        df.loc[outlier_mask & (series > upper_bound), col] = upper_bound
-                        logging.info(f'Capped {outlier_count} outliers in column "{col}"')
-
-                else:  # modified_zscore
-                    if mad == 0 or np.isnan(mad):
-                        logging.info(f'No outliers detected in column "{col}"')
-                    else:
-                        bound = float(modified_zscore_threshold) * mad / 0.6745
-                        lower_bound = median - bound
-                        upper_bound = median + bound
-                        df.loc[outlier_mask & (series < lower_bound), col] = lower_bound
-                        df.loc[outlier_mask & (series > upper_bound), col] = upper_bound
-                        logging.info(f'Capped {outlier_count} outliers in column "{col}"')
+                logging.info('No outliers detected in column "%s"', col)
 
+        if drop:
+            if not row_mask.all():
+                delta.row_mask = row_mask
         else:
-            logging.info(f'No outliers detected in column "{col}"')
+            capped = np.flatnonzero(counts > 0)
+            if len(capped):
+                capped_cols = [numeric_cols[j] for j in capped]
+                lo = np.where(np.isnan(lower[capped]), -np.inf, lower[capped])
+                hi = np.where(np.isnan(upper[capped]), np.inf, upper[capped])
+                clipped = pd.DataFrame(np.clip(block[:, capped], lo, hi), columns=capped_cols, index=df.index)
+                delta.columns = {col: clipped[col] for col in capped_cols}
 
     divider()
 
@@ -111,6 +136,7 @@ def remove_outliers(
 
     divider()
 
+    result = delta if return_delta else apply_delta(df, delta)
     if return_total:
-        return df, int(total_outliers)
-    return df
+        return result, int(total_outliers)
+    return result
@@ -0,0 +1,138 @@
+import gzip
+import json
+import logging
+import time
+from collections import Counter
+
+from chunked_pipeline import apply_pipeline_state, fit_pipeline_state
+from divider import divider
+from main import log_file
+from run_log import with_run_log
+
+_STATE_FORMAT_VERSION = 1
+
+
+class PrismaFlowPipeline:
+    """
+    Fit/transform wrapper around the PrismaFlow steps.
+
+    fit() learns every step's parameters once (fill values, outlier bounds,
+    encoder vocabularies, dropped columns, scaler parameters); transform()
+    replays them on new data in a single pass, without re-fitting or re-inferring.
+    The fitted state is plain JSON and can be saved and loaded.
+
+    Accepts the same options as main.prismaflow_pipeline.
+    """
+
+    def __init__(
+        self,
+        target_col=None,
+        manual_columns=None,
+        outlier_skipping=None,
+        columns_to_keep=None,
+        scaling_skipping=None,
+        handle_outliers=True,
+        outlier_method="iqr",
+        outlier_drop=True,
+        outlier_param=None,
+        null_threshold=0.05,
+        encoding_method="label",
+        steps=None,
+        scaling_method="standard",
+    ):
+        self.target_col = target_col
+        self.manual_columns = manual_columns
+        self.columns_to_keep = columns_to_keep
+        self.options = {
+            "outlier_skipping": outlier_skipping,
+            "scaling_skipping": scaling_skipping,
+            "handle_outliers": handle_outliers,
+            "outlier_method": outlier_method,
+            "outlier_drop": outlier_drop,
+            "outlier_param": outlier_param,
+            "null_threshold": null_threshold,
+            "encoding_method": encoding_method,
+            "steps": steps,
+            "scaling_method": scaling_method,
+        }
+        self.state_ = None
+        self.last_metrics_ = None
+
+    @with_run_log(log_file)
+    def fit(self, df):
+        logging.info("Fitting Initiated")
+        start_time = time.time()
+        divider()
+
+        # The whole frame is a single chunk, so quantile bounds are exact (no sampling)
+        self.state_ = fit_pipeline_state(
+            lambda: [df],
+            target_col=self.target_col,
+            manual_columns=self.manual_columns,
+            columns_to_keep=self.columns_to_keep,
+            sample_size=None,
+            **self.options,
+        )
+
+        logging.info(f"Fitting completed in {round(time.time() - start_time, 2)} seconds")
+        divider()
+        return self
+
+    @with_run_log(log_file)
+    def transform(self, df):
+        if self.state_ is None:
+            raise ValueError("PrismaFlowPipeline is not fitted yet. Call fit() or load() first.")
+
+        counters = Counter()
+        start_time = time.time()
+        out = apply_pipeline_state(df, self.state_, counters=counters)
+        self.last_metrics_ = {
+            "time_processed_seconds": round(time.time() - start_time, 2),
+            "rows_dropped_nulls": counters["rows_dropped_nulls"],
+            "rows_dropped_outliers": counters["rows_dropped_outliers"],
+            "outliers_removed": counters["outliers_removed"],
+        }
+        logging.info(
+            f"Transformed {int(df.shape[0])} rows -> {int(out.shape[0])} rows, "
+            f"{int(df.shape[1])} columns -> {int(out.shape[1])} columns"
+        )
+        return out
+
+    @with_run_log(log_file)
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    def save(self, path):
+        """
+        Write the fitted state as JSON; paths ending in .gz are gzip-compressed.
+        """
+        if self.state_ is None:
+            raise ValueError("PrismaFlowPipeline is not fitted yet. Nothing to save.")
+
+        payload = {"version": _STATE_FORMAT_VERSION, "state": self.state_}
+        data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        opener = gzip.open if str(path).endswith(".gz") else open
+        with opener(path, "wb") as f:
+            f.write(data)
+        logging.info(f"Fitted pipeline state saved to {path}")
+
+    @classmethod
+    def load(cls, path):
+        opener = gzip.open if str(path).endswith(".gz") else open
+        with opener(path, "rb") as f:
+            payload = json.loads(f.read().decode("utf-8"))
+
+        if payload.get("version") != _STATE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported pipeline state version: {payload.get('version')}")
+
+        state = payload["state"]
+        options = {k: v for k, v in state["options"].items() if k != "enabled_steps"}
+        pipe = cls(
+            target_col=state["target_col"],
+            manual_columns=state["manual_drop"],
+            columns_to_keep=state["columns_to_keep"],
+            steps=state["options"]["enabled_steps"],
+            **options,
+        )
+        pipe.state_ = state
+        return pipe
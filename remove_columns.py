@@ -1,36 +1,48 @@
 import logging
 import pandas as pd
 from divider import divider
+from frame_delta import FrameDelta, apply_delta
 
 # Manual Removal of Columns
 
-def remove_columns(df, cols, exclude_cols=None):
+def remove_columns(df, cols, exclude_cols=None, not_loaded=None, return_delta=False):
+    """
+    not_loaded: columns of `cols` the caller already left out when reading the data
+    (see main.plan_column_pushdown); they are reported as removed.
+    return_delta: return the frame_delta.FrameDelta instead of the new frame.
+    """
 
     if cols is None:
-        return df
+        return FrameDelta() if return_delta else df
     exclude = set(exclude_cols or [])
+    not_loaded = set(not_loaded or [])
 
     # Normalize input: remove empties/whitespace
     cols = [str(c).strip() for c in cols if str(c).strip()]
     if not cols:
-        return df
+        return FrameDelta() if return_delta else df
 
     logging.info(f"=== MANUAL REMOVAL OF COLUMNS STARTED ===")
 
+    to_drop = []
     for col in cols:
         if col in exclude:
-            logging.info(f'Kept column "{col}" (skip manual removal)')
+            logging.info('Kept column "%s" (skip manual removal)', col)
             continue
 
-        if col in df.columns:
-            df.drop(columns=[col], inplace=True)
-            logging.info(f'Removed column "{col}"')
+        if col in df.columns and col not in to_drop:
+            to_drop.append(col)
+            logging.info('Removed column "%s"', col)
+        elif col in not_loaded:
+            not_loaded.discard(col)
+            logging.info('Removed column "%s" (not loaded)', col)
         else:
-            logging.warning(f'Column "{col}" not found, skipping')
+            logging.warning('Column "%s" not found, skipping', col)
+
+    delta = FrameDelta(drop=to_drop)
 
     logging.info(f"=== MANUAL REMOVAL OF COLUMNS COMPLETED ===")
 
     divider()
 
-    return df
-
+    return delta if return_delta else apply_delta(df, delta)
@@ -1,7 +1,11 @@
 import logging
 from divider import divider
 
-def remove_target(df, target_col=None, id_col=None):
+def remove_target(df, target_col=None):
+    """
+    Split the target column off df. Returns (features, target Series); the target
+    keeps df's index, so add_target can line it up with the rows that survive.
+    """
 
     if target_col is None:
 
@@ -12,12 +16,8 @@ def remove_target(df, target_col=None, id_col=None):
     if target_col not in df.columns:
 
         raise ValueError(f"Target column '{target_col}' not found in dataframe.")
-    
-    if id_col is not None and id_col in df.columns:
-        
-        y = df[[id_col, target_col]].copy()
-    else:
-        y = df[target_col].copy()
+
+    y = df[target_col]
     X = df.drop(columns=[target_col])
 
     logging.info(f"=== REMOVING TARGET COLUMN COMPLETED ===")
@@ -0,0 +1,167 @@
+import atexit
+import functools
+import logging
+import threading
+
+# Per-run Log Sink
+#
+# A pipeline run's log records are kept in memory, unformatted, and written to
+# the log file in one go when the run ends; a run that logged nothing leaves the
+# previous file in place. Nothing touches the disk while the steps run, and
+# messages logged with %-style arguments are only formatted at that point. The run's level also gates the root logger, so at WARNING the
+# per-column INFO lines are dropped before a record is even created.
+#
+# A sink only collects records from the thread that opened it, so concurrent
+# runs in a worker pool do not pick up each other's lines. The shared idle sink
+# (per_thread=False) stays attached for the life of the process and collects
+# what is logged outside any run, so the root logger always has a handler and
+# logging.lastResort / basicConfig never start echoing to stderr.
+
+LOG_FORMAT = "%(asctime)s | %(levelname)s | %(message)s"
+DIVIDER = "-" * 32
+
+_lock = threading.Lock()
+_sinks: dict = {}
+
+
+class RunLogFormatter(logging.Formatter):
+    """
+    The pipeline log format; records flagged as bare (dividers) are written as-is.
+    """
+
+    def __init__(self):
+        super().__init__(LOG_FORMAT)
+
+    def format(self, record):
+        if getattr(record, "bare", False):
+            return record.getMessage()
+        return super().format(record)
+
+
+class RunLogSink(logging.Handler):
+    def __init__(self, path, level=logging.INFO, thread_id=None):
+        super().__init__(level)
+        self.path = path
+        self.thread_id = thread_id
+        self.setFormatter(RunLogFormatter())
+        self._records = []
+        if thread_id is not None:
+            self.addFilter(lambda record: record.thread == thread_id)
+        else:
+            self.addFilter(lambda record: record.thread not in _sinks)
+
+    def emit(self, record):
+        # Formatting is deferred to close()
+        self._records.append(record)
+
+    def discard(self) -> None:
+        """
+        Drop the records collected so far without writing them.
+        """
+        self.acquire()
+        try:
+            self._records = []
+        finally:
+            self.release()
+
+    def getvalue(self) -> str:
+        """
+        The log text collected so far, formatted the way it will be written.
+        """
+        self.acquire()
+        try:
+            records = list(self._records)
+        finally:
+            self.release()
+        return "".join(self.format(r) + "\n" for r in records)
+
+    def close(self):
+        self.acquire()
+        try:
+            records, self._records = self._records, []
+            # A sink that collected nothing (e.g. logging disabled) leaves the file as it was
+            if self.path and records:
+                with open(self.path, "w", encoding="utf-8") as f:
+                    f.write("".join(self.format(r) + "\n" for r in records))
+        finally:
+            self.release()
+        super().close()
+
+
+def _sync_root_level(root) -> None:
+    # Open runs decide the level; the idle sink only when no run is open
+    levels = [s.level for k, s in _sinks.items() if k is not None] or [s.level for s in _sinks.values()]
+    root.setLevel(min(levels) if levels else logging.INFO)
+
+
+def start_run_log(path, level=logging.INFO, per_thread=True) -> RunLogSink:
+    """
+    Open a sink for a new run, closing (and writing out) any sink this thread
+    still has open. per_thread=False (re)opens the shared idle sink instead. The
+    idle sink stays attached; what it collected so far is dropped, since the
+    run's log replaces the file anyway.
+    """
+    root = logging.getLogger()
+    key = threading.get_ident() if per_thread else None
+    with _lock:
+        stale = [_sinks.pop(key)] if key in _sinks else []
+        if key is not None and None in _sinks:
+            _sinks[None].discard()
+        sink = RunLogSink(path, level=level, thread_id=key)
+        _sinks[key] = sink
+        root.addHandler(sink)
+        _sync_root_level(root)
+
+    for old in stale:
+        root.removeHandler(old)
+        old.close()
+    return sink
+
+
+def finish_run_log(sink) -> None:
+    """
+    Write the run's records to its log file and detach the sink.
+    """
+    root = logging.getLogger()
+    with _lock:
+        for k, s in list(_sinks.items()):
+            if s is sink:
+                _sinks.pop(k)
+        _sync_root_level(root)
+    root.removeHandler(sink)
+    sink.close()
+
+
+def with_run_log(path):
+    """
+    Decorator giving each call of a pipeline entry point its own run log at `path`.
+    The call's log_level keyword (default INFO) sets the verbosity. The log is
+    written when the call returns or raises; calls made while this thread already
+    has a run log open just add to it.
+    """
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            # Nested entry points (fit_transform -> fit) share the outer run's log
+            if threading.get_ident() in _sinks:
+                return fn(*args, **kwargs)
+            sink = start_run_log(path, level=kwargs.get("log_level", logging.INFO))
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                finish_run_log(sink)
+
+        return wrapper
+
+    return decorate
+
+
+@atexit.register
+def _close_all() -> None:
+    with _lock:
+        sinks = list(_sinks.values())
+        _sinks.clear()
+    for s in sinks:
+        logging.getLogger().removeHandler(s)
+        s.close()
@@ -3,8 +3,13 @@ import numpy as np
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
 import logging
 from divider import divider
+from column_profile import is_sparse, sparse_stats
+from frame_delta import FrameDelta, apply_delta
 
-def scale_features(df, method="standard", columns=None, exclude_cols=None):
+def scale_features(df, method="standard", columns=None, exclude_cols=None, return_delta=False):
+    """
+    return_delta: return the frame_delta.FrameDelta instead of the new frame.
+    """
 
     logging.info(f"=== SCALING STARTED")
 
@@ -24,9 +29,25 @@ def scale_features(df, method="standard", columns=None, exclude_cols=None):
     else:
         raise ValueError("method must be 'standard', 'zscore', or 'minmax'")
 
+    # Sparse columns are shifted/scaled through their fill value so they stay sparse
+    sparse_cols = [c for c in columns if is_sparse(df[c])]
+    dense_cols = [c for c in columns if c not in set(sparse_cols)]
+
     # Apply scaling
+    scaled_columns = {}
     try:
-        df[columns] = scaler.fit_transform(df[columns])
+        if dense_cols:
+            scaled = pd.DataFrame(scaler.fit_transform(df[dense_cols]), columns=dense_cols, index=df.index)
+            scaled_columns.update((col, scaled[col]) for col in dense_cols)
+        for col in sparse_cols:
+            stats = sparse_stats(df[col])
+            if method.lower() == "minmax":
+                center, scale = stats["min"], stats["max"] - stats["min"]
+            else:
+                center, scale = stats["mean"], np.sqrt(stats["var"])
+            if not scale or np.isnan(scale):
+                scale = 1.0
+            scaled_columns[col] = (df[col].astype(pd.SparseDtype("float64", df[col].array.fill_value)) - center) / scale
         method_key = str(method).strip().lower()
         method_display = {
             "standard": "Standard",
@@ -41,4 +62,5 @@ def scale_features(df, method="standard", columns=None, exclude_cols=None):
 
     divider()
 
-    return df
+    delta = FrameDelta(columns=scaled_columns)
+    return delta if return_delta else apply_delta(df, delta)
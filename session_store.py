@@ -0,0 +1,239 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: locking falls back to this process only
+    fcntl = None
+
+# Disk-backed Session Store
+#
+# Each session is a directory under the store root: a small meta.json (file
+# name, columns, profile, metrics, job status, ...) plus one file per payload
+# (the uploaded CSV, the processed CSV, HTML previews). Nothing large stays in
+# process memory, payloads can be handed to pandas / send_file as paths, and
+# several worker processes pointing at the same root share every session.
+#
+# Sessions expire after ttl_seconds. On top of that the total size on disk is
+# kept under max_bytes by evicting the least recently used sessions first.
+
+_TOKEN_RE = re.compile(r"^[0-9a-f]{32}$")
+_NAME_RE = re.compile(r"^[a-z0-9_]+(\.[a-z0-9]+)*$")
+
+_META_FILE = "meta.json"
+_TOUCH_FILE = ".last_access"
+_LOCK_FILE = ".lock"
+
+
+class SessionStore:
+    def __init__(self, root, max_bytes=1024 * 1024 * 1024, ttl_seconds=60 * 60):
+        self.root = os.path.abspath(root)
+        self.max_bytes = int(max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self._thread_lock = threading.RLock()
+        os.makedirs(self.root, exist_ok=True)
+
+    # ---------------- internals ----------------
+
+    def _dir(self, token) -> str | None:
+        if not token or not _TOKEN_RE.match(str(token)):
+            return None
+        return os.path.join(self.root, str(token))
+
+    @contextmanager
+    def _locked(self):
+        """
+        Store-wide lock, shared with other processes through flock when available.
+        """
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.root, _LOCK_FILE), "a+") as fh:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _write_atomic(path, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _read_meta(self, path) -> dict | None:
+        try:
+            with open(os.path.join(path, _META_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, path, meta) -> None:
+        self._write_atomic(os.path.join(path, _META_FILE), json.dumps(meta).encode("utf-8"))
+
+    @staticmethod
+    def _touch(path) -> None:
+        try:
+            os.utime(os.path.join(path, _TOUCH_FILE))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _last_access(path) -> float:
+        try:
+            return os.path.getmtime(os.path.join(path, _TOUCH_FILE))
+        except OSError:
+            return 0.0
+
+    @staticmethod
+    def _size(path) -> int:
+        total = 0
+        try:
+            for entry in os.scandir(path):
+                if entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            pass
+        return total
+
+    def _expired(self, meta, now) -> bool:
+        return meta is None or (now - float(meta.get("created_at", 0))) > self.ttl_seconds
+
+    def _sessions(self):
+        for entry in os.scandir(self.root):
+            if entry.is_dir(follow_symlinks=False) and _TOKEN_RE.match(entry.name):
+                yield entry.name, entry.path
+
+    def _enforce_budget(self, keep=None) -> None:
+        sessions = [(self._last_access(p), self._size(p), tok, p) for tok, p in self._sessions()]
+        total = sum(size for _, size, _, _ in sessions)
+        for _, size, tok, path in sorted(sessions):
+            if total <= self.max_bytes:
+                break
+            if tok == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    # ---------------- public API ----------------
+
+    def cleanup(self) -> None:
+        """
+        Drop expired sessions and evict least recently used ones over the byte budget.
+        """
+        now = time.time()
+        with self._locked():
+            for _, path in list(self._sessions()):
+                if self._expired(self._read_meta(path), now):
+                    shutil.rmtree(path, ignore_errors=True)
+            self._enforce_budget()
+
+    def create(self, token, meta: dict, payloads: dict | None = None) -> None:
+        path = self._dir(token)
+        if path is None:
+            raise ValueError("Invalid session token")
+
+        meta = dict(meta)
+        meta.setdefault("created_at", time.time())
+        with self._locked():
+            os.makedirs(path, exist_ok=True)
+            for name, data in (payloads or {}).items():
+                self._write_atomic(self._payload_file(path, name), data)
+            self._write_meta(path, meta)
+            open(os.path.join(path, _TOUCH_FILE), "a").close()
+            self._touch(path)
+            self._enforce_budget(keep=token)
+
+    def exists(self, token) -> bool:
+        path = self._dir(token)
+        return path is not None and os.path.exists(os.path.join(path, _META_FILE))
+
+    def get(self, token) -> dict | None:
+        """
+        Session metadata, or None for unknown/expired sessions. Marks the session as used.
+        """
+        path = self._dir(token)
+        if path is None:
+            return None
+        meta = self._read_meta(path)
+        if self._expired(meta, time.time()):
+            return None
+        self._touch(path)
+        return meta
+
+    def update(self, token, **fields) -> bool:
+        """
+        Merge fields into the session metadata. Returns False if the session is gone.
+        """
+        path = self._dir(token)
+        if path is None:
+            return False
+        with self._locked():
+            meta = self._read_meta(path)
+            if meta is None:
+                return False
+            meta.update(fields)
+            self._write_meta(path, meta)
+        self._touch(path)
+        return True
+
+    @staticmethod
+    def _payload_file(path, name) -> str:
+        if not _NAME_RE.match(name):
+            raise ValueError(f"Invalid payload name: {name}")
+        return os.path.join(path, name)
+
+    def put_payload(self, token, name, data: bytes) -> bool:
+        path = self._dir(token)
+        if path is None:
+            return False
+        with self._locked():
+            if self._read_meta(path) is None:
+                return False
+            self._write_atomic(self._payload_file(path, name), data)
+            self._enforce_budget(keep=token)
+        self._touch(path)
+        return True
+
+    def payload_path(self, token, name) -> str | None:
+        """
+        Path of a stored payload, for readers that can take a file (pandas, send_file).
+        """
+        path = self._dir(token)
+        if path is None:
+            return None
+        target = self._payload_file(path, name)
+        return target if os.path.exists(target) else None
+
+    def get_payload(self, token, name) -> bytes | None:
+        target = self.payload_path(token, name)
+        if target is None:
+            return None
+        try:
+            with open(target, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def delete_payload(self, token, name) -> None:
+        target = self.payload_path(token, name)
+        if target is not None:
+            try:
+                os.remove(target)
+            except OSError:
+                pass
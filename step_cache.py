@@ -0,0 +1,120 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Step-prefix Cache
+#
+# Keeps the intermediate frame after each pipeline step, keyed by a fingerprint
+# of the input plus the parameters of every step up to and including that one.
+# A re-run that only changes a later step's options finds the longest cached
+# prefix and resumes from there. Entries are evicted least recently used first
+# once their combined size goes over max_bytes.
+#
+# Copy-on-Write (always on in pandas 3) means a shallow copy already isolates a
+# cached frame from later changes on either side, so entries share their data
+# with the run that stored them instead of duplicating it.
+
+
+def fingerprint_frame(df) -> str:
+    """
+    Content hash of a DataFrame: values, index, column names and dtypes.
+    """
+    h = hashlib.sha1()
+    h.update(json.dumps([str(c) for c in df.columns]).encode("utf-8"))
+    h.update(json.dumps([str(t) for t in df.dtypes]).encode("utf-8"))
+    h.update(np.ascontiguousarray(pd.util.hash_pandas_object(df, index=True).to_numpy()).tobytes())
+    return h.hexdigest()
+
+
+def chain_key(parent, step, params) -> str:
+    """
+    Key of a step prefix: the parent prefix key plus this step's name and parameters.
+    """
+    payload = json.dumps([parent, step, params], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+# Rows sampled per object column to estimate the size of its Python objects
+_SIZE_SAMPLE_ROWS = 1000
+
+
+def _frame_bytes(obj) -> int:
+    """
+    Approximate size of a frame or series: exact for array-backed columns, with
+    object columns sized from a strided sample of their values.
+    """
+    if obj is None:
+        return 0
+    try:
+        frame = obj.to_frame() if isinstance(obj, pd.Series) else obj
+        total = int(frame.memory_usage(deep=False, index=True).sum())
+        objects = frame.select_dtypes(include=["object"])
+        if objects.shape[1] and len(objects):
+            sample = objects.iloc[:: max(1, len(objects) // _SIZE_SAMPLE_ROWS)]
+            extra = sample.memory_usage(deep=True, index=False).sum() - sample.memory_usage(deep=False, index=False).sum()
+            total += int(extra * len(objects) / len(sample))
+        return total
+    except Exception:
+        return 0
+
+
+class StepCache:
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key) -> dict | None:
+        """
+        Cached entry for a prefix key, with its own (shallow, copy-on-write) frames.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+        return {
+            "df": entry["df"].copy(deep=False),
+            "y": entry["y"].copy(deep=False) if entry["y"] is not None else None,
+            "metrics": dict(entry["metrics"]) if entry["metrics"] is not None else None,
+            "seconds": entry["seconds"],
+        }
+
+    def put(self, key, df, y, metrics, seconds) -> None:
+        """
+        Store the state after a step (shallow, copy-on-write copies). seconds:
+        compute time it took to reach this state from the raw input.
+        """
+        size = _frame_bytes(df) + _frame_bytes(y)
+        if size > self.max_bytes:
+            return
+        entry = {
+            "df": df.copy(deep=False),
+            "y": y.copy(deep=False) if y is not None else None,
+            "metrics": dict(metrics) if metrics is not None else None,
+            "seconds": float(seconds),
+            "bytes": size,
+        }
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old["bytes"]
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted["bytes"]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# Per-step Profiling
+#
+# Wraps each pipeline step to record wall and CPU time, rows and columns in and
+# out and the frame's memory footprint before and after. CPU time is that of the
+# thread running the step (time.thread_time), so concurrent runs do not show up
+# in it; column work handed to executor threads or processes is not counted.
+#
+# With trace_memory=True Python-level allocations (numpy and pandas buffers
+# included) are traced too, giving the peak and net bytes each step allocated;
+# tracing slows steps down, so it is off by default. tracemalloc sees the whole
+# process, so a step that overlaps another profiled run (JobQueue workers) gets
+# no allocation figures (None) rather than numbers mixing both runs.
+#
+# Records can be written as a Chrome trace (chrome://tracing, Perfetto) or read
+# from the run metrics.
+
+_lock = threading.Lock()
+_active_runs = 0
+# Runs entered so far; a change between start() and stop() means another run overlapped
+_runs_entered = 0
+# Whether a profiler (rather than the host program) turned tracemalloc on
+_started_tracing = False
+
+
+def _frame_bytes(df, deep) -> int:
+    try:
+        return int(df.memory_usage(deep=deep, index=True).sum())
+    except Exception:
+        return 0
+
+
+class StepProfiler:
+    def __init__(self, trace_memory=False):
+        self.trace_memory = bool(trace_memory)
+        self.records: list[dict] = []
+        self.events: list[dict] = []
+        self._origin = time.perf_counter()
+        self._open = None
+
+    def __enter__(self):
+        global _active_runs, _runs_entered
+        with _lock:
+            _active_runs += 1
+            _runs_entered += 1
+        return self
+
+    def __exit__(self, *exc):
+        global _active_runs, _started_tracing
+        with _lock:
+            _active_runs -= 1
+            if _started_tracing and _active_runs == 0:
+                tracemalloc.stop()
+                _started_tracing = False
+        return False
+
+    def _alone(self, since=None) -> bool:
+        with _lock:
+            return _active_runs <= 1 and (since is None or _runs_entered == since)
+
+    def _begin_tracing(self) -> None:
+        global _started_tracing
+        with _lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _started_tracing = True
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def start(self, step, df) -> None:
+        self._open = {
+            "step": step,
+            "rows_in": int(df.shape[0]),
+            "cols_in": int(df.shape[1]),
+            "frame_bytes_in": _frame_bytes(df, self.trace_memory),
+            "_ts": self._now_us(),
+            "_wall": time.perf_counter(),
+            "_cpu": time.thread_time(),
+        }
+        if self.trace_memory and self._alone():
+            self._begin_tracing()
+            tracemalloc.reset_peak()
+            self._open["_mem"] = tracemalloc.get_traced_memory()[0]
+            self._open["_runs"] = _runs_entered
+
+    def stop(self, df) -> dict:
+        rec = self._open
+        self._open = None
+        wall = time.perf_counter() - rec.pop("_wall")
+        cpu = time.thread_time() - rec.pop("_cpu")
+        ts = rec.pop("_ts")
+
+        rec["wall_seconds"] = round(wall, 4)
+        rec["cpu_seconds"] = round(cpu, 4)
+        rec["rows_out"] = int(df.shape[0])
+        rec["cols_out"] = int(df.shape[1])
+        rec["frame_bytes_out"] = _frame_bytes(df, self.trace_memory)
+        rec["memory_delta_bytes"] = rec["frame_bytes_out"] - rec["frame_bytes_in"]
+        if self.trace_memory:
+            base = rec.pop("_mem", None)
+            runs = rec.pop("_runs", None)
+            if base is not None and self._alone(since=runs):
+                current, peak = tracemalloc.get_traced_memory()
+                rec["peak_alloc_bytes"] = max(0, int(peak - base))
+                rec["net_alloc_bytes"] = int(current - base)
+            else:
+                # Another run overlapped the step; process-wide figures would include it
+                rec["peak_alloc_bytes"] = None
+                rec["net_alloc_bytes"] = None
+
+        self.records.append(rec)
+        self.events.append(
+            {
+                "name": rec["step"],
+                "cat": "step",
+                "ph": "X",
+                "ts": ts,
+                "dur": wall * 1e6,
+                "pid": os.getpid(),
+                "tid": 1,
+                "args": {k: v for k, v in rec.items() if k != "step"},
+            }
+        )
+        return rec
+
+    def mark(self, name, **args) -> None:
+        """
+        Instant event in the trace (e.g. resuming from a cached prefix).
+        """
+        self.events.append(
+            {"name": name, "cat": "pipeline", "ph": "i", "s": "p", "ts": self._now_us(), "pid": os.getpid(), "tid": 1, "args": args}
+        )
+
+    def write_chrome_trace(self, path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
@@ -1,8 +1,108 @@
+import numpy as np
 import pandas as pd
 import logging
 from divider import divider
+from column_executor import ColumnExecutor
+from frame_delta import FrameDelta, apply_delta
 
-def extract_temporal_features(df, drop_original=True, exclude_cols=None):
+
+_DATETIME_PARTS = ("year", "month", "day", "hour", "minute", "second", "weekday")
+_TIME_PARTS = ("hour", "minute", "second")
+_TIME_FORMAT = "%H:%M:%S"
+_TIME_SAMPLE_SIZE = 200
+
+_SECONDS_PER_UNIT = {"s": 1, "ms": 10**3, "us": 10**6, "ns": 10**9}
+_NAT = np.iinfo("int64").min
+
+
+def _calendar_parts(s, parts):
+    """
+    The requested calendar parts of a datetime64 column, derived together from its
+    int64 epoch values instead of one .dt accessor each. Same dtypes as .dt:
+    int32, or float64 with NaN when the column has NaT.
+    """
+    if isinstance(s.dtype, pd.DatetimeTZDtype):
+        s = s.dt.tz_localize(None)  # wall-clock time, like .dt
+    values = s.to_numpy()
+    unit = np.datetime_data(values.dtype)[0]
+    ticks = values.view("int64")
+    missing = ticks == _NAT
+
+    seconds = np.floor_divide(np.where(missing, 0, ticks), _SECONDS_PER_UNIT[unit])
+    days, second_of_day = np.divmod(seconds, 86400)
+    out = {
+        "hour": second_of_day // 3600,
+        "minute": (second_of_day // 60) % 60,
+        "second": second_of_day % 60,
+        "weekday": (days + 3) % 7,  # 1970-01-01 was a Thursday
+    }
+    if {"year", "month", "day"} & set(parts):
+        # Proleptic Gregorian date from days since the epoch (civil_from_days)
+        z = days + 719468
+        era = np.floor_divide(z, 146097)
+        doe = z - era * 146097
+        yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+        doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+        mp = (5 * doy + 2) // 153
+        month = np.where(mp < 10, mp + 3, mp - 9)
+        out["year"] = yoe + era * 400 + (month <= 2)
+        out["month"] = month
+        out["day"] = doy - (153 * mp + 2) // 5 + 1
+
+    has_missing = bool(missing.any())
+    result = []
+    for part in parts:
+        arr = out[part]
+        if has_missing:
+            arr = np.where(missing, np.nan, arr.astype("float64"))
+        else:
+            arr = arr.astype("int32")
+        result.append(pd.Series(arr, index=s.index))
+    return result
+
+
+def _datetime_parts(s):
+    return _calendar_parts(s, _DATETIME_PARTS)
+
+
+def _time_sample(s, size=_TIME_SAMPLE_SIZE):
+    # Up to `size` non-null values spread evenly over the column
+    n = len(s)
+    if n == 0:
+        return s
+    positions = np.unique(np.linspace(0, n - 1, num=min(n, size * 4)).astype("int64"))
+    return s.iloc[positions].dropna().head(size)
+
+
+def _parse_time_only(s):
+    """
+    Hour, minute and second of a column whose values are all HH:MM:SS, else None.
+    A sample rules out most other columns; the rest are parsed once per distinct
+    value (a day has at most 86400 of them) and expanded back to every row.
+    """
+    sample = _time_sample(s)
+    if len(sample) and pd.to_datetime(sample, format=_TIME_FORMAT, errors="coerce").isna().any():
+        return None
+
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    try:
+        times = pd.to_datetime(pd.Series(np.asarray(uniques, dtype=object)), format=_TIME_FORMAT, errors="raise")
+    except:
+        return None
+
+    missing = codes < 0
+    if len(uniques) == 0:
+        return [pd.Series(np.full(len(s), np.nan), index=s.index) for _ in _TIME_PARTS]
+    result = []
+    for part in _calendar_parts(times, _TIME_PARTS):
+        values = part.to_numpy()[np.where(missing, 0, codes)]
+        if missing.any():
+            values = np.where(missing, np.nan, values.astype("float64"))
+        result.append(pd.Series(values, index=s.index))
+    return result
+
+
+def extract_temporal_features(df, drop_original=True, exclude_cols=None, executor=None, return_delta=False):
     """
     Extract temporal features from datetime64 columns and time-only columns.
     
@@ -19,62 +119,66 @@ def extract_temporal_features(df, drop_original=True, exclude_cols=None):
         Whether to drop the original columns
     add_timestamp : bool
         Whether to add Unix timestamp for datetime64 columns
+    executor : column_executor.ColumnExecutor or mode name
+        Spreads the per-column parsing and extraction over workers
+    return_delta : bool
+        Return the frame_delta.FrameDelta instead of the new frame
     """
     
     logging.info("=== TEMPORAL FEATURE EXTRACTION STARTED ===")
     exclude = set(exclude_cols or [])
+    executor = ColumnExecutor.resolve(executor)
     
     # ---------------- DATETIME64 COLUMNS ----------------
     # Accept any datetime64 unit (ns/us/ms/s) so upstream casting always works.
     datetime_cols = [c for c in df.select_dtypes(include=["datetime64"]).columns.tolist() if c not in exclude]
     
+    # New columns are collected here and added to the frame in one go at the end
+    new_columns = {}
+    dropped = []
+
     if datetime_cols:
         logging.info(f"Detected Date-Time columns: {datetime_cols}")
-        for col in datetime_cols:
-            df[f"{col}_year"] = df[col].dt.year
-            df[f"{col}_month"] = df[col].dt.month
-            df[f"{col}_day"] = df[col].dt.day
-            df[f"{col}_hour"] = df[col].dt.hour
-            df[f"{col}_minute"] = df[col].dt.minute
-            df[f"{col}_second"] = df[col].dt.second
-            df[f"{col}_weekday"] = df[col].dt.weekday
+        parts = executor.map(_datetime_parts, (df[col] for col in datetime_cols))
+        for col, values in zip(datetime_cols, parts):
+            for name, part in zip(_DATETIME_PARTS, values):
+                new_columns[f"{col}_{name}"] = part
 
             logging.info(f"Extracted features from {col}: Year, Month, Day, Hour, Minute, Second, Weekday")
             
             if drop_original:
-                df = df.drop(columns=[col])
+                dropped.append(col)
                 logging.info(f"Dropped Original Column: {col}")
     else:
         logging.info("No Date-Time columns detected.")
     
     # ---------------- TIME-ONLY COLUMNS ----------------
-    time_cols = []
-    for col in df.select_dtypes(include=["object"]).columns:
-        if col in exclude:
-            continue
-        try:
-            pd.to_datetime(df[col], format="%H:%M:%S", errors="raise")
-            time_cols.append(col)
-        except:
-            continue
+    candidates = [col for col in df.select_dtypes(include=["object"]).columns if col not in exclude]
+    parsed = {
+        col: values
+        for col, values in zip(candidates, executor.map(_parse_time_only, (df[col] for col in candidates)))
+        if values is not None
+    }
+    time_cols = list(parsed)
     
     if time_cols:
         logging.info(f"Detected Time-Only columns: {time_cols}")
         for col in time_cols:
-            times = pd.to_datetime(df[col], format="%H:%M:%S")
-            df[f"{col}_hour"] = times.dt.hour
-            df[f"{col}_minute"] = times.dt.minute
-            df[f"{col}_second"] = times.dt.second
+            for name, part in zip(_TIME_PARTS, parsed[col]):
+                new_columns[f"{col}_{name}"] = part
             
             logging.info(f"Extracted features from {col}: Hour, Minute, Second")
             
             if drop_original:
-                df = df.drop(columns=[col])
+                dropped.append(col)
                 logging.info(f"Dropped Original Column: {col}")
     else:
         logging.info("No Time-Only columns detected.")
-    
+
+    # A part named like a remaining column replaces it in place, the others are appended
+    delta = FrameDelta(drop=dropped, columns=new_columns)
+
     logging.info("=== TEMPORAL FEATURE EXTRACTION COMPLETED ===")
     divider()
     
-    return df
+    return delta if return_delta else apply_delta(df, delta)
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chunked_pipeline import prismaflow_pipeline_chunked
+from main import prismaflow_pipeline
+
+pytestmark = pytest.mark.usefixtures("scratch_run_log")
+
+# Columns whose nulls get a mean fill: the chunked pipeline learns the mean on
+# every row of the file, the in-memory one on the rows left after the null drops
+# of the columns before it, so these differ by a small amount (standardized units).
+MEAN_FILL_TOLERANCE = 0.05
+EXACT_TOLERANCE = 1e-9
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 600
+    df = pd.DataFrame(
+        {
+            "num": rng.normal(10, 2, n),
+            "skew": rng.exponential(3, n),
+            "cnt": rng.integers(0, 50, n).astype(float),
+            "cat": rng.choice(["red", "green", "blue", "gray"], n),
+            "city": rng.choice([f"c{i}" for i in range(8)], n),
+            "created": pd.date_range("2024-01-01", periods=n, freq="7h").strftime("%Y-%m-%d %H:%M:%S"),
+            "empty": np.nan,
+            "target": rng.integers(0, 2, n),
+        }
+    )
+    df.loc[rng.random(n) < 0.02, "num"] = np.nan
+    df.loc[rng.random(n) < 0.2, "skew"] = np.nan
+    df.loc[rng.random(n) < 0.03, "cat"] = None
+    df.loc[rng.random(n) < 0.2, "city"] = None
+    df.loc[:3, "num"] = 100.0
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def _chunked(csv_path, out_path, chunk_size):
+    prismaflow_pipeline_chunked(
+        str(csv_path), chunk_size=chunk_size, target_col="target", output_file=str(out_path), sample_size=None
+    )
+    return pd.read_csv(out_path)
+
+
+def test_chunked_matches_in_memory_simultaneous_mode(csv_path, tmp_path):
+    in_memory = prismaflow_pipeline(
+        pd.read_csv(csv_path), target_col="target", output_file=None, return_df=True, outlier_simultaneous=True
+    ).reset_index(drop=True)
+    chunked = _chunked(csv_path, tmp_path / "out.csv", chunk_size=100)
+
+    assert list(chunked.columns) == list(in_memory.columns)
+    assert len(chunked) == len(in_memory)
+    for col in chunked.columns:
+        tolerance = MEAN_FILL_TOLERANCE if col == "skew" else EXACT_TOLERANCE
+        np.testing.assert_allclose(chunked[col].to_numpy(float), in_memory[col].to_numpy(float), atol=tolerance, err_msg=col)
+
+
+def test_chunk_size_does_not_change_the_output(csv_path, tmp_path):
+    small = _chunked(csv_path, tmp_path / "small.csv", chunk_size=37)
+    whole = _chunked(csv_path, tmp_path / "whole.csv", chunk_size=10_000)
+    pd.testing.assert_frame_equal(small, whole, check_exact=False, atol=EXACT_TOLERANCE)
+
+
+def test_metrics_count_dropped_rows(csv_path, tmp_path):
+    metrics = prismaflow_pipeline_chunked(
+        str(csv_path), chunk_size=100, target_col="target", output_file=None, collect_metrics=True, sample_size=None
+    )
+    assert metrics["rows_out"] + metrics["rows_dropped"] == 600
+    assert metrics["rows_dropped_outliers"] >= 4
+    assert metrics["columns_removed_empty"] == 1
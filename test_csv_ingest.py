@@ -0,0 +1,65 @@
+import gzip
+
+import pandas as pd
+import pytest
+
+from csv_ingest import read_csv_fast
+
+pytest.importorskip("pyarrow")
+
+
+def _both(data, **kwargs):
+    return read_csv_fast(data, engine="pyarrow", **kwargs), read_csv_fast(data, engine="c", **kwargs)
+
+
+@pytest.mark.parametrize("data", [b"a,b,c\n", b"a,b,c", b"a,b,c\r\n"])
+def test_header_without_rows_matches_pandas(data):
+    fast, expected = _both(data)
+    assert fast.shape == (0, 3)
+    assert (fast.dtypes == object).all()
+    pd.testing.assert_frame_equal(fast, expected)
+
+
+def test_header_without_rows_keeps_dtype_hints():
+    fast, expected = _both(b"a,b\n", dtype_hints={"a": "int64"})
+    pd.testing.assert_frame_equal(fast, expected)
+    assert fast["a"].dtype == "int64"
+
+
+def test_gzipped_header_without_rows_matches_pandas():
+    data = gzip.compress(b"a,b\n")
+    fast, expected = _both(data, compression="gzip")
+    pd.testing.assert_frame_equal(fast, expected)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"id,x\n18446744073709551615,1\n1,2\n",
+        b"id,x\n-9223372036854775809,1\n5,2\n",
+        b"id,x\n99999999999999999999999,1\n5,2\n",
+    ],
+)
+def test_integers_beyond_int64_match_pandas(data):
+    fast, expected = _both(data)
+    pd.testing.assert_frame_equal(fast, expected)
+    assert fast["id"].tolist() == expected["id"].tolist()
+
+
+def test_large_floats_still_read_as_floats():
+    fast, expected = _both(b"v\n1e300\n2.5\n")
+    pd.testing.assert_frame_equal(fast, expected)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"flag,x\nTrue,1\n,2\nFalse,3\n",
+        b"flag,x\ntrue,1\nNA,2\nfalse,3\n",
+        b"flag,x\nTrue,1\nFalse,2\n",
+    ],
+)
+def test_booleans_with_and_without_nulls_match_pandas(data):
+    fast, expected = _both(data)
+    pd.testing.assert_frame_equal(fast, expected)
+    assert [type(v) for v in fast["flag"]] == [type(v) for v in expected["flag"]]
@@ -0,0 +1,54 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from encoding import cap_cardinality, encode_features
+
+
+@pytest.fixture(autouse=True)
+def _quiet_logs():
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def _wide_frame(n_levels=200, n=2000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "city": [f"city_{i}" for i in rng.integers(0, n_levels, size=n)],
+            "x": rng.normal(size=n),
+        }
+    )
+
+
+@pytest.mark.parametrize("rare_strategy", ["other", "hash"])
+@pytest.mark.parametrize("max_categories", [5, 10, 50])
+def test_onehot_respects_max_categories(rare_strategy, max_categories):
+    df = _wide_frame()
+    out = encode_features(df, "onehot", max_categories=max_categories, rare_strategy=rare_strategy)
+    dummies = [c for c in out.columns if c.startswith("city_")]
+    assert 1 < len(dummies) <= max_categories
+    assert "x" in out.columns
+
+
+def test_hash_uses_fewer_buckets_than_the_cap_when_asked():
+    s = _wide_frame()["city"]
+    out = cap_cardinality(s, 50, rare_strategy="hash", hash_buckets=8)
+    assert out.nunique() <= 8
+
+
+def test_hash_keeps_missing_values_missing():
+    s = _wide_frame()["city"].astype(object)
+    s.iloc[:10] = None
+    out = cap_cardinality(s, 10, rare_strategy="hash")
+    assert out.iloc[:10].isna().all()
+    assert out.iloc[10:].notna().all()
+    assert out.nunique() <= 10
+
+
+def test_under_the_cap_is_left_alone():
+    s = pd.Series(["a", "b", "a", None])
+    assert cap_cardinality(s, 5, rare_strategy="hash") is None
@@ -0,0 +1,78 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_selection import _blockwise_correlated, feature_selection
+
+
+def _offset_frame(seed, r):
+    # Epoch-second-like columns: a ~1.7e9 offset with a spread of a few hundred
+    rng = np.random.default_rng(seed)
+    n = 5000
+    a = rng.normal(size=n)
+    b = r * a + np.sqrt(1 - r * r) * rng.normal(size=n)
+    return pd.DataFrame({"a": 1.7e9 + 300 * a, "b": 1.7e9 + 300 * b, "c": rng.normal(size=n)})
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_blockwise_matches_dense_on_large_offset_columns(seed):
+    r = 0.91 + 0.04 * (seed % 10) / 9
+    df = _offset_frame(seed, r)
+    columns = list(df.columns)
+
+    dense = df[columns].corr().abs()
+    upper = dense.where(np.triu(np.ones(dense.shape), k=1).astype(bool))
+    expected = [c for c in upper.columns if any(upper[c] > 0.9)]
+
+    assert _blockwise_correlated(df, columns, 0.9, block_size=2) == expected
+
+
+def test_engines_return_same_frame_on_large_offset_columns():
+    logging.disable(logging.CRITICAL)
+    try:
+        df = _offset_frame(0, 0.93)
+        blockwise = feature_selection(df, variance_threshold=0.0, engine="blockwise")
+        dense = feature_selection(df, variance_threshold=0.0, engine="dense")
+    finally:
+        logging.disable(logging.NOTSET)
+    assert list(blockwise.columns) == list(dense.columns) == ["a", "c"]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_blockwise_matches_dense_with_nulls(seed):
+    rng = np.random.default_rng(seed)
+    df = _offset_frame(seed, 0.91 + 0.04 * seed / 9)
+    df["d"] = df["c"] * 2 + rng.normal(scale=0.01, size=len(df))
+    df["e"] = rng.normal(size=len(df))
+    for col in df.columns:
+        df.loc[rng.random(len(df)) < 0.2, col] = np.nan
+    # Correlated only on the rows where both are present
+    df["f"] = np.where(df["e"].notna(), np.nan, df["c"])
+    columns = list(df.columns)
+
+    dense = df[columns].corr().abs()
+    upper = dense.where(np.triu(np.ones(dense.shape), k=1).astype(bool))
+    expected = [c for c in upper.columns if any(upper[c] > 0.9)]
+
+    for block_size in (1, 2, 4, 16):
+        assert _blockwise_correlated(df, columns, 0.9, block_size=block_size) == expected
+
+
+def test_blockwise_holds_one_block_pair_at_a_time(monkeypatch):
+    import feature_selection
+
+    df = _offset_frame(0, 0.93)
+    for i in range(10):
+        df[f"x{i}"] = np.random.default_rng(i).normal(size=len(df))
+    widths = []
+    original = feature_selection._standardized_block
+
+    def spy(frame, columns, *args):
+        widths.append(len(columns))
+        return original(frame, columns, *args)
+
+    monkeypatch.setattr(feature_selection, "_standardized_block", spy)
+    _blockwise_correlated(df, list(df.columns), 0.9, block_size=4)
+    assert widths and max(widths) <= 4
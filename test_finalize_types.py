@@ -0,0 +1,47 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from finalize_types import finalize_dtypes, infer_datetime_plan
+
+
+@pytest.fixture(autouse=True)
+def _quiet_logs():
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def _day_first_dates(n=500, day_first_only=5):
+    # Every value is a valid day/month/year; only `day_first_only` of them have
+    # a day above 12, so month-first parses all but those
+    rng = np.random.default_rng(0)
+    days = rng.integers(1, 13, size=n)
+    days[np.linspace(1, n - 1, day_first_only).astype(int)] = 25
+    months = rng.integers(1, 13, size=n)
+    return pd.Series([f"{d:02d}/{m:02d}/2024" for d, m in zip(days, months)])
+
+
+def test_format_parsing_more_rows_wins_over_an_earlier_one():
+    plan = infer_datetime_plan(_day_first_dates(), "created")
+    assert plan == {"format": "%d/%m/%Y", "dayfirst": False}
+
+
+def test_exact_ties_keep_the_earlier_format():
+    s = pd.Series(["01/02/2024", "03/04/2024", "05/06/2024"] * 20)
+    assert infer_datetime_plan(s, "created")["format"] == "%m/%d/%Y"
+
+
+def test_cached_plan_is_dropped_when_it_loses_rows():
+    cached = {"format": "%m/%d/%Y", "dayfirst": False}
+    plan = infer_datetime_plan(_day_first_dates(), "created", cached=cached)
+    assert plan["format"] == "%d/%m/%Y"
+
+
+def test_finalize_keeps_every_day_first_date():
+    df = pd.DataFrame({"created": _day_first_dates()})
+    out = finalize_dtypes(df)
+    assert str(out["created"].dtype).startswith("datetime64")
+    assert out["created"].notna().all()
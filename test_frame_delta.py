@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from frame_delta import FrameDelta, apply_delta
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {"a": np.arange(5.0), "b": list("vwxyz"), "c": np.arange(5) * 10},
+        index=[10, 11, 12, 13, 14],
+    )
+
+
+def _shares(left, right, col):
+    return np.shares_memory(left[col].to_numpy(), right[col].to_numpy())
+
+
+def test_empty_delta_returns_an_equal_frame_without_copying(df):
+    out, copies = apply_delta(df, FrameDelta(), return_copies=True)
+    pd.testing.assert_frame_equal(out, df)
+    assert out is not df
+    assert copies == 0
+    assert all(_shares(out, df, col) for col in ("a", "c"))
+
+
+def test_drop_only(df):
+    out, copies = apply_delta(df, FrameDelta(drop=["b"]), return_copies=True)
+    assert list(out.columns) == ["a", "c"]
+    assert copies == 0
+    assert _shares(out, df, "a")
+
+
+def test_replaced_columns_keep_their_position_and_new_ones_are_appended(df):
+    delta = FrameDelta(columns={"new": np.ones(5), "b": np.arange(5), "c2": df["c"] + 1})
+    out, copies = apply_delta(df, delta, return_copies=True)
+    assert list(out.columns) == ["a", "b", "c", "new", "c2"]
+    assert out["b"].tolist() == [0, 1, 2, 3, 4]
+    assert out["c2"].tolist() == [1, 11, 21, 31, 41]
+    assert out.index.tolist() == df.index.tolist()
+    assert copies == 0
+
+
+def test_row_mask_only_counts_one_copy(df):
+    delta = FrameDelta(row_mask=[True, False, True, False, True])
+    out, copies = apply_delta(df, delta, return_copies=True)
+    assert out.index.tolist() == [10, 12, 14]
+    assert delta.rows_dropped == 2
+    assert copies == 1
+
+
+def test_mask_keeping_every_row_is_not_a_copy(df):
+    delta = FrameDelta(row_mask=np.ones(5, dtype=bool))
+    out, copies = apply_delta(df, delta, return_copies=True)
+    assert delta.rows_dropped == 0
+    assert copies == 0
+    pd.testing.assert_frame_equal(out, df)
+
+
+def test_drop_mask_and_columns_together(df):
+    delta = FrameDelta(
+        drop=["c"],
+        row_mask=[False, True, True, True, False],
+        columns={"a": df["a"] * 2, "flag": np.array([1, 2, 3, 4, 5])},
+    )
+    out, copies = apply_delta(df, delta, return_copies=True)
+    assert list(out.columns) == ["a", "b", "flag"]
+    assert out.index.tolist() == [11, 12, 13]
+    assert out["a"].tolist() == [2.0, 4.0, 6.0]
+    assert out["flag"].tolist() == [2, 3, 4]
+    assert out["b"].tolist() == ["w", "x", "y"]
+    # Replacing and appending columns adds no copies on top of the row filter
+    assert copies == 1
+
+
+def test_input_frame_is_never_modified(df):
+    before = df.copy()
+    delta = FrameDelta(drop=["a"], row_mask=[True, True, False, True, True], columns={"b": np.zeros(5), "d": np.ones(5)})
+    out = apply_delta(df, delta)
+    out.iloc[0, 0] = -1.0
+    pd.testing.assert_frame_equal(df, before)
+
+
+def test_pipeline_reports_copies_per_step(scratch_run_log):
+    from main import prismaflow_pipeline
+
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({"x": rng.normal(size=200), "y": rng.normal(size=200), "label": rng.integers(0, 2, 200)})
+    frame.loc[:2, "x"] = 50.0
+    _, metrics = prismaflow_pipeline(frame, target_col="label", output_file=None, return_df=True, collect_metrics=True)
+    per_step = [s["frame_copies"] for s in metrics["steps"]]
+    assert all(c in (0, 1) for c in per_step)
+    assert metrics["frame_copies"] == sum(per_step)
+    outliers = next(s for s in metrics["steps"] if s["step"] == "handle_outliers")
+    assert outliers["frame_copies"] == 1
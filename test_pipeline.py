@@ -0,0 +1,97 @@
+import gzip
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import ALL_STEPS
+from pipeline import PrismaFlowPipeline
+
+pytestmark = pytest.mark.usefixtures("scratch_run_log")
+
+NO_SCALING = [s for s in ALL_STEPS if s != "scaling"]
+
+
+def _frame(levels, seed, n=300):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "x": rng.normal(size=n),
+            "y": rng.normal(5, 1, n),
+            "color": rng.choice(levels, n),
+            "when": pd.date_range("2024-01-01", periods=n, freq="D").strftime("%Y-%m-%d"),
+            "label": rng.integers(0, 2, n),
+        }
+    )
+
+
+@pytest.fixture
+def train():
+    return _frame(["red", "green", "blue"], 0)
+
+
+@pytest.fixture
+def unseen():
+    # "purple" was never seen while fitting
+    return _frame(["red", "purple", "blue"], 5)
+
+
+@pytest.mark.parametrize("encoding_method", ["label", "onehot"])
+def test_save_load_round_trip(tmp_path, train, unseen, encoding_method):
+    pipe = PrismaFlowPipeline(target_col="label", encoding_method=encoding_method).fit(train)
+    fitted = pipe.transform(train)
+    expected = pipe.transform(unseen)
+
+    path = tmp_path / "state.json.gz"
+    pipe.save(path)
+    loaded = PrismaFlowPipeline.load(path)
+
+    pd.testing.assert_frame_equal(loaded.transform(train), fitted)
+    result = loaded.transform(unseen)
+    pd.testing.assert_frame_equal(result, expected)
+    assert list(result.columns) == list(fitted.columns)
+    assert result.dtypes.to_dict() == fitted.dtypes.to_dict()
+
+
+def test_label_codes_survive_the_round_trip(tmp_path, train, unseen):
+    pipe = PrismaFlowPipeline(target_col="label", encoding_method="label", steps=NO_SCALING).fit(train)
+    fitted = pipe.transform(train)
+    pipe.save(tmp_path / "state.json")
+    result = PrismaFlowPipeline.load(tmp_path / "state.json").transform(unseen)
+
+    levels = pipe.state_["encoding_vocab"]["color"]
+    codes = {level: i for i, level in enumerate(levels)}
+    assert fitted["color"].tolist() == [codes[v] for v in train.loc[fitted.index, "color"]]
+    # Unseen categories are encoded as -1
+    assert result["color"].tolist() == [codes.get(v, -1) for v in unseen.loc[result.index, "color"]]
+    assert result["color"].dtype == fitted["color"].dtype
+
+
+def test_onehot_unseen_category_has_no_dummy(tmp_path, train, unseen):
+    pipe = PrismaFlowPipeline(target_col="label", encoding_method="onehot", steps=NO_SCALING).fit(train)
+    fitted = pipe.transform(train)
+    pipe.save(tmp_path / "state.json")
+    result = PrismaFlowPipeline.load(tmp_path / "state.json").transform(unseen)
+
+    dummies = [c for c in fitted.columns if c.startswith("color_")]
+    assert sorted(dummies) == ["color_blue", "color_green", "color_red"]
+    assert list(result.columns) == list(fitted.columns)
+    purple = unseen.loc[result.index, "color"] == "purple"
+    assert not result.loc[purple, dummies].to_numpy().any()
+    assert (result.loc[~purple, dummies].sum(axis=1) == 1).all()
+
+
+def test_save_requires_a_fitted_pipeline(tmp_path):
+    with pytest.raises(ValueError):
+        PrismaFlowPipeline().save(tmp_path / "state.json")
+
+
+def test_load_rejects_other_state_versions(tmp_path, train):
+    path = tmp_path / "state.json.gz"
+    PrismaFlowPipeline(target_col="label").fit(train).save(path)
+    payload = json.loads(gzip.decompress(path.read_bytes()))
+    payload["version"] = -1
+    path.write_bytes(gzip.compress(json.dumps(payload).encode("utf-8")))
+    with pytest.raises(ValueError):
+        PrismaFlowPipeline.load(path)
@@ -0,0 +1,39 @@
+import logging
+
+from run_log import finish_run_log, start_run_log, with_run_log
+
+
+def test_run_replaces_the_log_file(tmp_path):
+    path = tmp_path / "logs.txt"
+    path.write_text("previous run\n")
+    sink = start_run_log(str(path))
+    logging.info("this run")
+    finish_run_log(sink)
+    text = path.read_text()
+    assert "this run" in text and "previous run" not in text
+
+
+def test_run_without_records_keeps_the_previous_log(tmp_path):
+    path = tmp_path / "logs.txt"
+    path.write_text("previous run\n")
+
+    @with_run_log(str(path))
+    def quiet():
+        logging.disable(logging.CRITICAL)
+        try:
+            logging.info("dropped")
+        finally:
+            logging.disable(logging.NOTSET)
+
+    quiet()
+    assert path.read_text() == "previous run\n"
+
+
+def test_warning_level_run_drops_info_records(tmp_path):
+    path = tmp_path / "logs.txt"
+    sink = start_run_log(str(path), level=logging.WARNING)
+    logging.info("per-column detail")
+    logging.warning("kept")
+    finish_run_log(sink)
+    text = path.read_text()
+    assert "kept" in text and "per-column detail" not in text
@@ -0,0 +1,111 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+import session_store
+from session_store import SessionStore
+
+TOKENS = [f"{i:032x}" for i in range(1, 10)]
+
+
+def _set_last_access(store, token, when):
+    path = os.path.join(store.root, token, session_store._TOUCH_FILE)
+    os.utime(path, (when, when))
+
+
+def _stored(store):
+    return sorted(tok for tok, _ in store._sessions())
+
+
+def test_budget_evicts_least_recently_used_first(tmp_path):
+    store = SessionStore(tmp_path, max_bytes=3500)
+    now = time.time()
+    for age, token in zip((300, 200, 100), TOKENS[:3]):
+        store.create(token, {"n": token}, {"data.csv": b"x" * 1000})
+        _set_last_access(store, token, now - age)
+    # Reading the oldest session makes it the most recently used one
+    assert store.get(TOKENS[0]) is not None
+
+    store.create(TOKENS[3], {}, {"data.csv": b"x" * 1000})
+
+    assert _stored(store) == [TOKENS[0], TOKENS[2], TOKENS[3]]
+
+
+def test_budget_evicts_until_under_the_limit(tmp_path):
+    store = SessionStore(tmp_path, max_bytes=2500)
+    now = time.time()
+    for age, token in zip((300, 200, 100), TOKENS[:3]):
+        store.create(token, {}, {"data.csv": b"x" * 1000})
+        _set_last_access(store, token, now - age)
+
+    assert store.put_payload(TOKENS[2], "processed.csv", b"y" * 1000)
+
+    assert _stored(store) == [TOKENS[2]]
+
+
+def test_session_being_written_is_never_evicted(tmp_path):
+    store = SessionStore(tmp_path, max_bytes=500)
+    store.create(TOKENS[0], {}, {"data.csv": b"x" * 100})
+    store.create(TOKENS[1], {}, {"data.csv": b"x" * 1000})
+    assert _stored(store) == [TOKENS[1]]
+    assert store.get_payload(TOKENS[1], "data.csv") == b"x" * 1000
+
+
+def test_cleanup_drops_expired_sessions(tmp_path):
+    store = SessionStore(tmp_path, ttl_seconds=60)
+    store.create(TOKENS[0], {"created_at": time.time() - 120})
+    store.create(TOKENS[1], {})
+    assert store.get(TOKENS[0]) is None
+    store.cleanup()
+    assert _stored(store) == [TOKENS[1]]
+
+
+def _update_many(root, token, worker, count):
+    store = SessionStore(root)
+    for i in range(count):
+        assert store.update(token, **{f"w{worker}_{i}": i})
+
+
+def _create_many(root, worker, count, max_bytes):
+    store = SessionStore(root, max_bytes=max_bytes)
+    for i in range(count):
+        token = f"{worker:016x}{i:016x}"
+        store.create(token, {}, {"data.csv": b"x" * 1000})
+
+
+def _run_processes(target, args_list):
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=target, args=args) for args in args_list]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+    assert all(p.exitcode == 0 for p in procs)
+
+
+@pytest.mark.skipif(session_store.fcntl is None, reason="cross-process locking needs fcntl")
+def test_updates_from_two_processes_are_not_lost(tmp_path):
+    store = SessionStore(tmp_path)
+    store.create(TOKENS[0], {})
+
+    _run_processes(_update_many, [(str(tmp_path), TOKENS[0], w, 100) for w in range(2)])
+
+    meta = store.get(TOKENS[0])
+    assert all(meta[f"w{w}_{i}"] == i for w in range(2) for i in range(100))
+
+
+@pytest.mark.skipif(session_store.fcntl is None, reason="cross-process locking needs fcntl")
+def test_budget_holds_with_two_processes_creating(tmp_path):
+    max_bytes = 5500
+    _run_processes(_create_many, [(str(tmp_path), w, 30, max_bytes) for w in range(2)])
+
+    store = SessionStore(tmp_path, max_bytes=max_bytes)
+    sessions = list(store._sessions())
+    assert 0 < len(sessions) <= 5
+    assert sum(store._size(path) for _, path in sessions) <= max_bytes
+    # Every surviving session is complete: metadata and payload both present
+    for token, _ in sessions:
+        assert store.get(token) is not None
+        assert store.get_payload(token, "data.csv") == b"x" * 1000
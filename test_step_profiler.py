@@ -0,0 +1,52 @@
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from step_profiler import StepProfiler
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_cpu_seconds_exclude_other_threads():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    worker = threading.Thread(target=_busy, args=(0.3,))
+    with StepProfiler() as profiler:
+        profiler.start("idle", df)
+        worker.start()
+        worker.join()
+        record = profiler.stop(df)
+    assert record["wall_seconds"] >= 0.25
+    assert record["cpu_seconds"] < 0.1
+
+
+def test_allocations_traced_for_a_lone_run():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    with StepProfiler(trace_memory=True) as profiler:
+        profiler.start("alloc", df)
+        block = np.ones(1_000_000)
+        record = profiler.stop(df)
+    assert record["peak_alloc_bytes"] >= block.nbytes
+    assert not tracemalloc.is_tracing()
+
+
+def test_allocations_left_empty_when_runs_overlap():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    with StepProfiler(trace_memory=True) as profiler:
+        profiler.start("overlapped", df)
+        with StepProfiler(trace_memory=True) as other:
+            other.start("other", df)
+            other_record = other.stop(df)
+        record = profiler.stop(df)
+        profiler.start("alone again", df)
+        later = profiler.stop(df)
+    assert record["peak_alloc_bytes"] is None and record["net_alloc_bytes"] is None
+    assert other_record["peak_alloc_bytes"] is None
+    assert later["peak_alloc_bytes"] is not None
+    assert not tracemalloc.is_tracing()